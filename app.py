@@ -1,20 +1,305 @@
-from fastapi import FastAPI, HTTPException, Request
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
+from collections import deque
 import uvicorn
+import asyncio
+import hmac
 import json
+import os
+import threading
+import time
+
+try:
+    import orjson
+except ImportError:
+    # Optional: responses are encoded with the standard library instead, with identical content
+    orjson = None
 
 # Import the ResumeReviewer from our original code
-from resume_reviewer import ResumeReviewer, preprocess_text
+from resume_reviewer import ResumeReviewer, AnalyzedDocument, preprocess_text, truncate_text
+from job_store import JobStore, job_id_for
+from executor import AnalysisExecutor, ExecutorBusy
+from result_cache import ResultCache, result_key
+from batch_queue import BatchQueue, BatchRunner
+import metrics
+
+# Warmup progress reported by /ready
+warmup = {"ready": False, "error": None}
+
+def warm_up():
+    """Build every service and start the workers before traffic arrives"""
+    try:
+        get_reviewer().preprocess_text("warm up")
+        get_job_store()
+        get_resume_index()
+        get_result_cache()
+        get_executor().warm()
+        warmup["ready"] = True
+    except Exception as exc:
+        warmup["error"] = repr(exc)
+        raise
+
+@asynccontextmanager
+async def lifespan(app):
+    # Warm up in the background so the server accepts connections (and /ready) right away
+    threading.Thread(target=warm_up, name="warmup", daemon=True).start()
+    # Resume batches left unfinished by the previous process
+    if get_batch_queue().has_pending():
+        get_batch_runner().start()
+    yield
+    if "batch_runner" in services:
+        await services.pop("batch_runner").stop()
+    if "batch_queue" in services:
+        services.pop("batch_queue").close()
+    if "executor" in services:
+        services.pop("executor").shutdown()
+    for name in ("resume_index", "job_index"):
+        if name in services and services[name].path:
+            services[name].save()
+    if "result_cache" in services:
+        services.pop("result_cache").close()
 
 app = FastAPI(
     title="Resume Review API",
     description="API for analyzing resumes against job descriptions",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# Initialize the reviewer at startup
-reviewer = ResumeReviewer()
+reviewer_options = {
+    "model_path": os.environ.get("MODEL_PATH") or None,
+    "vectorizer_mode": os.environ.get("VECTORIZER_MODE") or None,
+    "preprocessing": os.environ.get("PREPROCESSING", "nltk"),
+    "taxonomy": os.environ.get("TAXONOMY_PATH") or None
+}
+
+# Admin endpoints require this value in the X-Admin-Token header and are disabled while it is unset
+admin_token = os.environ.get("ADMIN_TOKEN") or None
+
+# Prometheus metrics served on /metrics; per-stage timings are only collected when enabled
+metrics_enabled = os.environ.get("METRICS_ENABLED", "1") == "1"
+registry = metrics.Registry()
+requests_total = registry.counter(
+    "resume_reviewer_requests_total", "Analysis requests served", ["endpoint"])
+request_seconds = registry.histogram(
+    "resume_reviewer_request_seconds", "Analysis latency including queueing", ["endpoint"])
+stage_seconds = registry.histogram(
+    "resume_reviewer_stage_seconds", "Time spent in each analyze_resume stage", ["stage"])
+input_chars = registry.histogram(
+    "resume_reviewer_input_chars", "Size of analyzed inputs in characters", ["input"], metrics.SIZE_BUCKETS)
+busy_rejections_total = registry.counter(
+    "resume_reviewer_busy_rejections_total", "Requests rejected with 503 because the analysis queue was full")
+cache_hits_total = registry.counter(
+    "resume_reviewer_result_cache_hits_total", "Analyses answered from the result cache", ["tier"])
+cache_misses_total = registry.counter(
+    "resume_reviewer_result_cache_misses_total", "Analyses not found in the result cache")
+
+# Services are built on first use (or by warm_up) so importing the app stays fast
+services = {}
+services_lock = threading.RLock()
+
+def get_service(name, factory):
+    service = services.get(name)
+    if service is None:
+        with services_lock:
+            service = services.get(name)
+            if service is None:
+                service = services[name] = factory()
+    return service
+
+def get_reviewer():
+    return get_service("reviewer", lambda: ResumeReviewer(**reviewer_options))
+
+def get_job_store():
+    # Prepared job descriptions, reused across every resume scored against them
+    return get_service("job_store", lambda: JobStore(
+        get_reviewer(),
+        max_size=int(os.environ.get("JOB_CACHE_SIZE", "1024")),
+        path=os.environ.get("JOB_CACHE_DIR") or None
+    ))
+
+def index_reviewer(reviewer):
+    # The index needs vectors that are comparable across requests,
+    # so it falls back to the hashing vectorizer in pairwise mode
+    if reviewer.vectorizer_mode == "pairwise":
+        return ResumeReviewer(vectorizer_mode="hashing", preprocessing=reviewer.preprocessing,
+                              taxonomy=reviewer_options["taxonomy"])
+    return reviewer
+
+def _build_resume_index():
+    from resume_index import ResumeIndex
+
+    return ResumeIndex(
+        index_reviewer(get_reviewer()),
+        path=os.environ.get("RESUME_INDEX_DIR") or None,
+        autosave_every=int(os.environ.get("RESUME_INDEX_AUTOSAVE", "1000")),
+        duplicate_threshold=duplicate_threshold or None
+    )
+
+def get_resume_index():
+    # Pool of candidate resumes for /search
+    return get_service("resume_index", _build_resume_index)
+
+def _build_job_index():
+    from job_index import JobIndex
+
+    return JobIndex(
+        index_reviewer(get_reviewer()),
+        path=os.environ.get("JOB_INDEX_DIR") or None,
+        autosave_every=int(os.environ.get("JOB_INDEX_AUTOSAVE", "1000"))
+    )
+
+def get_job_index():
+    # Open job postings for /match_jobs
+    return get_service("job_index", _build_job_index)
+
+def get_skill_analytics():
+    # Pool-wide skill statistics over the resume index
+    from skill_analytics import SkillAnalytics
+
+    return get_service("skill_analytics", lambda: SkillAnalytics(get_resume_index()))
+
+def get_executor():
+    # CPU-bound analyses run here instead of on the event loop
+    return get_service("executor", lambda: AnalysisExecutor(
+        get_reviewer(),
+        workers=int(os.environ.get("ANALYSIS_WORKERS", "0")),
+        max_pending=int(os.environ["ANALYSIS_QUEUE_DEPTH"]) if os.environ.get("ANALYSIS_QUEUE_DEPTH") else None,
+        retry_after=int(os.environ.get("ANALYSIS_RETRY_AFTER", "1")),
+        reviewer_options=reviewer_options
+    ))
+
+# Resumes whose estimated shingle similarity reaches this are scored once per group in
+# /rank_resumes and /batches and grouped in the candidate index (0: no deduplication)
+duplicate_threshold = float(os.environ.get("DUPLICATE_THRESHOLD", "0.9"))
+
+# Longest job description or resume accepted, in characters (0: unlimited). Longer inputs are
+# cut at a word boundary ("truncate", reported as "truncated" in results) or refused with 413 ("reject")
+max_input_chars = int(os.environ.get("MAX_INPUT_CHARS", "100000"))
+input_limit_policy = os.environ.get("INPUT_LIMIT_POLICY", "truncate")
+if input_limit_policy not in ("truncate", "reject"):
+    raise ValueError("INPUT_LIMIT_POLICY must be 'truncate' or 'reject', not %r" % input_limit_policy)
+
+# /analyze_stream keeps at most this many records in flight (0: twice the number of workers)
+stream_window = int(os.environ.get("STREAM_WINDOW", "0"))
+# Longest accepted NDJSON record; longer lines are skipped and reported as errors
+stream_max_line_bytes = int(os.environ.get("STREAM_MAX_LINE_BYTES", str(1024 * 1024)))
+# Pause before retrying a streamed record when the executor queue is full
+STREAM_BUSY_BACKOFF = 0.05
+
+def _build_result_cache():
+    cache = ResultCache(
+        max_size=int(os.environ.get("RESULT_CACHE_SIZE", "4096")),
+        ttl=float(os.environ.get("RESULT_CACHE_TTL", "3600")),
+        path=os.environ.get("RESULT_CACHE_PATH") or None
+    )
+    cache.purge(get_reviewer().analysis_version)
+    return cache
+
+def get_result_cache():
+    # Finished analyses, reused when the same (job, resume) pair is submitted again
+    return get_service("result_cache", _build_result_cache)
+
+# Batch items analyzed at once across every batch (0: one per analysis worker), and within one batch
+# (0: no lower limit). Kept below ANALYSIS_QUEUE_DEPTH so interactive requests always find room.
+batch_concurrency = int(os.environ.get("BATCH_CONCURRENCY", "0"))
+batch_max_per_batch = int(os.environ.get("BATCH_MAX_PER_BATCH", "0"))
+# Resumes preprocessed per executor call while a batch is grouped into near-duplicates
+BATCH_GROUP_CHUNK = 32
+
+def get_batch_queue():
+    # Submitted batches and their results, in SQLite so unfinished work survives restarts
+    return get_service("batch_queue", lambda: BatchQueue(os.environ.get("BATCH_QUEUE_PATH") or None))
+
+def _build_batch_runner():
+    concurrency = batch_concurrency or max(1, int(os.environ.get("ANALYSIS_WORKERS", "0")))
+    return BatchRunner(get_batch_queue(), analyze_batch_item, concurrency=concurrency,
+                       max_per_batch=batch_max_per_batch or concurrency, group=group_batch)
+
+def get_batch_runner():
+    return get_service("batch_runner", _build_batch_runner)
+
+def use_reviewer(reviewer):
+    """Switch every service to a new reviewer, restarting the analysis workers with it"""
+    with services_lock:
+        services["reviewer"] = reviewer
+        if "job_store" in services:
+            # Cached jobs are brought up to date as they are next used
+            services["job_store"].reviewer = reviewer
+        for name in ("resume_index", "job_index"):
+            if name in services:
+                services[name].reviewer = index_reviewer(reviewer)
+        if "result_cache" in services:
+            services["result_cache"].purge(reviewer.analysis_version)
+        executor = services.get("executor")
+        if executor is not None:
+            executor.restart(reviewer, reviewer_options)
+    if executor is not None:
+        executor.warm()
+
+# Fields of an analysis result in responses, and the fields each detail level returns. The
+# reviewer skips the skill category breakdowns for every response since none of them include it
+RESULT_FIELDS = ("overall_match_score", "similarity_score", "skill_match", "education_score",
+                 "experience_score", "recommendations")
+DETAIL_LEVELS = {"summary": ("overall_match_score",), "full": RESULT_FIELDS}
+
+def requested_fields(detail, fields):
+    """Result fields for the detail and fields query parameters; fields wins when both are given"""
+    if fields:
+        requested = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+        unknown = [field for field in requested if field not in RESULT_FIELDS]
+        if unknown or not requested:
+            raise HTTPException(status_code=400, detail="Unknown fields %s, expected some of %s" % (
+                ", ".join(unknown) or "(none)", ", ".join(RESULT_FIELDS)))
+        return requested
+    if detail not in DETAIL_LEVELS:
+        raise HTTPException(status_code=400, detail="detail must be one of %s" % ", ".join(DETAIL_LEVELS))
+    return DETAIL_LEVELS[detail]
+
+def reviewer_fields(fields):
+    # Recommendations are derived from overall_match_score, which the reviewer always returns
+    return tuple(field for field in fields if field != "recommendations")
+
+def shape_result(result, fields, truncated):
+    """The requested fields of an analysis result, plus the truncated flag and timings if present"""
+    if "recommendations" in fields:
+        result["recommendations"] = get_recommendations(result["overall_match_score"])
+    shaped = {field: result[field] for field in fields}
+    shaped["truncated"] = truncated
+    if "timings" in result:
+        shaped["timings"] = result["timings"]
+    return shaped
+
+def dump_json(content):
+    """Compact UTF-8 JSON, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSON response for results already in their final shape.
+
+    Returning it from an endpoint skips validating the content against the
+    response_model, which for large result lists costs more than encoding.
+    """
+    def render(self, content):
+        return dump_json(content)
+
+def limit_input(name, text):
+    """Apply the input size limit to one field, returning (text, truncated)"""
+    if not max_input_chars or len(text) <= max_input_chars:
+        return text, False
+    if input_limit_policy == "reject":
+        raise HTTPException(status_code=413, detail="%s is longer than %d characters" % (name, max_input_chars))
+    return truncate_text(text, max_input_chars), True
+
+def report_truncation(response, truncated):
+    # For endpoints answering with a list, which has no room for a "truncated" field
+    response.headers["X-Input-Truncated"] = "true" if truncated else "false"
 
 class ResumeInput(BaseModel):
     job_description: str
@@ -32,45 +317,640 @@ class ResumeResult(BaseModel):
     education_score: float
     experience_score: float
     recommendations: List[str]
+    truncated: bool = False
+
+class TimedResumeResult(ResumeResult):
+    timings: Optional[Dict[str, Dict[str, float]]] = None
+
+class RankInput(BaseModel):
+    job_description: str
+    resumes: List[str]
+    top_k: Optional[int] = None
+
+class RankedResumeResult(ResumeResult):
+    index: int
+    duplicate_of: Optional[int] = None
+
+class JobInput(BaseModel):
+    job_description: str
+
+class JobRegistration(BaseModel):
+    job_id: str
+    skills: List[str]
+    truncated: bool = False
+
+class BatchInput(BaseModel):
+    job_description: str
+    resumes: List[str]
+    max_concurrency: Optional[int] = None
+
+class BatchSubmission(BaseModel):
+    batch_id: str
+    total: int
+    truncated: List[int]
+
+class JobResumeInput(BaseModel):
+    resume: str
+
+class IndexedResume(BaseModel):
+    id: str
+    resume: str
+
+class IndexedJob(BaseModel):
+    id: str
+    job_description: str
+
+class IndexJobsInput(BaseModel):
+    jobs: List[IndexedJob]
+
+class MatchJobsInput(BaseModel):
+    resume: str
+    top_k: int = 10
+    # Only postings asking for at least this share of skills the resume has are scored
+    min_skill_match: float = 0.0
+
+class JobMatch(BaseModel):
+    id: str
+    overall_match_score: float
+    similarity_score: float
+    skill_match: SkillMatch
+    education_score: float
+    experience_score: float
+
+class SkillGapsInput(BaseModel):
+    job_description: str
+
+class IndexResumesInput(BaseModel):
+    resumes: List[IndexedResume]
+
+class SearchInput(BaseModel):
+    job_description: str
+    top_k: int = 10
+
+class SearchResult(BaseModel):
+    id: str
+    overall_match_score: float
+    similarity_score: float
+    skill_match: SkillMatch
+    education_score: float
+    experience_score: float
+    duplicates: List[str] = []
+
+@app.exception_handler(ExecutorBusy)
+async def executor_busy_handler(request: Request, exc: ExecutorBusy):
+    busy_rejections_total.inc()
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry later"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to Resume Review API. Use /docs for API documentation."}
 
-@app.post("/analyze_resume", response_model=ResumeResult)
-async def analyze_resume(input_data: ResumeInput):
+@app.get("/ready")
+async def ready():
+    """
+    Readiness probe: 200 once warmup has finished, 503 while warming up or if it failed
+    """
+    if warmup["ready"]:
+        return {"status": "ready"}
+    status = "failed" if warmup["error"] else "warming up"
+    return JSONResponse(status_code=503, content={"status": status, "error": warmup["error"]})
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus metrics: request and per-stage latency histograms, input sizes and counters
     """
-    Analyze a resume against a job description
+    return PlainTextResponse(registry.render(), media_type=metrics.CONTENT_TYPE)
+
+async def run_analysis(endpoint, job_id, job, resume, timings, document=None, fields=None):
+    """Run analyze_resume in the executor unless the result is cached, recording metrics and keeping timings only if requested.
+
+    document is an optional AnalyzedDocument of resume, analyzed instead of preprocessing the text again.
+    fields limits the result to some of the reviewer's RESULT_FIELDS.
+    """
+    start = time.perf_counter()
+    cache = get_result_cache()
+    version = get_reviewer().analysis_version
+    # Results with fewer fields are cached separately from full ones
+    key = result_key(job_id, resume, version if fields is None else "%s|%s" % (version, ",".join(fields)))
+
+    # Timings describe a computation, so asking for them always recomputes
+    if not timings:
+        # The SQLite tier may wait on other processes' writes, so it is read off the event loop
+        tier, result = "memory", cache.lookup_memory(key)
+        if result is None and cache.shared:
+            tier, result = "sqlite", await run_in_threadpool(cache.lookup_shared, key)
+        if result is not None:
+            cache_hits_total.inc(tier)
+            if metrics_enabled:
+                requests_total.inc(endpoint)
+                request_seconds.observe(time.perf_counter() - start, endpoint)
+            return result
+        cache_misses_total.inc()
+
+    collect = timings or metrics_enabled
+    result = await get_executor().run("analyze_resume", job, document or resume, collect, fields)
+    stage_timings = result.pop("timings", None)
+    cache.put_memory(key, result)
+    if cache.shared:
+        await run_in_threadpool(cache.put_shared, key, result, version)
+    if not collect:
+        return result
+
+    if metrics_enabled:
+        requests_total.inc(endpoint)
+        request_seconds.observe(time.perf_counter() - start, endpoint)
+        for stage, seconds in stage_timings["stages"].items():
+            stage_seconds.observe(seconds, stage)
+        for name in ("job", "resume"):
+            if name + "_chars" in stage_timings["sizes"]:
+                input_chars.observe(stage_timings["sizes"][name + "_chars"], name)
+    if timings:
+        result["timings"] = stage_timings
+    return result
+
+@app.post("/admin/taxonomy/reload")
+async def reload_taxonomy(request: Request):
+    """
+    Reload the skill taxonomy from TAXONOMY_PATH without restarting the service
+    """
+    if not admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled, set ADMIN_TOKEN")
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    if not reviewer_options["taxonomy"]:
+        raise HTTPException(status_code=400, detail="No taxonomy configured, set TAXONOMY_PATH")
+
+    # Build the new reviewer first so a broken file leaves the running one in place
+    try:
+        reviewer = await run_in_threadpool(ResumeReviewer, **reviewer_options)
+    except (OSError, ValueError) as exc:
+        raise HTTPException(status_code=422, detail="Could not load taxonomy: %s" % exc)
+    await run_in_threadpool(use_reviewer, reviewer)
+    # Indexes keep the skills of the old taxonomy; they answer 409 until cleared and rebuilt
+    stale = [name for name in ("resume_index", "job_index")
+             if len(services.get(name) or ()) and services[name].taxonomy_version != reviewer.taxonomy_version]
+    return {"taxonomy_version": reviewer.taxonomy_version, "skills": len(reviewer.skill_keywords),
+            "stale_indexes": stale}
+
+@app.post("/analyze_resume", response_model=TimedResumeResult, response_model_exclude_none=True)
+async def analyze_resume(input_data: ResumeInput, timings: bool = False, detail: str = "full",
+                         fields: Optional[str] = None):
+    """
+    Analyze a resume against a job description (timings=true adds per-stage durations,
+    detail=summary or fields=a,b limit the result to those fields)
     """
     if not input_data.job_description or not input_data.resume:
         raise HTTPException(status_code=400, detail="Both job description and resume are required")
+    fields = requested_fields(detail, fields)
+
+    job_description, job_truncated = limit_input("job_description", input_data.job_description)
+    resume, resume_truncated = limit_input("resume", input_data.resume)
 
     # Analyze the resume using our reviewer
-    result = reviewer.analyze_resume(input_data.job_description, input_data.resume)
+    result = await run_analysis("analyze_resume", job_id_for(job_description), job_description, resume, timings,
+                                fields=reviewer_fields(fields))
+    return FastJSONResponse(shape_result(result, fields, job_truncated or resume_truncated))
 
-    # Add recommendations
-    recommendations = []
-    if result['overall_match_score'] < 60:
-        recommendations = [
-            "Your resume needs significant improvement to match this job description.",
-            "Focus on acquiring the missing skills listed above."
-        ]
-    elif result['overall_match_score'] < 80:
-        recommendations = [
-            "Your resume is a moderate match for this position.",
-            "Consider highlighting your relevant experience more prominently.",
-            "Try to incorporate more keywords from the job description."
-        ]
+@app.post("/rank_resumes", response_model=List[RankedResumeResult])
+async def rank_resumes(input_data: RankInput, detail: str = "full", fields: Optional[str] = None):
+    """
+    Rank several resumes against a single job description, best match first
+    (detail=summary or fields=a,b limit each result to those fields)
+    """
+    if not input_data.job_description or not input_data.resumes or not all(input_data.resumes):
+        raise HTTPException(status_code=400, detail="A job description and at least one non-empty resume are required")
+    if input_data.top_k is not None and input_data.top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be a positive integer")
+    fields = requested_fields(detail, fields)
+
+    job_description, job_truncated = limit_input("job_description", input_data.job_description)
+    resumes, truncated = zip(*(limit_input("resume", resume) for resume in input_data.resumes))
+    results = await get_executor().run(
+        "rank_resumes", job_description, list(resumes), input_data.top_k, duplicate_threshold or None,
+        reviewer_fields(fields))
+    shaped = []
+    for result in results:
+        output = shape_result(result, fields, job_truncated or truncated[result['index']])
+        output['index'] = result['index']
+        output['duplicate_of'] = result['duplicate_of']
+        shaped.append(output)
+    return FastJSONResponse(shaped)
+
+@app.post("/jobs", response_model=JobRegistration)
+async def register_job(input_data: JobInput):
+    """
+    Preprocess a job description once and return its id for later analyses
+    """
+    if not input_data.job_description:
+        raise HTTPException(status_code=400, detail="Job description is required")
+
+    job_description, truncated = limit_input("job_description", input_data.job_description)
+    job_id, job = await prepare_job(job_description)
+    return {"job_id": job_id, "skills": job.skills, "truncated": truncated}
+
+async def prepare_job(job_description):
+    """Return (job_id, prepared job), preparing it in the executor unless it is cached"""
+    job = get_job_store().get(job_id_for(job_description))
+    if job is None:
+        job = await get_executor().run("prepare_job", job_description)
+    return get_job_store().register(job_description, job)
+
+@app.post("/jobs/{job_id}/analyze", response_model=TimedResumeResult, response_model_exclude_none=True)
+async def analyze_resume_for_job(job_id: str, input_data: JobResumeInput, timings: bool = False,
+                                 detail: str = "full", fields: Optional[str] = None):
+    """
+    Analyze a resume against a registered job description (timings=true adds per-stage durations,
+    detail=summary or fields=a,b limit the result to those fields)
+    """
+    if not input_data.resume:
+        raise HTTPException(status_code=400, detail="Resume is required")
+    fields = requested_fields(detail, fields)
+
+    job = get_job_store().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+
+    resume, truncated = limit_input("resume", input_data.resume)
+    result = await run_analysis("jobs_analyze", job_id, job, resume, timings, fields=reviewer_fields(fields))
+    return FastJSONResponse(shape_result(result, fields, truncated))
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body iterator reads the request body while the response is sent.
+
+    StreamingResponse normally consumes receive() itself to watch for client
+    disconnects, which would swallow the rest of the request body; here the
+    body iterator is the only reader and sees a disconnect as ClientDisconnect.
+    """
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+async def iter_lines(chunks, max_bytes):
+    """Yield (line number, line) from a byte stream; oversized lines are yielded as None"""
+    buffer = bytearray()
+    number = 0
+    skipping = False
+    async for chunk in chunks:
+        buffer += chunk
+        while True:
+            newline = buffer.find(b"\n")
+            if newline < 0:
+                break
+            line = bytes(buffer[:newline])
+            del buffer[:newline + 1]
+            number += 1
+            if skipping:
+                skipping = False
+            elif len(line) > max_bytes:
+                yield number, None
+            elif line.strip():
+                yield number, line
+        if len(buffer) > max_bytes:
+            if not skipping:
+                yield number + 1, None
+                skipping = True
+            buffer.clear()
+    if buffer.strip() and not skipping:
+        yield number + 1, bytes(buffer)
+
+async def retry_when_busy(function, *args):
+    """Await function(*args), waiting for room in the executor instead of failing with 503"""
+    while True:
+        try:
+            return await function(*args)
+        except ExecutorBusy:
+            await asyncio.sleep(STREAM_BUSY_BACKOFF)
+
+async def analyze_record(number, line, preparing, fields):
+    """Score one NDJSON record, returning its output record"""
+    output = {"line": number}
+    if line is None:
+        output["error"] = "Record is longer than %d bytes" % stream_max_line_bytes
+        return output
+    try:
+        record = json.loads(line)
+    except ValueError:
+        record = None
+    if not isinstance(record, dict):
+        output["error"] = "Record is not a JSON object"
+        return output
+    if "id" in record:
+        output["id"] = record["id"]
+
+    resume = record.get("resume")
+    job_id = record.get("job_id")
+    job_description = record.get("job_description")
+    if not resume or not isinstance(resume, str):
+        output["error"] = "Resume is required"
+        return output
+    try:
+        resume, truncated = limit_input("resume", resume)
+        if not job_id and isinstance(job_description, str):
+            job_description, job_truncated = limit_input("job_description", job_description)
+            truncated = truncated or job_truncated
+    except HTTPException as exc:
+        output["error"] = exc.detail
+        return output
+
+    if job_id:
+        job_id = str(job_id)
+        job = get_job_store().get(job_id)
+        if job is None:
+            output["error"] = "Unknown job id"
+            return output
+    elif job_description and isinstance(job_description, str):
+        # Records for the same new job wait for one preparation instead of each starting their own
+        job_id = job_id_for(job_description)
+        job = get_job_store().get(job_id)
+        if job is None:
+            if job_id not in preparing:
+                preparing[job_id] = asyncio.ensure_future(retry_when_busy(prepare_job, job_description))
+                preparing[job_id].add_done_callback(lambda _: preparing.pop(job_id, None))
+            job = (await preparing[job_id])[1]
     else:
-        recommendations = [
-            "Your resume is a strong match for this position!",
-            "Make sure your resume is well-formatted and error-free.",
-            "Prepare to discuss your experience with the matching skills in interviews."
-        ]
+        output["error"] = "Either job_id or job_description is required"
+        return output
+
+    result = await retry_when_busy(run_analysis, "analyze_stream", job_id, job, resume, False, None,
+                                   reviewer_fields(fields))
+    output["result"] = shape_result(result, fields, truncated)
+    return output
+
+async def stream_analyses(request, fields):
+    """Score NDJSON records from the request body, yielding results in input order"""
+    window_size = stream_window or max(1, get_executor().workers) * 2
+    window = deque()
+    preparing = {}
+
+    def encode(number, task):
+        try:
+            output = task.result()
+        except Exception:
+            output = {"line": number, "error": "Analysis failed"}
+        return dump_json(output) + b"\n"
+
+    try:
+        async for number, line in iter_lines(request.stream(), stream_max_line_bytes):
+            window.append((number, asyncio.ensure_future(analyze_record(number, line, preparing, fields))))
+            # Reading stops while the window is full, which bounds memory whatever the body size
+            if len(window) >= window_size:
+                await asyncio.wait([window[0][1]])
+            while window and window[0][1].done():
+                yield encode(*window.popleft())
+        while window:
+            await asyncio.wait([window[0][1]])
+            yield encode(*window.popleft())
+    finally:
+        for _, task in window:
+            task.cancel()
+
+@app.post("/analyze_stream")
+async def analyze_stream(request: Request, detail: str = "full", fields: Optional[str] = None):
+    """
+    Score newline-delimited JSON records of {"job_description" or "job_id", "resume", optional "id"},
+    streaming one result line per record back in input order
+    """
+    return NDJSONStreamingResponse(stream_analyses(request, requested_fields(detail, fields)))
+
+async def analyze_batch_item(item):
+    """Score one queued batch item, waiting for room in the executor instead of failing"""
+    job_id = job_id_for(item["job_description"])
+    job = get_job_store().get(job_id)
+    if job is None:
+        job = (await retry_when_busy(prepare_job, item["job_description"]))[1]
+    document = AnalyzedDocument(item["document"]) if item["document"] is not None else None
+    result = await retry_when_busy(run_analysis, "batches", job_id, job, item["resume"], False, document,
+                                   reviewer_fields(RESULT_FIELDS))
+    return shape_result(result, RESULT_FIELDS, item["truncated"])
+
+async def group_batch(resumes):
+    """Near-duplicates and preprocessed texts of a batch's resumes, computed a chunk per executor call"""
+    from dedup import DuplicateFinder
+
+    finder = DuplicateFinder(duplicate_threshold)
+    duplicate_of, documents = [], []
+    for start in range(0, len(resumes), BATCH_GROUP_CHUNK):
+        signatures, texts = await retry_when_busy(get_executor().run, "signatures", resumes[start:start + BATCH_GROUP_CHUNK])
+        duplicate_of.extend(finder.add(start + offset, signature) for offset, signature in enumerate(signatures))
+        documents.extend(texts)
+    return duplicate_of, documents
+
+@app.post("/batches", response_model=BatchSubmission, status_code=202)
+async def submit_batch(input_data: BatchInput):
+    """
+    Queue resumes for scoring against a job description and return the batch id right away
+    """
+    if not input_data.job_description:
+        raise HTTPException(status_code=400, detail="Job description is required")
+    if not input_data.resumes or not all(input_data.resumes):
+        raise HTTPException(status_code=400, detail="At least one resume is required and none may be empty")
+    if input_data.max_concurrency is not None and input_data.max_concurrency < 1:
+        raise HTTPException(status_code=400, detail="max_concurrency must be a positive integer")
+
+    runner = get_batch_runner()
+    job_description, job_truncated = limit_input("job_description", input_data.job_description)
+    resumes, truncated = zip(*(limit_input("resume", resume) for resume in input_data.resumes))
+    truncated = [job_truncated or cut for cut in truncated]
+    # Near-duplicates are found by the batch runner, which keeps the preprocessed resumes for their analyses
+    batch_id = await run_in_threadpool(
+        get_batch_queue().create, job_description, list(resumes),
+        input_data.max_concurrency or runner.max_per_batch, truncated, None, None,
+        bool(duplicate_threshold) and len(resumes) > 1
+    )
+    runner.start()
+    return {
+        "batch_id": batch_id,
+        "total": len(resumes),
+        "truncated": [index for index, cut in enumerate(truncated) if cut]
+    }
 
-    result['recommendations'] = recommendations
+@app.get("/batches/{batch_id}")
+async def get_batch(batch_id: str, offset: int = 0, limit: int = 100, detail: str = "full",
+                    fields: Optional[str] = None):
+    """
+    Progress of a batch and the results finished so far, by resume index
+    (detail=summary or fields=a,b limit each result to those fields)
+    """
+    if offset < 0 or limit < 1:
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit positive")
+    fields = requested_fields(detail, fields)
+    batch = await run_in_threadpool(get_batch_queue().get, batch_id, offset, limit)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Unknown batch id")
+    if fields != RESULT_FIELDS:
+        for entry in batch["results"]:
+            if "result" in entry:
+                entry["result"] = shape_result(entry["result"], fields, entry["result"]["truncated"])
+    return FastJSONResponse(batch)
+
+# Documents preprocessed, searched for skills and vectorized per executor call for the indexes
+INDEX_CHUNK = 32
+
+async def prepare_documents(texts):
+    """Documents for the indexes, prepared in the executor a chunk per call so they count towards its queue"""
+    prepared = []
+    for start in range(0, len(texts), INDEX_CHUNK):
+        prepared += await get_executor().run("prepare_documents", texts[start:start + INDEX_CHUNK])
+    return prepared
+
+async def run_on_index(function, *args):
+    """Run an index operation in the threadpool, answering 409 if the index is stale"""
+    from resume_index import StaleIndexError
+
+    try:
+        return await run_in_threadpool(function, *args)
+    except StaleIndexError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+@app.post("/index/resumes")
+async def index_resumes(input_data: IndexResumesInput):
+    """
+    Add resumes to the candidate index, replacing any with the same id
+    """
+    if not input_data.resumes or not all(item.id and item.resume for item in input_data.resumes):
+        raise HTTPException(status_code=400, detail="Every resume needs an id and text")
+
+    items = [(item.id,) + limit_input("resume", item.resume) for item in input_data.resumes]
+    documents = await prepare_documents([resume for _, resume, _ in items])
+    duplicates = await run_on_index(
+        get_resume_index().add_many, [(resume_id, document) for (resume_id, _, _), document in zip(items, documents)])
+    return {
+        "indexed": len(items),
+        "size": len(get_resume_index()),
+        "truncated": [resume_id for resume_id, _, truncated in items if truncated],
+        "duplicates": duplicates
+    }
+
+@app.delete("/index/resumes")
+async def clear_resume_index():
+    """
+    Remove every resume from the candidate index, e.g. to rebuild it after a taxonomy change
+    """
+    return {"deleted": await run_in_threadpool(get_resume_index().clear), "size": 0}
+
+@app.delete("/index/resumes/{resume_id}")
+async def delete_indexed_resume(resume_id: str):
+    """
+    Remove a resume from the candidate index
+    """
+    if not await run_in_threadpool(get_resume_index().delete, resume_id):
+        raise HTTPException(status_code=404, detail="Unknown resume id")
+    return {"deleted": resume_id, "size": len(get_resume_index())}
+
+@app.post("/search", response_model=List[SearchResult])
+async def search_resumes(input_data: SearchInput, response: Response):
+    """
+    Find the indexed resumes that best match a job description
+    """
+    if not input_data.job_description:
+        raise HTTPException(status_code=400, detail="Job description is required")
+    if input_data.top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be a positive integer")
+
+    job_description, truncated = limit_input("job_description", input_data.job_description)
+    report_truncation(response, truncated)
+    [job] = await prepare_documents([job_description])
+    return await run_on_index(get_resume_index().search, job, input_data.top_k)
+
+@app.post("/index/jobs")
+async def index_jobs(input_data: IndexJobsInput):
+    """
+    Add job postings to the posting index, replacing any with the same id
+    """
+    if not input_data.jobs or not all(item.id and item.job_description for item in input_data.jobs):
+        raise HTTPException(status_code=400, detail="Every job needs an id and a description")
+
+    items = [(item.id,) + limit_input("job_description", item.job_description) for item in input_data.jobs]
+    documents = await prepare_documents([job for _, job, _ in items])
+    await run_on_index(
+        get_job_index().add_many, [(job_id, document) for (job_id, _, _), document in zip(items, documents)])
+    return {
+        "indexed": len(items),
+        "size": len(get_job_index()),
+        "truncated": [job_id for job_id, _, truncated in items if truncated]
+    }
+
+@app.delete("/index/jobs")
+async def clear_job_index():
+    """
+    Remove every job posting from the posting index
+    """
+    return {"deleted": await run_in_threadpool(get_job_index().clear), "size": 0}
+
+@app.delete("/index/jobs/{posting_id}")
+async def delete_indexed_job(posting_id: str):
+    """
+    Remove a job posting from the posting index
+    """
+    if not await run_in_threadpool(get_job_index().delete, posting_id):
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return {"deleted": posting_id, "size": len(get_job_index())}
+
+@app.post("/match_jobs", response_model=List[JobMatch])
+async def match_jobs(input_data: MatchJobsInput, response: Response):
+    """
+    Find the indexed job postings that best match a resume
+    """
+    if not input_data.resume:
+        raise HTTPException(status_code=400, detail="Resume is required")
+    if input_data.top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be a positive integer")
+    if not 0 <= input_data.min_skill_match <= 1:
+        raise HTTPException(status_code=400, detail="min_skill_match must be between 0 and 1")
+
+    resume, truncated = limit_input("resume", input_data.resume)
+    report_truncation(response, truncated)
+    [document] = await prepare_documents([resume])
+    results, _ = await run_on_index(get_job_index().match, document, input_data.top_k,
+                                    input_data.min_skill_match)
+    return results
+
+@app.get("/analytics/skills")
+async def skill_frequencies(top: Optional[int] = 50):
+    """
+    The most common skills across the indexed resumes
+    """
+    if top is not None and top < 1:
+        raise HTTPException(status_code=400, detail="top must be a positive integer")
+    return await run_on_index(get_skill_analytics().skill_frequencies, top)
+
+@app.post("/analytics/skill_gaps")
+async def skill_gaps(input_data: SkillGapsInput):
+    """
+    How many indexed resumes have each skill of a job description, rarest first
+    """
+    if not input_data.job_description:
+        raise HTTPException(status_code=400, detail="Job description is required")
+
+    job_description, truncated = limit_input("job_description", input_data.job_description)
+    [job] = await prepare_documents([job_description])
+    analytics = get_skill_analytics()
+
+    def gaps():
+        reviewer = analytics.index.reviewer
+        if job.taxonomy_version == reviewer.taxonomy_version:
+            return analytics.skill_gaps(job.skills)
+        return analytics.skill_gaps(reviewer.extract_skills(job.document))
+
+    result = await run_on_index(gaps)
+    result["truncated"] = truncated
     return result
 
+@app.get("/analytics/categories")
+async def category_coverage():
+    """
+    Coverage of every skill category across the indexed resumes
+    """
+    return await run_on_index(get_skill_analytics().category_coverage)
+
 def get_recommendations(score: float) -> List[str]:
     if score < 60:
         return [
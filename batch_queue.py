@@ -0,0 +1,310 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class BatchQueue:
+    """Batches of resumes scored against one job, queued in SQLite.
+
+    Every resume is an item that moves from "queued" to "running" when a
+    worker claims it and to "done" or "failed" with its result or error.
+    Batches created with group=True start "grouping" until group() records
+    their near-duplicates. A near-duplicate of an earlier resume in the
+    batch then "waits" instead and gets a copy of that resume's result once
+    it is finished.
+    With a path the queue is a file, so batches survive restarts: items
+    that were running when the process stopped are queued again on open.
+    Without one the queue lives in memory.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False, isolation_level=None, timeout=5)
+        if path:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS batches ("
+            "id TEXT PRIMARY KEY, job_description TEXT NOT NULL, max_concurrency INTEGER NOT NULL, "
+            "total INTEGER NOT NULL, pending INTEGER NOT NULL, created REAL NOT NULL, finished REAL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            "batch_id TEXT NOT NULL, position INTEGER NOT NULL, resume TEXT NOT NULL, truncated INTEGER NOT NULL, "
+            "status TEXT NOT NULL, result TEXT, error TEXT, duplicate_of INTEGER, document TEXT, "
+            "PRIMARY KEY (batch_id, position))"
+        )
+        # Queues written before near-duplicate detection lack the last two columns
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(items)")]
+        for column, column_type in (("duplicate_of", "INTEGER"), ("document", "TEXT")):
+            if column not in columns:
+                self._db.execute("ALTER TABLE items ADD COLUMN %s %s" % (column, column_type))
+        self._db.execute("CREATE INDEX IF NOT EXISTS items_status ON items (status, batch_id, position)")
+        self._db.execute("UPDATE items SET status = 'queued' WHERE status = 'running'")
+
+    def create(self, job_description, resumes, max_concurrency, truncated=None, duplicate_of=None, documents=None,
+               group=False):
+        """Queue resumes against a job description and return the new batch id.
+
+        duplicate_of gives, for every resume, the position of the earlier
+        resume whose result it reuses, or None. documents optionally holds
+        the already preprocessed text of every resume. With group=True no
+        item is claimed before group() has been called for the batch.
+        """
+        batch_id = uuid.uuid4().hex
+        truncated = truncated or [False] * len(resumes)
+        duplicate_of = duplicate_of or [None] * len(resumes)
+        documents = documents or [None] * len(resumes)
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "INSERT INTO batches VALUES (?, ?, ?, ?, ?, ?, NULL)",
+                (batch_id, job_description, max_concurrency, len(resumes), len(resumes), time.time())
+            )
+            self._db.executemany(
+                "INSERT INTO items VALUES (?, ?, ?, ?, ?, NULL, NULL, ?, ?)",
+                ((batch_id, position, resume, int(cut),
+                  "grouping" if group else "queued" if duplicate is None else "waiting", duplicate,
+                  document if duplicate is None else None)
+                 for position, (resume, cut, duplicate, document)
+                 in enumerate(zip(resumes, truncated, duplicate_of, documents)))
+            )
+            self._db.execute("COMMIT")
+        return batch_id
+
+    def ungrouped(self):
+        """Ids of the batches waiting for group(), oldest first"""
+        with self._lock:
+            return [row[0] for row in self._db.execute(
+                "SELECT id FROM batches WHERE EXISTS "
+                "(SELECT 1 FROM items WHERE items.batch_id = batches.id AND status = 'grouping') ORDER BY created"
+            )]
+
+    def resumes(self, batch_id):
+        """The resumes of a batch, by position"""
+        with self._lock:
+            return [row[0] for row in self._db.execute(
+                "SELECT resume FROM items WHERE batch_id = ? ORDER BY position", (batch_id,)
+            )]
+
+    def group(self, batch_id, duplicate_of=None, documents=None):
+        """Record the near-duplicates (and preprocessed texts) of a grouping batch and queue its items"""
+        total = len(duplicate_of or documents or ())
+        duplicate_of = duplicate_of or [None] * total
+        documents = documents or [None] * total
+        with self._lock:
+            self._db.execute("BEGIN")
+            if not total:
+                self._db.execute("UPDATE items SET status = 'queued' WHERE batch_id = ? AND status = 'grouping'",
+                                 (batch_id,))
+            self._db.executemany(
+                "UPDATE items SET status = ?, duplicate_of = ?, document = ? "
+                "WHERE batch_id = ? AND position = ? AND status = 'grouping'",
+                (("queued" if duplicate is None else "waiting", duplicate, document if duplicate is None else None,
+                  batch_id, position)
+                 for position, (duplicate, document) in enumerate(zip(duplicate_of, documents)))
+            )
+            self._db.execute("COMMIT")
+
+    def claim(self, limit, max_per_batch):
+        """Mark up to limit queued items running and return them as dicts.
+
+        Batches are served oldest first, each with at most its own
+        max_concurrency (capped at max_per_batch) items running at once.
+        """
+        claimed = []
+        with self._lock:
+            self._db.execute("BEGIN")
+            batches = self._db.execute(
+                "SELECT id, job_description, max_concurrency, "
+                "(SELECT count(*) FROM items WHERE items.batch_id = batches.id AND status = 'running') "
+                "FROM batches WHERE pending > 0 ORDER BY created"
+            ).fetchall()
+            for batch_id, job_description, max_concurrency, running in batches:
+                room = min(limit - len(claimed), min(max_concurrency, max_per_batch) - running)
+                if room <= 0:
+                    continue
+                rows = self._db.execute(
+                    "SELECT position, resume, truncated, document FROM items "
+                    "WHERE status = 'queued' AND batch_id = ? ORDER BY position LIMIT ?", (batch_id, room)
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE items SET status = 'running' WHERE batch_id = ? AND position = ?",
+                    ((batch_id, row[0]) for row in rows)
+                )
+                claimed.extend({
+                    "batch_id": batch_id, "position": position, "job_description": job_description,
+                    "resume": resume, "truncated": bool(truncated), "document": document
+                } for position, resume, truncated, document in rows)
+                if len(claimed) >= limit:
+                    break
+            self._db.execute("COMMIT")
+        return claimed
+
+    def finish(self, batch_id, position, result=None, error=None):
+        """Store the result (or error) of a running item and of the items duplicating it"""
+        with self._lock:
+            self._db.execute("BEGIN")
+            finished = self._db.execute(
+                "UPDATE items SET status = ?, result = ?, error = ? "
+                "WHERE batch_id = ? AND (position = ? OR duplicate_of = ?)",
+                ("failed" if error else "done", None if error else json.dumps(result), error, batch_id, position, position)
+            ).rowcount
+            self._db.execute(
+                "UPDATE batches SET pending = pending - ?, "
+                "finished = CASE WHEN pending = ? THEN ? ELSE finished END WHERE id = ?",
+                (finished, finished, time.time(), batch_id)
+            )
+            self._db.execute("COMMIT")
+
+    def has_pending(self):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM batches WHERE pending > 0 LIMIT 1").fetchone() is not None
+
+    def get(self, batch_id, offset=0, limit=100):
+        """Progress of a batch with the results of items offset..offset+limit, or None if it is unknown"""
+        with self._lock:
+            batch = self._db.execute(
+                "SELECT total, created, finished FROM batches WHERE id = ?", (batch_id,)
+            ).fetchone()
+            if batch is None:
+                return None
+            counts = dict(self._db.execute(
+                "SELECT status, count(*) FROM items WHERE batch_id = ? GROUP BY status", (batch_id,)
+            ).fetchall())
+            duplicates = self._db.execute(
+                "SELECT count(*) FROM items WHERE batch_id = ? AND duplicate_of IS NOT NULL", (batch_id,)
+            ).fetchone()[0]
+            rows = self._db.execute(
+                "SELECT position, status, result, error, duplicate_of FROM items WHERE batch_id = ? AND position >= ? "
+                "AND status IN ('done', 'failed') ORDER BY position LIMIT ?", (batch_id, offset, limit)
+            ).fetchall()
+
+        total, created, finished = batch
+        queued = counts.get("queued", 0) + counts.get("waiting", 0) + counts.get("grouping", 0)
+        if finished is not None:
+            status = "completed"
+        elif queued == total:
+            status = "queued"
+        else:
+            status = "running"
+        results = []
+        for position, item_status, result, error, duplicate_of in rows:
+            item = {"index": position}
+            if item_status == "done":
+                item["result"] = json.loads(result)
+            else:
+                item["error"] = error
+            if duplicate_of is not None:
+                item["duplicate_of"] = duplicate_of
+            results.append(item)
+        return {
+            "batch_id": batch_id,
+            "status": status,
+            "total": total,
+            "queued": queued,
+            "running": counts.get("running", 0),
+            "completed": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "duplicates": duplicates,
+            "created_at": created,
+            "finished_at": finished,
+            "results": results
+        }
+
+    def close(self):
+        self._db.close()
+
+
+class BatchRunner:
+    """Works through a BatchQueue on the event loop.
+
+    At most concurrency items are analyzed at once across all batches, and
+    at most max_per_batch of one batch, so a large batch neither holds every
+    slot nor fills the analysis queue that interactive requests share.
+    analyze(item) is awaited for every item and returns its result;
+    exceptions are stored as the item's error.
+
+    Batches created with group=True are grouped first: group(resumes) is
+    awaited for one batch at a time, taking one of the concurrency slots,
+    and returns the (duplicate_of, documents) to record. If it fails the
+    batch is analyzed without near-duplicate detection.
+    """
+    def __init__(self, queue, analyze, concurrency=1, max_per_batch=1, group=None):
+        self.queue = queue
+        self.analyze = analyze
+        self.group = group
+        self.concurrency = concurrency
+        self.max_per_batch = max_per_batch
+        self._tasks = set()
+        self._grouping = None
+        self._wakeup = None
+        self._loop_task = None
+
+    def start(self):
+        """Start (or wake) the dispatch loop on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop_task is None or self._loop_task.done() or self._loop_task.get_loop() is not loop:
+            self._tasks = set()
+            self._grouping = None
+            self._wakeup = asyncio.Event()
+            self._loop_task = asyncio.ensure_future(self._dispatch())
+        self._wakeup.set()
+
+    async def _dispatch(self):
+        while True:
+            self._wakeup.clear()
+            if self._grouping is None and len(self._tasks) < self.concurrency:
+                batch_ids = self.queue.ungrouped()
+                if batch_ids:
+                    self._grouping = asyncio.ensure_future(self._group(batch_ids[0]))
+                    self._tasks.add(self._grouping)
+                    self._grouping.add_done_callback(self._done)
+            room = self.concurrency - len(self._tasks)
+            if room > 0:
+                for item in self.queue.claim(room, self.max_per_batch):
+                    task = asyncio.ensure_future(self._process(item))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._done)
+            await self._wakeup.wait()
+
+    def _done(self, task):
+        self._tasks.discard(task)
+        if task is self._grouping:
+            self._grouping = None
+        self._wakeup.set()
+
+    async def _group(self, batch_id):
+        grouping = None
+        if self.group is not None:
+            try:
+                grouping = await self.group(self.queue.resumes(batch_id))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass
+        self.queue.group(batch_id, *(grouping or ()))
+
+    async def _process(self, item):
+        try:
+            result = await self.analyze(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.queue.finish(item["batch_id"], item["position"], error="Analysis failed")
+        else:
+            self.queue.finish(item["batch_id"], item["position"], result=result)
+
+    async def stop(self):
+        """Stop dispatching; items still running are queued again when the queue is next opened"""
+        tasks = list(self._tasks)
+        if self._loop_task is not None:
+            tasks.append(self._loop_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+        self._grouping = None
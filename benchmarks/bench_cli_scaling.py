@@ -0,0 +1,56 @@
+"""Throughput of the bulk scorer (cli.py score) as the worker count grows.
+
+Scores the same synthetic resumes with 1, 2, 4, ... workers up to the
+number of cores and reports resumes/sec, speedup over one worker and
+parallel efficiency.
+
+    python -m benchmarks.bench_cli_scaling --resumes 2000 --preprocessing fast
+"""
+import argparse
+import os
+import tempfile
+
+from cli import score_resumes
+from resume_reviewer import ResumeReviewer
+from benchmarks.synthetic import SyntheticCorpus
+
+
+def worker_counts(maximum):
+    counts = []
+    count = 1
+    while count < maximum:
+        counts.append(count)
+        count *= 2
+    return counts + [maximum]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=600, help="words per resume")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--preprocessing", default="nltk")
+    parser.add_argument("--vectorizer-mode", default=None)
+    args = parser.parse_args()
+
+    reviewer_options = {"preprocessing": args.preprocessing, "vectorizer_mode": args.vectorizer_mode}
+    corpus = SyntheticCorpus(ResumeReviewer(), seed=0)
+    job = corpus.job()
+    resumes = [(str(index), corpus.resume(args.words)) for index in range(args.resumes)]
+
+    print("%-8s %14s %9s %11s" % ("workers", "resumes/sec", "speedup", "efficiency"))
+    baseline = None
+    with tempfile.TemporaryDirectory() as directory:
+        for workers in worker_counts(args.max_workers):
+            output = os.path.join(directory, "scores-%d.jsonl" % workers)
+            # Worker start-up (imports, NLTK corpora) is part of every run, as it is for real jobs
+            scored, _, seconds = score_resumes(job, resumes, output, workers=workers,
+                                               batch_size=args.batch_size, reviewer_options=reviewer_options)
+            rate = scored / seconds
+            baseline = baseline or rate
+            print("%-8d %14.1f %8.2fx %10.0f%%" % (workers, rate, rate / baseline, 100 * rate / baseline / workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Time and peak memory of analyzing very large resumes.
+
+Compares the fast and chunked preprocessing modes on synthetic resumes of
+growing size, and analyze_resume on the same input after truncation to the
+service's default input limit.
+
+    python -m benchmarks.bench_large_inputs --sizes 100000 1000000 5000000
+"""
+import argparse
+import time
+import tracemalloc
+
+from resume_reviewer import ResumeReviewer, truncate_text
+from benchmarks.synthetic import SyntheticCorpus
+
+
+def measure(function, *args):
+    """(seconds, peak MiB allocated) of one call"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    function(*args)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000, 5000000], help="resume sizes in characters")
+    parser.add_argument("--max-chars", type=int, default=100000, help="input limit for the truncated run")
+    args = parser.parse_args()
+
+    reviewers = {mode: ResumeReviewer(preprocessing=mode) for mode in ("fast", "chunked")}
+    corpus = SyntheticCorpus(reviewers["fast"], seed=0)
+    job = corpus.job()
+    sample = corpus.resume(20000)
+
+    print("%-10s %-8s %14s %12s %16s" % ("chars", "mode", "preprocess (s)", "peak (MiB)", "analyze (s)"))
+    for size in args.sizes:
+        resume = (sample * (size // len(sample) + 1))[:size]
+        for mode, reviewer in reviewers.items():
+            reviewer.analyze_document(sample)
+            seconds, peak = measure(reviewer.analyze_document, resume)
+            analyze_seconds, _ = measure(reviewer.analyze_resume, job, resume)
+            print("%-10d %-8s %14.3f %12.1f %16.3f" % (size, mode, seconds, peak, analyze_seconds))
+        truncated = truncate_text(resume, args.max_chars)
+        analyze_seconds, peak = measure(reviewers["fast"].analyze_resume, job, truncated)
+        print("%-10d %-8s %14s %12.1f %16.3f" % (size, "limit", "-", peak, analyze_seconds))
+
+
+if __name__ == "__main__":
+    main()
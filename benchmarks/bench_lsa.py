@@ -0,0 +1,127 @@
+"""Accuracy and ranking throughput of the lsa vectorizer against TF-IDF.
+
+Fits a TF-IDF model and an LSA model (the same TF-IDF plus a TruncatedSVD)
+on synthetic resumes and job descriptions, then reports:
+
+- accuracy: how closely LSA similarities follow calculate_similarity in the
+  default pairwise mode and with the fitted TF-IDF model (Pearson
+  correlation, mean absolute difference in score points, top-10 overlap
+  when ranking a pool per job), and the share of each method's top 10 that
+  belongs to the job's category
+- throughput: a ResumeIndex of --resumes resumes per vectorizer, with the
+  size of the stored vectors, the similarity product alone and a full
+  search per job
+
+    python -m benchmarks.bench_lsa --resumes 100000 --components 256
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from resume_index import ResumeIndex, dense_row
+from resume_reviewer import ResumeReviewer
+from benchmarks.synthetic import SyntheticCorpus
+
+
+def top(similarities, count=10):
+    return set(np.argsort(-np.asarray(similarities), kind='stable')[:count])
+
+
+def accuracy(reviewers, corpus, jobs, pool_size):
+    """Similarity of every reviewer for jobs x a shared pool of categorised resumes"""
+    categories = [corpus.rng.choice(corpus.categories) for _ in range(pool_size)]
+    pool = [reviewers["pairwise"].analyze_document(corpus.resume(600, category)) for category in categories]
+    similarities = {name: [] for name in reviewers}
+    in_category = {name: [] for name in reviewers}
+    for category in corpus.categories[:jobs]:
+        job = corpus.job(200, category)
+        for name, reviewer in reviewers.items():
+            ranked = reviewer.rank_resumes(job, pool)
+            scores = [0.0] * len(pool)
+            for result in ranked:
+                scores[result["index"]] = result["similarity_score"]
+            similarities[name].append(scores)
+            in_category[name].append(np.mean([categories[index] == category for index in top(scores)]))
+    return similarities, in_category
+
+
+def vector_bytes(vectors):
+    if isinstance(vectors, np.ndarray):
+        return vectors.nbytes
+    return vectors.data.nbytes + vectors.indices.nbytes + vectors.indptr.nbytes
+
+
+def median_ms(function, *args, runs=5):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function(*args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=100000, help="resumes in each index")
+    parser.add_argument("--components", type=int, default=256)
+    parser.add_argument("--fit-documents", type=int, default=5000, help="corpus size for fitting both models")
+    parser.add_argument("--jobs", type=int, default=10, help="jobs for the accuracy comparison and searches")
+    parser.add_argument("--pool", type=int, default=500, help="resumes ranked per job for the accuracy comparison")
+    parser.add_argument("--chunk", type=int, default=5000, help="resumes generated and indexed at a time")
+    parser.add_argument("--preprocessing", default="fast")
+    args = parser.parse_args()
+
+    pairwise = ResumeReviewer(preprocessing=args.preprocessing)
+    corpus = SyntheticCorpus(pairwise, seed=0)
+    texts = [corpus.resume(600) if number % 2 else corpus.job(200) for number in range(args.fit_documents)]
+    fitted = ResumeReviewer(preprocessing=args.preprocessing)
+    fitted.fit_model(texts, min_df=2)
+    lsa = ResumeReviewer(preprocessing=args.preprocessing)
+    start = time.perf_counter()
+    lsa.fit_model(texts, components=args.components, min_df=2)
+    print("fitted %d LSA components on %d documents (%d terms) in %.1f s" % (
+        args.components, len(texts), len(lsa.vectorizer.vocabulary_), time.perf_counter() - start))
+
+    reviewers = {"pairwise": pairwise, "fitted": fitted, "lsa": lsa}
+    similarities, in_category = accuracy(reviewers, corpus, args.jobs, args.pool)
+    lsa_scores = np.concatenate(similarities["lsa"])
+    print()
+    print("%-32s %12s %14s %16s" % ("lsa vs", "correlation", "mean |diff|", "top-10 overlap"))
+    for name in ("pairwise", "fitted"):
+        scores = np.concatenate(similarities[name])
+        overlap = np.mean([len(top(mine) & top(theirs)) / 10
+                           for mine, theirs in zip(similarities["lsa"], similarities[name])])
+        print("%-32s %12.3f %14.1f %15.0f%%" % (
+            name + " calculate_similarity", np.corrcoef(lsa_scores, scores)[0, 1],
+            np.mean(np.abs(lsa_scores - scores)), overlap * 100))
+    print()
+    print("%-10s %28s" % ("method", "top 10 in the job's category"))
+    for name in reviewers:
+        print("%-10s %27.0f%%" % (name, np.mean(in_category[name]) * 100))
+
+    indexes = {"fitted": ResumeIndex(fitted), "lsa": ResumeIndex(lsa)}
+    build_seconds = dict.fromkeys(indexes, 0.0)
+    for first in range(0, args.resumes, args.chunk):
+        documents = [pairwise.analyze_document(corpus.resume(600)) for _ in range(min(args.chunk, args.resumes - first))]
+        items = [("resume-%d" % (first + offset), document) for offset, document in enumerate(documents)]
+        for name, index in indexes.items():
+            start = time.perf_counter()
+            index.add_many(items)
+            build_seconds[name] += time.perf_counter() - start
+    jobs = [corpus.job(200) for _ in range(args.jobs)]
+
+    print()
+    print("%-8s %10s %14s %16s %16s" % ("index", "build s", "vectors MB", "product ms/job", "search ms/job"))
+    for name, index in indexes.items():
+        index.search(jobs[0])
+        prepared = [index.reviewer.prepare_job(job) for job in jobs]
+        product_ms = statistics.median(median_ms(lambda: index.vectors @ dense_row(job.vector)) for job in prepared)
+        search_ms = statistics.median(median_ms(index.search, job, runs=1) for job in prepared)
+        print("%-8s %10.1f %14.1f %16.2f %16.2f" % (
+            name, build_seconds[name], vector_bytes(index.vectors) / 2 ** 20, product_ms, search_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Latency of matching one resume against a pool of job postings.
+
+Indexes synthetic postings in a JobIndex and compares, per resume:
+JobIndex.match (skill-pruned), the same scoring over every posting, and
+calling analyze_resume once per posting (timed on a sample and scaled to
+the pool).
+
+    python -m benchmarks.bench_match_jobs --postings 20000
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from job_index import JobIndex
+from resume_index import dense_row
+from resume_reviewer import ResumeReviewer, combine_scores
+from benchmarks.synthetic import SyntheticCorpus
+
+
+def full_scan(index, resume):
+    """Score every posting, as match() would without the inverted index"""
+    reviewer = index.reviewer
+    document = reviewer.analyze_document(resume)
+    resume_skills = set(reviewer.extract_skills(document))
+    education, experience = reviewer.keyword_scores(document)
+    with index._lock:
+        index._materialize()
+    skills = index.skills
+    skill_ids = [index._skill_ids[skill] for skill in resume_skills if skill in index._skill_ids]
+    overlap = np.asarray(skills[:, skill_ids].sum(axis=1)).ravel()
+    skill_matches = overlap / np.maximum(np.diff(skills.indptr), 1)
+    similarities = index.vectors @ dense_row(reviewer.vectorize([document]))
+    overall = combine_scores(similarities, skill_matches, education, experience)
+    return np.argsort(-overall)[:10]
+
+
+def median_ms(function, *args, runs=1):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function(*args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--postings", type=int, default=20000)
+    parser.add_argument("--resumes", type=int, default=20, help="resumes to match")
+    parser.add_argument("--sample", type=int, default=200, help="postings timed with analyze_resume")
+    parser.add_argument("--preprocessing", default="fast")
+    args = parser.parse_args()
+
+    reviewer = ResumeReviewer(vectorizer_mode="hashing", preprocessing=args.preprocessing)
+    corpus = SyntheticCorpus(reviewer, seed=0)
+    postings = [("job-%d" % number, corpus.job(200)) for number in range(args.postings)]
+    resumes = [corpus.resume(600) for _ in range(args.resumes)]
+
+    index = JobIndex(reviewer)
+    start = time.perf_counter()
+    index.add_many(postings)
+    index.match(resumes[0])
+    print("indexed %d postings in %.1f s" % (len(index), time.perf_counter() - start))
+
+    match_ms, scan_ms, candidates = [], [], []
+    for resume in resumes:
+        start = time.perf_counter()
+        candidates.append(index.match(resume)[1])
+        match_ms.append((time.perf_counter() - start) * 1000)
+        scan_ms.append(median_ms(full_scan, index, resume))
+    job = [reviewer.prepare_job(text) for _, text in postings[:args.sample]]
+    per_posting_ms = median_ms(lambda: [reviewer.analyze_resume(prepared, resumes[0]) for prepared in job]) / len(job)
+
+    print("%-34s %12s" % ("method", "ms/resume"))
+    print("%-34s %12.1f   (%.0f%% of postings scored)" % (
+        "JobIndex.match", statistics.median(match_ms), 100 * statistics.median(candidates) / len(index)))
+    print("%-34s %12.1f" % ("vectorized scan of every posting", statistics.median(scan_ms)))
+    print("%-34s %12.0f   (estimated)" % ("analyze_resume per posting", per_posting_ms * len(index)))
+
+
+if __name__ == "__main__":
+    main()
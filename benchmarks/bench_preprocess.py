@@ -0,0 +1,48 @@
+"""Preprocessing throughput (tokens/sec) of the nltk and fast modes.
+
+    python -m benchmarks.bench_preprocess --documents 200 --words 700
+"""
+import argparse
+import time
+
+from resume_reviewer import ResumeReviewer
+from benchmarks.synthetic import SyntheticCorpus
+
+
+def sample_corpus(reviewer, documents, words, seed=0):
+    corpus = SyntheticCorpus(reviewer, seed)
+    return [corpus.resume(words) for _ in range(documents)]
+
+
+def tokens_per_second(reviewer, corpus):
+    token_count = sum(len(text.split()) for text in corpus)
+    start = time.perf_counter()
+    for text in corpus:
+        reviewer.preprocess_text(text)
+    return token_count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--words", type=int, default=700, help="words per document")
+    args = parser.parse_args()
+
+    nltk_reviewer = ResumeReviewer()
+    fast_reviewer = ResumeReviewer(preprocessing="fast")
+    corpus = sample_corpus(nltk_reviewer, args.documents, args.words)
+
+    # Warm both paths (WordNet loading, lemma cache) on a different sample first
+    for reviewer in (nltk_reviewer, fast_reviewer):
+        tokens_per_second(reviewer, sample_corpus(reviewer, 5, args.words, seed=1))
+
+    baseline = tokens_per_second(nltk_reviewer, corpus)
+    fast = tokens_per_second(fast_reviewer, corpus)
+    print("%-6s %14s" % ("mode", "tokens/sec"))
+    print("%-6s %14.0f" % ("nltk", baseline))
+    print("%-6s %14.0f  (%.1fx)" % ("fast", fast, fast / baseline))
+    print("lemma cache: %s" % (fast_reviewer.lemmatize.cache_info(),))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Response size and encoding time of /rank_resumes results at each detail level.
+
+Ranks synthetic resumes against one job with the fields each level needs,
+shapes the results like the endpoint does and encodes them three ways:
+validated against the response model and encoded by the standard library
+(the path responses took before FastJSONResponse), the standard library
+alone, and orjson (when installed). "full (before)" is the full result
+with the skill category breakdowns the endpoint used to compute and
+discard.
+
+    python -m benchmarks.bench_serialization --resumes 1000
+"""
+import argparse
+import statistics
+import time
+from typing import List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+import app
+from resume_reviewer import ResumeReviewer
+from benchmarks.synthetic import SyntheticCorpus
+
+
+def median_ms(function, runs=5):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def ranked(reviewer, job, resumes, reviewer_fields, fields):
+    """Time rank_resumes and shape its results as /rank_resumes does"""
+    start = time.perf_counter()
+    results = reviewer.rank_resumes(job, resumes, None, None, reviewer_fields)
+    seconds = time.perf_counter() - start
+    shaped = []
+    for result in results:
+        output = app.shape_result(result, fields, False)
+        if reviewer_fields is None:
+            output["skill_categories"] = result["skill_categories"]
+        output["index"] = result["index"]
+        output["duplicate_of"] = result["duplicate_of"]
+        shaped.append(output)
+    return seconds, shaped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=1000)
+    parser.add_argument("--preprocessing", default="fast")
+    args = parser.parse_args()
+
+    reviewer = ResumeReviewer(preprocessing=args.preprocessing)
+    corpus = SyntheticCorpus(reviewer, seed=0)
+    job = corpus.job(200)
+    resumes = [reviewer.analyze_document(corpus.resume(600)) for _ in range(args.resumes)]
+    adapter = TypeAdapter(List[app.RankedResumeResult])
+    orjson = app.orjson
+
+    def validated(content):
+        return JSONResponse(adapter.dump_python(adapter.validate_python(content), mode="json")).body
+
+    def stdlib(content):
+        app.orjson = None
+        try:
+            return app.dump_json(content)
+        finally:
+            app.orjson = orjson
+
+    levels = [
+        ("full (before)", None, app.RESULT_FIELDS),
+        ("full", app.reviewer_fields(app.RESULT_FIELDS), app.RESULT_FIELDS),
+        ("summary", app.reviewer_fields(app.DETAIL_LEVELS["summary"]), app.DETAIL_LEVELS["summary"]),
+    ]
+    print("%d results per response" % args.resumes)
+    print("%-14s %11s %10s %19s %9s %10s" % ("detail", "analysis s", "KB", "response_model ms", "json ms", "orjson ms"))
+    for name, reviewer_fields, fields in levels:
+        seconds, content = ranked(reviewer, job, resumes, reviewer_fields, fields)
+        # The response model drops skill_categories, so "full (before)" sent what "full" sends now
+        validates = fields == app.RESULT_FIELDS
+        body = validated(content) if validates else app.dump_json(content)
+        columns = [median_ms(lambda: validated(content)) if validates else None]
+        if reviewer_fields is None:
+            columns += [None, None]
+        else:
+            columns += [median_ms(lambda: stdlib(content)),
+                        median_ms(lambda: orjson.dumps(content)) if orjson is not None else None]
+        print("%-14s %11.2f %10.1f %s" % (name, seconds, len(body) / 1024, " ".join(
+            ("%*.1f" if value is not None else "%*s") % (width, "n/a" if value is None else value)
+            for width, value in zip((19, 9, 10), columns))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Latency of pool-wide skill analytics over a large ResumeIndex.
+
+Indexes synthetic resumes and times SkillAnalytics.skill_frequencies,
+skill_gaps (per job) and category_coverage against computing the same
+statistics with a loop over the resumes, calling extract_skills and
+identify_skill_categories per resume (timed on a sample and scaled to the
+pool).
+
+    python -m benchmarks.bench_skill_analytics --resumes 100000
+"""
+import argparse
+import statistics
+import time
+
+from resume_index import ResumeIndex
+from resume_reviewer import ResumeReviewer
+from skill_analytics import SkillAnalytics
+from benchmarks.synthetic import SyntheticCorpus
+
+
+def median_ms(function, *args, runs=5):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function(*args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def per_resume(reviewer, resumes, job_skills):
+    """Every statistic from one pass over already analyzed resumes"""
+    frequencies, gaps, categories = {}, dict.fromkeys(job_skills, 0), {}
+    for document in resumes:
+        skills = reviewer.extract_skills(document)
+        for skill in skills:
+            frequencies[skill] = frequencies.get(skill, 0) + 1
+            if skill in gaps:
+                gaps[skill] += 1
+        for category, found in reviewer.identify_skill_categories(skills).items():
+            categories.setdefault(category, []).append(found["count"])
+    return frequencies, gaps, categories
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=100000)
+    parser.add_argument("--jobs", type=int, default=10, help="jobs for skill_gaps")
+    parser.add_argument("--sample", type=int, default=2000, help="resumes timed with the per-resume loop")
+    parser.add_argument("--chunk", type=int, default=5000, help="resumes generated and indexed at a time")
+    parser.add_argument("--preprocessing", default="fast")
+    args = parser.parse_args()
+
+    reviewer = ResumeReviewer(vectorizer_mode="hashing", preprocessing=args.preprocessing)
+    corpus = SyntheticCorpus(reviewer, seed=0)
+    index = ResumeIndex(reviewer)
+    build_seconds = 0.0
+    for first in range(0, args.resumes, args.chunk):
+        items = [("resume-%d" % (first + offset), corpus.resume(600))
+                 for offset in range(min(args.chunk, args.resumes - first))]
+        start = time.perf_counter()
+        index.add_many(items)
+        build_seconds += time.perf_counter() - start
+    analytics = SkillAnalytics(index)
+    start = time.perf_counter()
+    analytics.category_coverage()
+    # The first call also materializes the rows added since the last search and builds the category matrix
+    print("indexed %d resumes in %.1f s, first category_coverage %.0f ms" % (
+        len(index), build_seconds, (time.perf_counter() - start) * 1000))
+
+    job_skills = [reviewer.extract_skills(corpus.job(200)) for _ in range(args.jobs)]
+    sample = [reviewer.analyze_document(corpus.resume(600)) for _ in range(args.sample)]
+    loop_ms = median_ms(per_resume, reviewer, sample, job_skills[0], runs=1) * len(index) / len(sample)
+
+    print("%-34s %12s" % ("method", "ms"))
+    print("%-34s %12.1f" % ("skill_frequencies", median_ms(analytics.skill_frequencies)))
+    print("%-34s %12.1f" % ("skill_frequencies(top=50)", median_ms(analytics.skill_frequencies, 50)))
+    print("%-34s %12.1f" % ("skill_gaps (per job)", statistics.median(
+        median_ms(analytics.skill_gaps, skills) for skills in job_skills)))
+    print("%-34s %12.1f" % ("category_coverage", median_ms(analytics.category_coverage)))
+    print("%-34s %12.0f   (estimated, all three statistics)" % ("per-resume loop", loop_ms))
+
+
+if __name__ == "__main__":
+    main()
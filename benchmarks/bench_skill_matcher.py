@@ -0,0 +1,80 @@
+"""Skill extraction throughput as the taxonomy grows.
+
+Compares the compiled SkillMatcher against the previous per-skill scan
+(list membership for single words plus a check of every multi-word skill)
+for the built-in taxonomy and synthetic taxonomies of up to 50k phrases.
+
+    python -m benchmarks.bench_skill_matcher --sizes 5000 20000 50000
+"""
+import argparse
+import random
+import time
+
+from resume_reviewer import ResumeReviewer
+from skill_matcher import SkillMatcher
+from benchmarks.synthetic import SyntheticCorpus
+
+
+def synthetic_taxonomy(reviewer, size, seed=0):
+    """Built-in taxonomy padded with deterministic 1-3 word phrases up to size skills"""
+    rng = random.Random(seed)
+    words = sorted({word for skill in reviewer.skill_keywords for word in skill.split() if word.isalpha()})
+    skills = set(reviewer.skill_keywords)
+    while len(skills) < size:
+        skills.add(' '.join(rng.sample(words, rng.randint(1, 3))))
+    skills = sorted(skills)
+    return {"category_%d" % (index % 20): skills[index::20] for index in range(20)}
+
+
+def sample_resume(reviewer, words=700, seed=1):
+    return reviewer.analyze_document(SyntheticCorpus(reviewer, seed).resume(words))
+
+
+def legacy_extract(skill_keywords, multi_word_skills, document):
+    single_word_skills = [word for word in document.tokens if word in skill_keywords]
+    multi = [skill for skill in multi_word_skills if skill in document.text]
+    return sorted(set(single_word_skills + multi))
+
+
+def throughput(function, min_seconds):
+    """Calls per second of function, measured for at least min_seconds"""
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds or calls < 3:
+        function()
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 20000, 50000])
+    parser.add_argument("--words", type=int, default=700, help="resume length in words")
+    parser.add_argument("--seconds", type=float, default=1.0, help="minimum time per measurement")
+    args = parser.parse_args()
+
+    reviewer = ResumeReviewer()
+    document = sample_resume(reviewer, args.words)
+
+    taxonomies = [("built-in", reviewer.skill_categories)]
+    taxonomies += [(str(size), synthetic_taxonomy(reviewer, size)) for size in args.sizes]
+
+    print("%-10s %8s %12s %14s %14s %8s" % ("taxonomy", "skills", "compile (s)", "legacy doc/s", "matcher doc/s", "speedup"))
+    for name, skill_categories in taxonomies:
+        skill_keywords = list({skill for skills in skill_categories.values() for skill in skills})
+        multi_word_skills = [skill for skill in skill_keywords if ' ' in skill]
+
+        start = time.perf_counter()
+        matcher = SkillMatcher(skill_categories, reviewer.preprocess_text)
+        compile_seconds = time.perf_counter() - start
+
+        legacy = throughput(lambda: legacy_extract(skill_keywords, multi_word_skills, document), args.seconds)
+        compiled = throughput(lambda: sorted(matcher.match(document.tokens)), args.seconds)
+        print("%-10s %8d %12.2f %14.1f %14.1f %7.0fx" % (
+            name, len(skill_keywords), compile_seconds, legacy, compiled, compiled / legacy))
+
+
+if __name__ == "__main__":
+    main()
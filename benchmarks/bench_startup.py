@@ -0,0 +1,64 @@
+"""Cold start latency: process launch to import, readiness and first response.
+
+Each run starts a fresh interpreter that imports the app, waits for /ready
+and sends one /analyze_resume request.
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CHILD = """
+import json, os, sys, time
+start = float(os.environ["BENCH_LAUNCHED_AT"])
+import app
+imported = time.time() - start
+from fastapi.testclient import TestClient
+with TestClient(app.app) as client:
+    while client.get("/ready").status_code != 200:
+        if app.warmup["error"]:
+            sys.exit(app.warmup["error"])
+        time.sleep(0.01)
+    ready = time.time() - start
+    response = client.post("/analyze_resume", json={
+        "job_description": "Python developer with Django and SQL experience",
+        "resume": "Software engineer with 5 years of Python, Django and PostgreSQL"
+    })
+    response.raise_for_status()
+    first_response = time.time() - start
+print(json.dumps({"import": imported, "ready": ready, "first_response": first_response}))
+"""
+
+STAGES = ("import", "ready", "first_response")
+
+
+def run_once(env):
+    env = dict(env, BENCH_LAUNCHED_AT=repr(time.time()))
+    output = subprocess.run([sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--offline", action="store_true", help="run with RESUME_REVIEWER_OFFLINE=1")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.offline:
+        env["RESUME_REVIEWER_OFFLINE"] = "1"
+
+    runs = [run_once(env) for _ in range(args.runs)]
+    print("%-22s %8s %8s" % ("seconds since launch", "median", "max"))
+    for stage in STAGES:
+        values = [run[stage] for run in runs]
+        print("%-22s %8.2f %8.2f" % (stage, statistics.median(values), max(values)))
+
+
+if __name__ == "__main__":
+    main()
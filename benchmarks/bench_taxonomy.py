@@ -0,0 +1,57 @@
+"""Load time of external taxonomies: JSON source versus compiled artifact.
+
+Writes synthetic taxonomies of growing size as JSON, compiles each one and
+times how long a reviewer takes to pick it up from either file.
+
+    python -m benchmarks.bench_taxonomy --sizes 10000 50000 100000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from resume_reviewer import ResumeReviewer
+from taxonomy import compile_taxonomy
+from benchmarks.bench_skill_matcher import synthetic_taxonomy
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000])
+    parser.add_argument("--preprocessing", default="nltk")
+    args = parser.parse_args()
+
+    reviewer = ResumeReviewer(preprocessing=args.preprocessing)
+
+    print("%-8s %12s %12s %12s %12s %9s" % ("skills", "source (s)", "compile (s)", "artifact (s)", "size (KiB)", "speedup"))
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            source = os.path.join(directory, "taxonomy-%d.json" % size)
+            artifact = os.path.join(directory, "taxonomy-%d.bin" % size)
+            with open(source, "w", encoding="utf-8") as handle:
+                json.dump({
+                    "skill_categories": synthetic_taxonomy(reviewer, size),
+                    "education_keywords": reviewer.education_keywords,
+                    "experience_keywords": reviewer.experience_keywords
+                }, handle)
+
+            # A fresh lemma cache for every source load, as in a newly started worker
+            reviewer.lemmatize.cache_clear()
+            source_seconds = timed(reviewer.load_taxonomy, source)
+            reviewer.lemmatize.cache_clear()
+            compile_seconds = timed(compile_taxonomy, source, artifact, reviewer.preprocess_text)
+            artifact_seconds = timed(reviewer.load_taxonomy, artifact)
+            print("%-8d %12.3f %12.3f %12.3f %12.0f %8.0fx" % (
+                size, source_seconds, compile_seconds, artifact_seconds,
+                os.path.getsize(artifact) / 1024, source_seconds / artifact_seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Overhead of the analyze_resume timing hook, disabled and enabled.
+
+    python -m benchmarks.bench_timings --pairs 30 --rounds 5
+"""
+import argparse
+import statistics
+import time
+import timeit
+
+from resume_reviewer import ResumeReviewer, NULL_TIMER, StageTimer
+from benchmarks.synthetic import SyntheticCorpus
+
+
+def per_pair_seconds(reviewer, pairs, timings):
+    start = time.perf_counter()
+    for job, resume in pairs:
+        reviewer.analyze_resume(job, resume, timings)
+    return (time.perf_counter() - start) / len(pairs)
+
+
+def stage_cost(timer, number=200000):
+    """Seconds per `with timer.stage(...)` block"""
+    def block():
+        with timer.stage("similarity"):
+            pass
+    return timeit.timeit(block, number=number) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=30)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    reviewer = ResumeReviewer()
+    pairs = SyntheticCorpus(reviewer).pairs(args.pairs)
+    reviewer.analyze_resume(*pairs[0])
+
+    # Interleave rounds so drift affects both variants alike
+    disabled, enabled = [], []
+    for _ in range(args.rounds):
+        disabled.append(per_pair_seconds(reviewer, pairs, False))
+        enabled.append(per_pair_seconds(reviewer, pairs, True))
+
+    off, on = statistics.median(disabled), statistics.median(enabled)
+    null_stage, timed_stage = stage_cost(NULL_TIMER), stage_cost(StageTimer())
+    stages_per_call = 6
+    print("analyze_resume, timings off: %8.3f ms" % (off * 1000))
+    print("analyze_resume, timings on:  %8.3f ms  (%+.2f%%)" % (on * 1000, (on / off - 1) * 100))
+    print("stage block, timings off:    %8.0f ns  (%.4f%% of a call for %d stages)" % (
+        null_stage * 1e9, null_stage * stages_per_call / off * 100, stages_per_call))
+    print("stage block, timings on:     %8.0f ns" % (timed_stage * 1e9))
+
+
+if __name__ == "__main__":
+    main()
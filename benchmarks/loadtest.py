@@ -0,0 +1,371 @@
+"""Load test of the HTTP service: throughput, latency and server CPU/RSS under concurrency.
+
+Starts the app under uvicorn on a local port, drives it from client threads
+with a deterministic mix of synthetic job descriptions and resumes of
+realistic sizes, and reports requests/sec, latency percentiles and a
+latency histogram for every concurrency level, together with the CPU time
+and memory of the server process and its analysis workers (read from
+/proc, so Linux only). Nothing leaves the machine; with the same seed and
+options runs are comparable between commits.
+
+    python -m benchmarks.loadtest --concurrency 1 4 16 --duration 30 --workers 4
+    python -m benchmarks.loadtest --endpoint batches --batch-size 50 --output load.json
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from resume_reviewer import ResumeReviewer
+from benchmarks.synthetic import SyntheticCorpus
+from benchmarks.suite import git_commit
+
+RESULTS_FORMAT = 1
+
+ENDPOINTS = ("analyze_resume", "jobs", "batches")
+
+# (resume words, share of requests): mostly one or two page resumes, a few long CVs
+RESUME_SIZES = ((300, 0.3), (600, 0.4), (1200, 0.2), (3000, 0.1))
+JOB_SIZES = ((120, 0.4), (250, 0.4), (500, 0.2))
+
+# Upper bounds of the latency histogram, in milliseconds
+HISTOGRAM_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float("inf"))
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+
+def latency_summary(latencies):
+    """Percentiles and histogram counts of latencies in seconds, reported in milliseconds"""
+    values = sorted(latency * 1000 for latency in latencies)
+    histogram = [0] * len(HISTOGRAM_BUCKETS)
+    bucket = 0
+    for value in values:
+        while value > HISTOGRAM_BUCKETS[bucket]:
+            bucket += 1
+        histogram[bucket] += 1
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 0.5),
+        "p95_ms": percentile(values, 0.95),
+        "p99_ms": percentile(values, 0.99),
+        "max_ms": values[-1] if values else None,
+        "histogram": [[str(bound), count] for bound, count in zip(HISTOGRAM_BUCKETS, histogram)],
+    }
+
+
+def _children(pid):
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open("/proc/%s/stat" % entry) as handle:
+                fields = handle.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return children
+
+
+def process_tree(pid):
+    """pid and every descendant process"""
+    pids = [pid]
+    for pid in pids:
+        pids.extend(_children(pid))
+    return pids
+
+
+def process_usage(pid):
+    """CPU seconds (user + system), current and peak RSS in MiB of one process, or None if it is gone"""
+    try:
+        with open("/proc/%d/stat" % pid) as handle:
+            fields = handle.read().rsplit(")", 1)[1].split()
+        with open("/proc/%d/status" % pid) as handle:
+            status = dict(line.split(":", 1) for line in handle if ":" in line)
+    except OSError:
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    # utime and stime are fields 14 and 15 of /proc/<pid>/stat, counted from 1 including pid and comm
+    cpu = (int(fields[11]) + int(fields[12])) / ticks
+    return {
+        "cpu_seconds": cpu,
+        "rss_mib": int(status.get("VmRSS", "0 kB").split()[0]) / 1024,
+        "peak_rss_mib": int(status.get("VmHWM", "0 kB").split()[0]) / 1024,
+    }
+
+
+def tree_usage(pid):
+    return {child: usage for child in process_tree(pid) for usage in [process_usage(child)] if usage is not None}
+
+
+def process_role(pid, server_pid):
+    if pid == server_pid:
+        return "server"
+    try:
+        with open("/proc/%d/cmdline" % pid, "rb") as handle:
+            command = handle.read()
+    except OSError:
+        return "worker"
+    # multiprocessing's resource tracker is a child of the server too
+    return "helper" if b"resource_tracker" in command else "worker"
+
+
+def usage_delta(server_pid, before, after, seconds):
+    """Per-process CPU use between two tree_usage() snapshots, and memory at the second"""
+    processes = []
+    for pid, usage in sorted(after.items()):
+        cpu = usage["cpu_seconds"] - before.get(pid, {"cpu_seconds": 0.0})["cpu_seconds"]
+        processes.append({
+            "pid": pid,
+            "role": process_role(pid, server_pid),
+            "cpu_seconds": cpu,
+            "cpu_percent": 100 * cpu / seconds,
+            "rss_mib": usage["rss_mib"],
+            "peak_rss_mib": usage["peak_rss_mib"],
+        })
+    return {
+        "cpu_percent": sum(process["cpu_percent"] for process in processes),
+        "rss_mib": sum(process["rss_mib"] for process in processes),
+        "processes": processes,
+    }
+
+
+def weighted_sizes(rng, sizes, count):
+    words, weights = zip(*sizes)
+    return rng.choices(words, weights=weights, k=count)
+
+
+def build_workload(seed, jobs, resumes):
+    """Job descriptions and resumes drawn with realistic sizes from the synthetic corpus"""
+    rng = random.Random(seed)
+    corpus = SyntheticCorpus(ResumeReviewer(), seed=seed)
+    return (
+        [corpus.job(words) for words in weighted_sizes(rng, JOB_SIZES, jobs)],
+        [corpus.resume(words) for words in weighted_sizes(rng, RESUME_SIZES, resumes)],
+    )
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_server(port, env, timeout=300):
+    """Launch uvicorn with the app and wait until /ready answers 200"""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("server exited with status %s" % server.returncode)
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            connection.request("GET", "/ready")
+            if connection.getresponse().status == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("server was not ready after %d seconds" % timeout)
+
+
+class Client:
+    """One keep-alive connection issuing JSON requests"""
+    def __init__(self, port):
+        self.connection = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+
+    def request(self, method, path, body=None):
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        try:
+            self.connection.request(method, path, json.dumps(body) if body is not None else None, headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            return None, None
+        return response.status, data
+
+
+def make_task(endpoint, client, rng, workload, job_ids, batch_size):
+    """One unit of work for a client thread; returns (status, items scored)"""
+    jobs, resumes = workload
+    if endpoint == "analyze_resume":
+        status, _ = client.request("POST", "/analyze_resume", {"job_description": rng.choice(jobs), "resume": rng.choice(resumes)})
+        return status, 1
+    if endpoint == "jobs":
+        status, _ = client.request("POST", "/jobs/%s/analyze" % rng.choice(job_ids), {"resume": rng.choice(resumes)})
+        return status, 1
+
+    status, data = client.request("POST", "/batches", {
+        "job_description": rng.choice(jobs), "resumes": rng.sample(resumes, min(batch_size, len(resumes)))})
+    if status != 202:
+        return status, 0
+    batch_id = json.loads(data)["batch_id"]
+    while True:
+        time.sleep(0.05)
+        status, data = client.request("GET", "/batches/%s?limit=1" % batch_id)
+        if status != 200:
+            return status, 0
+        batch = json.loads(data)
+        if batch["status"] == "completed":
+            return 200, batch["completed"]
+
+
+def run_level(port, server_pid, endpoint, concurrency, duration, warmup, workload, job_ids, batch_size, seed):
+    """Drive the server from concurrency threads for warmup + duration seconds"""
+    samples = []
+    statuses = {}
+    lock = threading.Lock()
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        client = Client(port)
+        while True:
+            began = time.perf_counter()
+            if began >= stop_at:
+                break
+            status, items = make_task(endpoint, client, rng, workload, job_ids, batch_size)
+            ended = time.perf_counter()
+            if began >= measure_from:
+                with lock:
+                    statuses[str(status)] = statuses.get(str(status), 0) + 1
+                    if status in (200, 202):
+                        samples.append((ended - began, items))
+
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    time.sleep(max(0.0, measure_from - time.perf_counter()))
+    usage_before = tree_usage(server_pid)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - measure_from
+    usage = usage_delta(server_pid, usage_before, tree_usage(server_pid), elapsed)
+
+    return {
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "requests_per_second": len(samples) / elapsed,
+        "items_per_second": sum(items for _, items in samples) / elapsed,
+        "statuses": statuses,
+        "latency": latency_summary([latency for latency, _ in samples]),
+        "server": usage,
+    }
+
+
+def print_level(level, endpoint):
+    latency = level["latency"]
+    unit = "batches" if endpoint == "batches" else "requests"
+    print("\nconcurrency %d: %.1f %s/sec, %.1f resumes/sec over %.1f s, statuses %s" % (
+        level["concurrency"], level["requests_per_second"], unit, level["items_per_second"],
+        level["seconds"], json.dumps(level["statuses"], sort_keys=True)))
+    if latency["count"]:
+        print("latency ms: p50 %.1f  p95 %.1f  p99 %.1f  max %.1f" % (
+            latency["p50_ms"], latency["p95_ms"], latency["p99_ms"], latency["max_ms"]))
+        widest = max(count for _, count in latency["histogram"])
+        for bound, count in latency["histogram"]:
+            if count:
+                print("  <= %-7s %7d %s" % (bound, count, "#" * max(1, round(40 * count / widest))))
+    server = level["server"]
+    print("server CPU %.0f%%, RSS %.0f MiB" % (server["cpu_percent"], server["rss_mib"]))
+    for process in server["processes"]:
+        print("  %-6s pid %-7d CPU %5.0f%%  RSS %7.1f MiB  peak %7.1f MiB" % (
+            process["role"], process["pid"], process["cpu_percent"], process["rss_mib"], process["peak_rss_mib"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoint", choices=ENDPOINTS, default="analyze_resume")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="client threads, one run each")
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=3, help="unmeasured seconds before each level")
+    parser.add_argument("--jobs", type=int, default=20, help="distinct job descriptions in the mix")
+    parser.add_argument("--resumes", type=int, default=200, help="distinct resumes in the mix")
+    parser.add_argument("--batch-size", type=int, default=20, help="resumes per batch with --endpoint batches")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=0, help="ANALYSIS_WORKERS of the server")
+    parser.add_argument("--preprocessing", default="nltk")
+    parser.add_argument("--vectorizer-mode", default=None)
+    parser.add_argument("--result-cache", action="store_true",
+                        help="keep the result cache on; by default it is off so every request is analyzed")
+    parser.add_argument("--port", type=int, default=None, help="default: a free port")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    workload = build_workload(args.seed, args.jobs, args.resumes)
+    port = args.port or free_port()
+    env = dict(os.environ, ANALYSIS_WORKERS=str(args.workers), PREPROCESSING=args.preprocessing)
+    env.pop("BATCH_QUEUE_PATH", None)
+    if not args.result_cache:
+        env["RESULT_CACHE_SIZE"] = "0"
+        env.pop("RESULT_CACHE_PATH", None)
+    if args.vectorizer_mode:
+        env["VECTORIZER_MODE"] = args.vectorizer_mode
+    # Queue depth large enough that the clients measure latency rather than 503s
+    env.setdefault("ANALYSIS_QUEUE_DEPTH", str(max(args.concurrency) * 2 + 4))
+
+    server = start_server(port, env)
+    try:
+        job_ids = []
+        if args.endpoint == "jobs":
+            client = Client(port)
+            for job in workload[0]:
+                status, data = client.request("POST", "/jobs", {"job_description": job})
+                job_ids.append(json.loads(data)["job_id"])
+
+        results = {
+            "format": RESULTS_FORMAT,
+            "meta": {
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "endpoint": args.endpoint,
+                "duration": args.duration,
+                "jobs": args.jobs,
+                "resumes": args.resumes,
+                "batch_size": args.batch_size,
+                "seed": args.seed,
+                "workers": args.workers,
+                "preprocessing": args.preprocessing,
+                "vectorizer_mode": args.vectorizer_mode,
+                "result_cache": args.result_cache,
+            },
+            "levels": [],
+        }
+        for concurrency in args.concurrency:
+            level = run_level(port, server.pid, args.endpoint, concurrency, args.duration, args.warmup,
+                              workload, job_ids, args.batch_size, args.seed)
+            results["levels"].append(level)
+            print_level(level, args.endpoint)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
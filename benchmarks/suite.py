@@ -0,0 +1,196 @@
+"""Reproducible per-stage performance benchmark of ResumeReviewer and the HTTP API.
+
+Times preprocess_text, calculate_similarity, extract_skills,
+identify_skill_categories, analyze_resume and POST /analyze_resume on
+deterministic synthetic documents and writes the results as JSON. Given a
+baseline file, it compares median latencies and exits with status 1 when a
+stage got slower than the allowed threshold.
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --baseline bench.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from resume_reviewer import ResumeReviewer
+from benchmarks.synthetic import SyntheticCorpus
+
+RESULTS_FORMAT = 1
+
+
+def summarize(samples):
+    """Latency statistics in milliseconds"""
+    samples = sorted(sample * 1000 for sample in samples)
+    return {
+        "runs": len(samples),
+        "mean_ms": statistics.fmean(samples),
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        "min_ms": samples[0],
+    }
+
+
+def time_call(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def app_environment(reviewer, model_path):
+    """Environment that configures the app like reviewer, with the result cache off so no request is a cache hit"""
+    return {
+        "PREPROCESSING": reviewer.preprocessing,
+        "VECTORIZER_MODE": reviewer.vectorizer_mode,
+        "MODEL_PATH": model_path or "",
+        "TAXONOMY_PATH": "",
+        "RESULT_CACHE_SIZE": "0",
+        "RESULT_CACHE_PATH": "",
+    }
+
+
+def run_stages(reviewer, pairs, http=True, model_path=None):
+    """Time every stage once per (job, resume) pair.
+
+    Returns (stage statistics, the preprocessing and vectorizer mode the
+    app served the HTTP stage with, or None without it).
+    """
+    samples = {name: [] for name in (
+        "preprocess_text", "calculate_similarity", "extract_skills",
+        "identify_skill_categories", "analyze_resume")}
+    for job, resume in pairs:
+        skills = reviewer.extract_skills(resume)
+        samples["preprocess_text"].append(time_call(reviewer.preprocess_text, resume))
+        samples["calculate_similarity"].append(time_call(reviewer.calculate_similarity, job, resume))
+        samples["extract_skills"].append(time_call(reviewer.extract_skills, resume))
+        samples["identify_skill_categories"].append(time_call(reviewer.identify_skill_categories, skills))
+        samples["analyze_resume"].append(time_call(reviewer.analyze_resume, job, resume))
+
+    served = None
+    if http:
+        # The app configures itself from the environment when it is imported and starts
+        environment = app_environment(reviewer, model_path)
+        saved = {name: os.environ.get(name) for name in environment}
+        os.environ.update(environment)
+        try:
+            from fastapi.testclient import TestClient
+            import app
+
+            samples["http_analyze_resume"] = []
+            with TestClient(app.app) as client:
+                def post(job, resume):
+                    response = client.post("/analyze_resume", json={"job_description": job, "resume": resume})
+                    response.raise_for_status()
+                post(*pairs[0])
+                for job, resume in pairs:
+                    samples["http_analyze_resume"].append(time_call(post, job, resume))
+            app_reviewer = app.get_reviewer()
+            served = {"preprocessing": app_reviewer.preprocessing, "vectorizer_mode": app_reviewer.vectorizer_mode}
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    return {name: summarize(values) for name, values in samples.items()}, served
+
+
+def compare(results, baseline, threshold, stage_thresholds=None):
+    """Rows of (stage, baseline ms, current ms, ratio, regressed) for stages in both runs"""
+    rows = []
+    for stage, stats in results["stages"].items():
+        if stage not in baseline["stages"]:
+            continue
+        before = baseline["stages"][stage]["median_ms"]
+        after = stats["median_ms"]
+        ratio = after / before if before else float("inf")
+        allowed = (stage_thresholds or {}).get(stage, threshold)
+        rows.append((stage, before, after, ratio, ratio > 1 + allowed))
+    return rows
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=30, help="number of (job, resume) pairs to time")
+    parser.add_argument("--resume-words", type=int, default=600)
+    parser.add_argument("--job-words", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--preprocessing", default="nltk", help="ResumeReviewer preprocessing mode")
+    parser.add_argument("--vectorizer-mode", default=None, help="ResumeReviewer vectorizer mode")
+    parser.add_argument("--model-path", default=None, help="model for the fitted and lsa vectorizer modes")
+    parser.add_argument("--no-http", action="store_true", help="skip the HTTP path")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown of a stage's median, as a fraction of the baseline")
+    parser.add_argument("--stage-threshold", action="append", default=[], metavar="STAGE=FRACTION",
+                        help="override --threshold for one stage")
+    args = parser.parse_args(argv)
+
+    reviewer = ResumeReviewer(preprocessing=args.preprocessing, vectorizer_mode=args.vectorizer_mode,
+                              model_path=args.model_path)
+    pairs = SyntheticCorpus(reviewer, args.seed).pairs(args.pairs, args.resume_words, args.job_words)
+    # Warm NLTK corpora and caches outside the measurement
+    reviewer.analyze_resume(*pairs[0])
+
+    results = {
+        "format": RESULTS_FORMAT,
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pairs": args.pairs,
+            "resume_words": args.resume_words,
+            "job_words": args.job_words,
+            "seed": args.seed,
+            "preprocessing": args.preprocessing,
+            "vectorizer_mode": reviewer.vectorizer_mode,
+        },
+    }
+    results["stages"], results["meta"]["http"] = run_stages(reviewer, pairs, http=not args.no_http,
+                                                            model_path=args.model_path)
+    if results["meta"]["http"] not in (None, {"preprocessing": reviewer.preprocessing,
+                                              "vectorizer_mode": reviewer.vectorizer_mode}):
+        print("warning: the HTTP stage ran with %(preprocessing)s preprocessing and the %(vectorizer_mode)s "
+              "vectorizer (app imported earlier)" % results["meta"]["http"], file=sys.stderr)
+
+    print("%-26s %10s %10s %10s" % ("stage", "median ms", "p95 ms", "mean ms"))
+    for stage, stats in results["stages"].items():
+        print("%-26s %10.2f %10.2f %10.2f" % (stage, stats["median_ms"], stats["p95_ms"], stats["mean_ms"]))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        stage_thresholds = {}
+        for item in args.stage_threshold:
+            stage, _, fraction = item.partition("=")
+            stage_thresholds[stage] = float(fraction)
+
+        rows = compare(results, baseline, args.threshold, stage_thresholds)
+        print("\n%-26s %12s %12s %8s" % ("stage", "baseline ms", "current ms", "ratio"))
+        for stage, before, after, ratio, regressed in rows:
+            print("%-26s %12.2f %12.2f %7.2fx%s" % (stage, before, after, ratio, "  REGRESSION" if regressed else ""))
+        if any(row[4] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
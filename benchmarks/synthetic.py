@@ -0,0 +1,66 @@
+"""Deterministic synthetic resumes and job descriptions for benchmarks.
+
+Documents are drawn from the reviewer's own vocabulary (skill_categories,
+education_keywords, experience_keywords) mixed with filler sentences, so
+every stage of the pipeline has realistic work to do. The same seed always
+produces the same documents.
+"""
+import random
+
+FILLER = [
+    "Responsible for", "Worked closely with", "Delivered", "Improved", "Collaborated with",
+    "Reduced costs by 20% through", "Led the rollout of", "Hands-on experience with",
+    "Strong background in", "Looking for a candidate with", "Must have", "Nice to have",
+    "the team", "our customers", "across multiple sites", "in a fast-paced environment",
+]
+
+
+class SyntheticCorpus:
+    """Generates resumes and job descriptions of configurable length"""
+    def __init__(self, reviewer, seed=0):
+        self.rng = random.Random(seed)
+        self.categories = sorted(reviewer.skill_categories)
+        self.skill_categories = {name: sorted(set(reviewer.skill_categories[name])) for name in self.categories}
+        self.education_keywords = list(reviewer.education_keywords)
+        self.experience_keywords = list(reviewer.experience_keywords)
+
+    def _document(self, words, category, skill_share, education_share, experience_share):
+        rng = self.rng
+        skills = self.skill_categories[category]
+        other_skills = self.skill_categories[rng.choice(self.categories)]
+        parts = []
+        count = 0
+        while count < words:
+            roll = rng.random()
+            if roll < skill_share:
+                phrase = rng.choice(skills if rng.random() < 0.8 else other_skills)
+            elif roll < skill_share + education_share:
+                phrase = rng.choice(self.education_keywords)
+            elif roll < skill_share + education_share + experience_share:
+                phrase = rng.choice(self.experience_keywords)
+            else:
+                phrase = rng.choice(FILLER)
+            parts.append(phrase)
+            count += len(phrase.split())
+        # Sentences of roughly a dozen words
+        sentences = [' '.join(parts[start:start + 8]) for start in range(0, len(parts), 8)]
+        return '. '.join(sentence[:1].upper() + sentence[1:] for sentence in sentences) + '.'
+
+    def resume(self, words=600, category=None):
+        """One resume of about `words` words, centred on category (random if None)"""
+        category = category or self.rng.choice(self.categories)
+        return self._document(words, category, 0.3, 0.05, 0.15)
+
+    def job(self, words=200, category=None):
+        """One job description of about `words` words"""
+        category = category or self.rng.choice(self.categories)
+        return self._document(words, category, 0.35, 0.05, 0.1)
+
+    def pairs(self, count, resume_words=600, job_words=200):
+        """count (job, resume) pairs; half of them share a category"""
+        pairs = []
+        for index in range(count):
+            category = self.rng.choice(self.categories)
+            resume_category = category if index % 2 == 0 else None
+            pairs.append((self.job(job_words, category), self.resume(resume_words, resume_category)))
+        return pairs
@@ -0,0 +1,298 @@
+"""Command line tools for the resume reviewer.
+
+    python cli.py fit-model --corpus corpus/ --output model.pkl
+    python cli.py download-nltk-data --output nltk_data/
+    python cli.py compile-taxonomy --source taxonomy.json --output taxonomy.bin
+    python cli.py score --job job.txt --resumes resumes.jsonl --output scores.jsonl --workers 8
+"""
+import argparse
+import collections
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from resume_reviewer import ResumeReviewer, NLTK_RESOURCES, ensure_nltk_resources
+from taxonomy import compile_taxonomy as compile_taxonomy_file
+
+# JSONL fields read as documents when building a corpus
+CORPUS_FIELDS = ('text', 'resume', 'job_description')
+
+
+def iter_corpus(path):
+    """Yield documents from a directory of .txt files or a JSONL file"""
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.endswith('.txt'):
+                    with open(os.path.join(root, name), encoding='utf-8') as handle:
+                        yield handle.read()
+        return
+
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            for field in CORPUS_FIELDS:
+                if record.get(field):
+                    yield record[field]
+
+
+def iter_resumes(path):
+    """Yield (id, text) from a directory of .txt files or a JSONL file.
+
+    Files are identified by their path relative to the directory, JSONL
+    records by their "id" field or else their line number.
+    """
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith('.txt'):
+                    file_path = os.path.join(root, name)
+                    with open(file_path, encoding='utf-8') as handle:
+                        yield os.path.relpath(file_path, path), handle.read()
+        return
+
+    with open(path, encoding='utf-8') as handle:
+        for number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield str(record.get('id', number)), record.get('resume') or record.get('text') or ''
+
+
+# Flat columns of the CSV output; skill lists are joined with ";"
+CSV_FIELDS = ('id', 'overall_match_score', 'similarity_score', 'skill_match_percentage',
+              'matching_skills', 'missing_skills', 'education_score', 'experience_score', 'error')
+
+# Reviewer and prepared job owned by each scoring worker, built once by the pool initializer
+_scorer = None
+
+
+def _init_scorer(reviewer_options, job_description):
+    global _scorer
+    reviewer = ResumeReviewer(**reviewer_options)
+    _scorer = reviewer, reviewer.prepare_job(job_description)
+
+
+def _score_batch(batch):
+    reviewer, job = _scorer
+    results = []
+    for resume_id, text in batch:
+        if not text.strip():
+            results.append({"id": resume_id, "error": "empty resume"})
+            continue
+        result = reviewer.analyze_resume(job, text)
+        result["id"] = resume_id
+        results.append(result)
+    return results
+
+
+def scored_ids(output, output_format):
+    """Ids already in an output file, after cutting off a partly written last line"""
+    if not os.path.exists(output):
+        return set()
+    with open(output, 'rb+') as handle:
+        content = handle.read()
+        complete = content.rfind(b'\n') + 1
+        if complete < len(content):
+            handle.truncate(complete)
+    lines = content[:complete].decode('utf-8').splitlines()
+    if output_format == 'csv':
+        return {row['id'] for row in csv.DictReader(lines)}
+    return {json.loads(line)['id'] for line in lines if line.strip()}
+
+
+def csv_row(result):
+    if "error" in result:
+        return {"id": result["id"], "error": result["error"]}
+    return {
+        "id": result["id"],
+        "overall_match_score": result["overall_match_score"],
+        "similarity_score": result["similarity_score"],
+        "skill_match_percentage": result["skill_match"]["percentage"],
+        "matching_skills": ';'.join(result["skill_match"]["matching_skills"]),
+        "missing_skills": ';'.join(result["skill_match"]["missing_skills"]),
+        "education_score": result["education_score"],
+        "experience_score": result["experience_score"],
+    }
+
+
+def score_resumes(job_description, resumes, output, output_format='jsonl', workers=None,
+                  batch_size=32, reviewer_options=None, progress=None):
+    """Score (id, text) pairs against one job description into output.
+
+    Batches are fanned out to a pool of worker processes, each holding one
+    ResumeReviewer and the prepared job, and written in input order as they
+    finish. The output file doubles as the checkpoint: ids already in it are
+    skipped, so an interrupted run continues where it stopped. Returns
+    (scored, skipped, seconds).
+    """
+    workers = workers or os.cpu_count() or 1
+    reviewer_options = reviewer_options or {}
+    done = scored_ids(output, output_format)
+    skipped = 0
+
+    def pending():
+        nonlocal skipped
+        for resume_id, text in resumes:
+            if resume_id in done:
+                skipped += 1
+            else:
+                yield resume_id, text
+
+    todo = pending()
+    batches = iter(lambda: list(itertools.islice(todo, batch_size)), [])
+    write_header = output_format == 'csv' and not (os.path.exists(output) and os.path.getsize(output))
+    scored = 0
+    start = last_report = time.perf_counter()
+
+    with open(output, 'a', encoding='utf-8', newline='') as handle, \
+            multiprocessing.Pool(workers, initializer=_init_scorer, initargs=(reviewer_options, job_description)) as pool:
+        writer = csv.DictWriter(handle, CSV_FIELDS) if output_format == 'csv' else None
+        if write_header:
+            writer.writeheader()
+
+        def write(results):
+            nonlocal scored, last_report
+            for result in results:
+                if writer:
+                    writer.writerow(csv_row(result))
+                else:
+                    handle.write(json.dumps(result) + '\n')
+            # Flushing every batch is what makes the output a usable checkpoint
+            handle.flush()
+            scored += len(results)
+            if progress and time.perf_counter() - last_report >= progress:
+                last_report = time.perf_counter()
+                print("%d scored, %.1f resumes/sec" % (scored, scored / (last_report - start)), file=sys.stderr)
+
+        # Only a couple of batches per worker are in flight, so memory does not grow with the input
+        window = collections.deque()
+        for batch in batches:
+            window.append(pool.apply_async(_score_batch, (batch,)))
+            if len(window) >= workers * 2:
+                write(window.popleft().get())
+        while window:
+            write(window.popleft().get())
+
+    return scored, skipped, time.perf_counter() - start
+
+
+def fit_model(args):
+    reviewer = ResumeReviewer()
+    texts = list(iter_corpus(args.corpus))
+    if not texts:
+        sys.exit("No documents found in %s" % args.corpus)
+
+    vectorizer = reviewer.fit_model(
+        texts,
+        components=args.components,
+        min_df=args.min_df,
+        max_df=args.max_df,
+        ngram_range=(1, args.ngram_max)
+    )
+    reviewer.save_model(args.output)
+    projection = " projected to %d LSA dimensions," % args.components if args.components else ""
+    print("Fitted on %d documents, vocabulary of %d terms,%s written to %s (%s)" % (
+        len(texts), len(vectorizer.vocabulary_), projection, args.output, reviewer.model_version))
+
+
+def download_nltk_data(args):
+    # Build a self-contained resource directory for offline deployments
+    ensure_nltk_resources(data_dir=args.output, offline=False)
+    print("NLTK resources %s available in %s; start the service with NLTK_DATA_DIR=%s RESUME_REVIEWER_OFFLINE=1" % (
+        ', '.join(sorted(NLTK_RESOURCES.values())), args.output, args.output))
+
+
+def export_taxonomy(args):
+    # Starting point for an external taxonomy: the built-in one as a JSON source
+    reviewer = ResumeReviewer()
+    with open(args.output, 'w', encoding='utf-8') as handle:
+        json.dump({
+            "skill_categories": reviewer.skill_categories,
+            "education_keywords": reviewer.education_keywords,
+            "experience_keywords": reviewer.experience_keywords
+        }, handle, indent=2)
+    print("Built-in taxonomy (%d skills) written to %s" % (len(reviewer.skill_keywords), args.output))
+
+
+def compile_taxonomy(args):
+    reviewer = ResumeReviewer(preprocessing=args.preprocessing)
+    taxonomy = compile_taxonomy_file(args.source, args.output, reviewer.preprocess_text)
+    print("Compiled %d skill phrases in %d categories to %s (version %s); start the service with TAXONOMY_PATH=%s" % (
+        len(taxonomy.phrases), len(taxonomy.skill_categories), args.output, taxonomy.version, args.output))
+
+
+def score(args):
+    with open(args.job, encoding='utf-8') as handle:
+        job_description = handle.read()
+    output_format = args.format or ('csv' if args.output.endswith('.csv') else 'jsonl')
+    reviewer_options = {
+        "model_path": args.model_path,
+        "vectorizer_mode": args.vectorizer_mode,
+        "preprocessing": args.preprocessing,
+        "taxonomy": args.taxonomy
+    }
+    scored, skipped, seconds = score_resumes(
+        job_description, iter_resumes(args.resumes), args.output, output_format,
+        workers=args.workers, batch_size=args.batch_size, reviewer_options=reviewer_options,
+        progress=args.progress
+    )
+    print("Scored %d resumes in %.1fs (%.1f resumes/sec), skipped %d already in %s" % (
+        scored, seconds, scored / seconds if seconds else 0.0, skipped, args.output))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resume reviewer command line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fit = commands.add_parser("fit-model", help="fit the TF-IDF vectorizer on a reference corpus and save it")
+    fit.add_argument("--corpus", required=True, help="directory of .txt files or JSONL with text/resume/job_description fields")
+    fit.add_argument("--output", required=True, help="where to write the model")
+    fit.add_argument("--min-df", type=int, default=1, help="ignore terms in fewer documents than this")
+    fit.add_argument("--max-df", type=float, default=1.0, help="ignore terms in more than this fraction of documents")
+    fit.add_argument("--ngram-max", type=int, default=1, help="largest word n-gram in the vocabulary")
+    fit.add_argument("--components", type=int, default=0,
+                     help="also fit a TruncatedSVD to this many dimensions for the lsa vectorizer mode (e.g. 256)")
+    fit.set_defaults(handler=fit_model)
+
+    download = commands.add_parser("download-nltk-data", help="download the NLTK resources into a directory for offline use")
+    download.add_argument("--output", required=True, help="resource directory to create")
+    download.set_defaults(handler=download_nltk_data)
+
+    export = commands.add_parser("export-taxonomy", help="write the built-in skill taxonomy as a JSON source")
+    export.add_argument("--output", required=True, help="JSON file to write")
+    export.set_defaults(handler=export_taxonomy)
+
+    compiler = commands.add_parser("compile-taxonomy", help="compile a JSON skill taxonomy into a fast-loading binary artifact")
+    compiler.add_argument("--source", required=True, help="JSON taxonomy with skill_categories, education_keywords, experience_keywords")
+    compiler.add_argument("--output", required=True, help="artifact to write")
+    compiler.add_argument("--preprocessing", default="nltk", help="nltk or fast (both normalize phrases the same way)")
+    compiler.set_defaults(handler=compile_taxonomy)
+
+    scorer = commands.add_parser("score", help="score a directory or JSONL of resumes against one job description")
+    scorer.add_argument("--job", required=True, help="text file with the job description")
+    scorer.add_argument("--resumes", required=True, help="directory of .txt files or JSONL with id and resume/text fields")
+    scorer.add_argument("--output", required=True, help="JSONL or CSV file; ids already in it are skipped")
+    scorer.add_argument("--format", choices=("jsonl", "csv"), help="output format (default: from the output extension)")
+    scorer.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    scorer.add_argument("--batch-size", type=int, default=32, help="resumes sent to a worker at a time")
+    scorer.add_argument("--model-path", default=None, help="TF-IDF model written by fit-model")
+    scorer.add_argument("--vectorizer-mode", default=None, help="pairwise, fitted, hashing or lsa")
+    scorer.add_argument("--preprocessing", default="nltk", help="nltk or fast")
+    scorer.add_argument("--taxonomy", default=None, help="JSON taxonomy or compiled artifact (default: built-in)")
+    scorer.add_argument("--progress", type=float, default=10.0, help="seconds between progress lines (0 disables)")
+    scorer.set_defaults(handler=score)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Near-duplicate detection with MinHash signatures of token shingles.
+
+A document's signature holds, for each of num_perm hash functions, the
+smallest hash of its shingles (runs of shingle_size consecutive tokens).
+The share of equal positions in two signatures estimates the Jaccard
+similarity of their shingle sets. Signatures are split into bands; only
+documents sharing a band are compared (locality-sensitive hashing).
+"""
+import zlib
+
+import numpy as np
+
+# Shingle hashes combine the CRC-32 of their tokens with this multiplier (mod 2**64)
+_SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_SHIFT = np.uint64(32)
+
+
+class MinHasher:
+    """Computes signatures; equal settings give equal signatures in every process.
+
+    The hash functions are multiply-shift hashes ((a * x + b) mod 2**64) >> 32
+    with random odd a, which need no modulo and vectorize well.
+    """
+    def __init__(self, num_perm=64, shingle_size=3, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.randint(0, 1 << 63, size=(num_perm, 1), dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.randint(0, 1 << 63, size=(num_perm, 1), dtype=np.int64).astype(np.uint64)
+
+    def shingle_hashes(self, tokens):
+        """Distinct 32-bit hashes of every run of shingle_size tokens"""
+        token_hashes = np.fromiter(map(zlib.crc32, map(str.encode, tokens)), dtype=np.uint64, count=len(tokens))
+        size = min(self.shingle_size, len(token_hashes))
+        count = len(token_hashes) - size + 1
+        hashes = np.zeros(max(count, 1), dtype=np.uint64)
+        for offset in range(size):
+            hashes = hashes * _SHINGLE_MULTIPLIER ^ token_hashes[offset:offset + count]
+        return np.unique((hashes ^ (hashes >> _SHIFT)).astype(np.uint32).astype(np.uint64))
+
+    def signature(self, tokens):
+        """uint32 signature of a token sequence, e.g. AnalyzedDocument.tokens"""
+        hashes = self.shingle_hashes(tokens)
+        return ((self.a * hashes + self.b) >> _SHIFT).min(axis=1).astype(np.uint32)
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+def band_layout(num_perm, threshold):
+    """(bands, rows) whose LSH threshold (1/bands)**(1/rows) is closest to threshold from below"""
+    layouts = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    below = [layout for layout in layouts if (1 / layout[0]) ** (1 / layout[1]) <= threshold]
+    return max(below or layouts[:1], key=lambda layout: (1 / layout[0]) ** (1 / layout[1]))
+
+
+class DuplicateFinder:
+    """Groups documents around representatives by signature similarity.
+
+    add() compares a signature with the representatives it shares an LSH
+    band with. If one is at least threshold similar, the document is its
+    duplicate; otherwise it becomes a representative itself. Every
+    duplicate is therefore within threshold of its representative.
+    """
+    def __init__(self, threshold, num_perm=64):
+        self.threshold = threshold
+        self.bands, self.rows = band_layout(num_perm, threshold)
+        self._buckets = {}
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    def match(self, signature):
+        """The most similar representative at or above the threshold, or None"""
+        best, best_similarity = None, self.threshold
+        seen = set()
+        for band_key in self._band_keys(signature):
+            for key in self._buckets.get(band_key, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                score = similarity(signature, self._signatures[key])
+                if score >= best_similarity:
+                    best, best_similarity = key, score
+        return best
+
+    def add(self, key, signature):
+        """Return the representative key signature duplicates, or None after making key one"""
+        representative = self.match(signature)
+        if representative is None:
+            self.add_representative(key, signature)
+        return representative
+
+    def add_representative(self, key, signature):
+        self._signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, []).append(key)
+
+    def remove(self, key):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets[band_key]
+            bucket.remove(key)
+            if not bucket:
+                del self._buckets[band_key]
+
+
+def find_duplicates(signatures, threshold):
+    """For every signature, the position of the earlier one it duplicates, or None"""
+    finder = DuplicateFinder(threshold, len(signatures[0]) if signatures else 64)
+    return [finder.add(position, signature) for position, signature in enumerate(signatures)]
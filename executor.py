@@ -0,0 +1,105 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from resume_reviewer import ResumeReviewer
+
+# Reviewer owned by each worker process, built once by the pool initializer
+_worker_reviewer = None
+
+
+def _init_worker(reviewer_options):
+    global _worker_reviewer
+    _worker_reviewer = ResumeReviewer(**reviewer_options)
+    # Warm the lazily loaded NLTK corpora before the first real request
+    _worker_reviewer.preprocess_text("warm up")
+
+
+def _call_worker(method, args):
+    return getattr(_worker_reviewer, method)(*args)
+
+
+class ExecutorBusy(Exception):
+    """Raised when the analysis queue is full and the caller should retry later"""
+    def __init__(self, retry_after):
+        super().__init__("Analysis queue is full")
+        self.retry_after = retry_after
+
+
+class AnalysisExecutor:
+    """Runs CPU-bound ResumeReviewer calls off the event loop.
+
+    With workers > 0 every call goes to a process pool in which each worker
+    holds its own warmed ResumeReviewer, built from reviewer_options, so one
+    container can use every core.
+    With workers == 0 calls run on a single background thread against the
+    given reviewer, which keeps the event loop free without sharing the
+    reviewer's vectorizer between threads.
+
+    At most max_pending calls may be queued or running; beyond that run()
+    raises ExecutorBusy instead of letting latency grow without bound.
+    """
+    def __init__(self, reviewer, workers=0, max_pending=None, retry_after=1, reviewer_options=None):
+        self.reviewer = reviewer
+        self.reviewer_options = reviewer_options or {}
+        self.workers = workers
+        self.max_pending = max_pending if max_pending is not None else max(1, workers) * 4
+        self.retry_after = retry_after
+        self.pending = 0
+        self._pool = self._new_pool()
+
+    def _new_pool(self):
+        if self.workers > 0:
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.reviewer_options,)
+            )
+        return ThreadPoolExecutor(max_workers=1)
+
+    def _submit(self, method, args):
+        if self.workers > 0:
+            return self._pool.submit(_call_worker, method, args)
+        return self._pool.submit(getattr(self.reviewer, method), *args)
+
+    def warm(self):
+        """Start every worker now instead of on the first requests"""
+        futures = [self._submit("preprocess_text", ("warm up",)) for _ in range(max(1, self.workers))]
+        for future in futures:
+            future.result()
+
+    async def run(self, method, *args):
+        """Run reviewer.<method>(*args) in the pool and return its result"""
+        if self.pending >= self.max_pending:
+            raise ExecutorBusy(self.retry_after)
+
+        self.pending += 1
+        pool = self._pool
+        try:
+            return await asyncio.wrap_future(self._submit(method, args))
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); the pool is unusable until replaced. The call
+            # is not retried since it may be what killed the worker; the client retries it later.
+            if self._pool is pool:
+                self._pool = self._new_pool()
+                pool.shutdown(wait=False)
+            raise ExecutorBusy(self.retry_after)
+        finally:
+            self.pending -= 1
+
+    def restart(self, reviewer, reviewer_options=None):
+        """Switch to a new reviewer on fresh workers.
+
+        Calls already submitted finish on the old workers, which exit once
+        they are done; new calls go to the new pool straight away.
+        """
+        old_pool = self._pool
+        self.reviewer = reviewer
+        self.reviewer_options = reviewer_options or {}
+        self._pool = self._new_pool()
+        old_pool.shutdown(wait=False)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
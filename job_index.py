@@ -0,0 +1,95 @@
+import numpy as np
+
+from resume_index import ResumeIndex, dense_row
+from resume_reviewer import combine_scores
+
+
+class JobIndex(ResumeIndex):
+    """Open job postings for "best postings for this resume" matches.
+
+    Postings are stored like the resumes of a ResumeIndex: a sparse TF-IDF
+    row and the skills extract_skills finds in them. The skill matrix in
+    column-major form is an inverted index from every skill to the postings
+    that ask for it, so a match only scores postings sharing at least one
+    skill with the resume and skips the rest of the pool. Postings are added,
+    replaced and deleted incrementally with add_many() and delete().
+    """
+    def _reset(self):
+        self._postings = None
+        super()._reset()
+
+    def _materialize(self):
+        if self._pending or self.skills.shape[1] != len(self.skill_names):
+            self._postings = None
+        super()._materialize()
+
+    def save(self):
+        with self._lock:
+            super().save()
+            self._postings = None
+
+    def postings(self):
+        """Skill -> posting rows, as a CSC matrix with one column per skill; call with the lock held"""
+        self._materialize()
+        if self._postings is None:
+            self._postings = self.skills.tocsc()
+        return self._postings
+
+    def match(self, resume, top_k=10, min_skill_match=0.0):
+        """Top-k postings for a resume (text, AnalyzedDocument or PreparedJob from prepare_documents), best match first.
+
+        Only postings sharing a skill with the resume, and at least
+        min_skill_match of their own skills, are scored. Returns (results,
+        candidates), where candidates is the number of postings scored.
+        """
+        reviewer = self.reviewer
+        [prepared] = reviewer.prepare_documents([resume])
+        resume_skills = prepared.skills
+        education, experience = reviewer.keyword_scores(prepared)
+        with self._lock:
+            self._check_taxonomy()
+            postings = self.postings()
+            vectors, skills, alive = self.vectors, self.skills, self._alive.copy()
+            ids, skill_names = list(self.ids), list(self.skill_names)
+            skill_ids = [self._skill_ids[skill] for skill in resume_skills if skill in self._skill_ids]
+
+        if top_k < 1 or not skill_ids:
+            return [], 0
+
+        # Number of the resume's skills every posting asks for, from the postings of those skills only
+        rows = np.concatenate([postings.indices[postings.indptr[skill_id]:postings.indptr[skill_id + 1]]
+                               for skill_id in skill_ids])
+        overlap = np.bincount(rows, minlength=len(ids))
+        candidates = np.flatnonzero((overlap > 0) & alive)
+        skill_matches = overlap[candidates] / np.diff(skills.indptr)[candidates]
+        if min_skill_match > 0:
+            keep = skill_matches >= min_skill_match
+            candidates, skill_matches = candidates[keep], skill_matches[keep]
+        if not len(candidates):
+            return [], 0
+
+        similarities = vectors[candidates] @ dense_row(prepared.vector)
+        overall = combine_scores(similarities, skill_matches, education, experience)
+
+        top_k = min(top_k, len(candidates))
+        top = np.argpartition(-overall, top_k - 1)[:top_k]
+        top = top[np.argsort(-overall[top], kind='stable')]
+
+        resume_skill_set = set(resume_skills)
+        results = []
+        for position in top:
+            row = candidates[position]
+            job_skills = [skill_names[skill_id] for skill_id in skills.indices[skills.indptr[row]:skills.indptr[row + 1]]]
+            results.append({
+                "id": ids[row],
+                "overall_match_score": round(float(overall[position]) * 100, 2),
+                "similarity_score": round(float(similarities[position]) * 100, 2),
+                "skill_match": {
+                    "percentage": round(float(skill_matches[position]) * 100, 2),
+                    "matching_skills": sorted(set(job_skills) & resume_skill_set),
+                    "missing_skills": [skill for skill in job_skills if skill not in resume_skill_set]
+                },
+                "education_score": round(education * 100, 2),
+                "experience_score": round(experience * 100, 2)
+            })
+        return results, len(candidates)
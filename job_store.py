@@ -0,0 +1,98 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+def job_id_for(job_description):
+    """Content hash used as the id of a registered job description"""
+    return hashlib.sha256(job_description.encode('utf-8')).hexdigest()
+
+
+class JobStore:
+    """Size-bounded LRU cache of prepared jobs keyed by content hash.
+
+    When a directory is given, prepared jobs are also pickled there so they
+    survive restarts and can be reloaded after being evicted from memory.
+    """
+    def __init__(self, reviewer, max_size=1024, path=None):
+        self.reviewer = reviewer
+        self.max_size = max_size
+        self.path = path
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def register(self, job_description, job=None):
+        """Prepare a job description once and return (job_id, prepared job).
+
+        An already prepared job (e.g. computed in a worker process) can be
+        passed in to be stored as is.
+        """
+        job_id = job_id_for(job_description)
+        cached = self.get(job_id)
+        if cached is not None:
+            return job_id, cached
+        if job is None:
+            job = self.reviewer.prepare_job(job_description)
+        self._remember(job_id, job)
+        self._save(job_id, job)
+        return job_id, job
+
+    def get(self, job_id):
+        """Return the prepared job for job_id, or None if it is unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._jobs.move_to_end(job_id)
+
+        if job is None:
+            job = self._load(job_id)
+            if job is not None:
+                self._remember(job_id, job)
+        return self._refresh(job_id, job)
+
+    def _refresh(self, job_id, job):
+        # Jobs prepared with an older taxonomy or model get their skills or vector computed again, once
+        if job is None or (getattr(job, 'taxonomy_version', None) == self.reviewer.taxonomy_version
+                           and getattr(job, 'model_version', None) == self.reviewer.model_version):
+            return job
+        job = self.reviewer.prepare_job(job)
+        self._remember(job_id, job)
+        self._save(job_id, job)
+        return job
+
+    def _remember(self, job_id, job):
+        with self._lock:
+            self._jobs[job_id] = job
+            self._jobs.move_to_end(job_id)
+            while len(self._jobs) > self.max_size:
+                self._jobs.popitem(last=False)
+
+    def _file(self, job_id):
+        return os.path.join(self.path, job_id + '.pickle')
+
+    def _save(self, job_id, job):
+        if not self.path:
+            return
+        # Write to a temporary file first so readers never see a partial pickle
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as handle:
+            pickle.dump(job, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._file(job_id))
+
+    def _load(self, job_id):
+        # Job ids are hex digests; anything else cannot name a stored file
+        if not self.path or not all(char in '0123456789abcdef' for char in job_id):
+            return None
+        try:
+            with open(self._file(job_id), 'rb') as handle:
+                return pickle.load(handle)
+        except FileNotFoundError:
+            return None
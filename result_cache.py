@@ -0,0 +1,126 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def result_key(job_id, resume_text, version):
+    """Content hash of one analysis: job (by its id), resume text and the reviewer version"""
+    digest = hashlib.sha256()
+    for part in (version, job_id, resume_text):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Analysis results by content hash, in an in-memory LRU and optionally SQLite.
+
+    Entries expire ttl seconds after they were stored. The memory tier holds
+    at most max_size entries; the SQLite tier at path is shared by every
+    process that opens the same file and is checked on a memory miss.
+    Results are stored as JSON, so callers always get a fresh copy.
+
+    Keys include the reviewer version, so a new model or taxonomy never sees
+    older results; purge() drops them from the database as well.
+
+    The SQLite tier can wait on other processes' writes, so callers on an
+    event loop use the *_memory methods inline and run the *_shared ones
+    in a thread.
+    """
+    def __init__(self, max_size=4096, ttl=3600, path=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, version TEXT NOT NULL, result TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._db_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def shared(self):
+        """Whether there is a SQLite tier"""
+        return self._db is not None
+
+    def lookup(self, key):
+        """Return (tier, result) with tier "memory" or "sqlite", or (None, None) on a miss"""
+        result = self.lookup_memory(key)
+        if result is not None:
+            return "memory", result
+        result = self.lookup_shared(key)
+        if result is not None:
+            return "sqlite", result
+        return None, None
+
+    def lookup_memory(self, key):
+        """The result in the memory tier, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    return json.loads(entry[1])
+                del self._entries[key]
+        return None
+
+    def lookup_shared(self, key):
+        """The result in the SQLite tier (copied to the memory tier), or None"""
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute("SELECT result, expires FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        self._remember(key, row[0], row[1])
+        return json.loads(row[0])
+
+    def put(self, key, result, version):
+        """Store a result; version is kept next to it so purge() can find stale rows"""
+        self.put_memory(key, result)
+        self.put_shared(key, result, version)
+
+    def put_memory(self, key, result):
+        """Store a result in the memory tier only"""
+        self._remember(key, json.dumps(result), time.time() + self.ttl)
+
+    def put_shared(self, key, result, version):
+        """Store a result in the SQLite tier only"""
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                                 (key, version, json.dumps(result), time.time() + self.ttl))
+
+    def _remember(self, key, value, expires):
+        if self.max_size < 1:
+            return
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def purge(self, version):
+        """Empty the memory tier and drop expired rows and rows of another version from SQLite"""
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM results WHERE version != ? OR expires <= ?", (version, time.time()))
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
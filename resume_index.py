@@ -0,0 +1,443 @@
+import json
+import os
+import threading
+
+import numpy as np
+from scipy import sparse
+
+from dedup import DuplicateFinder, MinHasher
+from resume_reviewer import combine_scores
+
+# Version of the on-disk index layout
+INDEX_FORMAT = 1
+
+# Arrays stored next to meta.json, one .npy file each so they can be memory-mapped
+_ARRAYS = ('skills_indices', 'skills_indptr', 'education', 'experience')
+# Vectors are stored as CSR arrays, or as one dense array for the 'lsa' vectorizer
+_SPARSE_VECTOR_ARRAYS = ('vectors_data', 'vectors_indices', 'vectors_indptr')
+_DENSE_VECTOR_ARRAYS = ('vectors',)
+
+
+class StaleIndexError(ValueError):
+    """The index holds skills extracted with another taxonomy than its reviewer's"""
+
+
+def dense_row(vector):
+    """A single sparse or dense vector row as a flat float32 array.
+
+    Scoring a pool against a dense query is one matrix-vector product, which
+    for sparse rows is much cheaper than a sparse x sparse product over the
+    hashing vectorizer's million columns.
+    """
+    if not sparse.issparse(vector):
+        return np.asarray(vector, dtype=np.float32).ravel()
+    vector = vector.tocsr()
+    dense = np.zeros(vector.shape[1], dtype=np.float32)
+    dense[vector.indices] = vector.data
+    return dense
+
+
+class ResumeIndex:
+    """Pool of resumes for top-k "best resumes for this job" searches.
+
+    Resumes are stored as a sparse TF-IDF matrix (one L2-normalised row per
+    resume), or a contiguous float32 array with the 'lsa' vectorizer, plus a sparse resume x skill incidence matrix and the education
+    and experience scores, so a search scores the whole pool with the
+    analyze_resume formula in a handful of vectorized operations.
+
+    Additions and deletions are applied in memory and written to path by
+    save(), which also runs automatically every autosave_every changes. On
+    load the arrays are memory-mapped rather than read into memory.
+
+    With duplicate_threshold, a resume whose MinHash signature is that
+    similar to an indexed one is recorded as its near-duplicate. Searches
+    score only the representative of each group and list its duplicates
+    with it, so copies of one resume never fill the top-k.
+
+    Skills and keyword scores are stored, not the resume texts, so they
+    cannot be extracted again when the reviewer's taxonomy changes. Until
+    the index is cleared and rebuilt, searches and additions then raise
+    StaleIndexError, and an index saved under another taxonomy refuses to
+    load.
+    """
+    def __init__(self, reviewer, path=None, autosave_every=1000, duplicate_threshold=None):
+        if reviewer.vectorizer_mode == 'pairwise':
+            raise ValueError("A resume index needs a fitted, hashing or lsa vectorizer, not 'pairwise'")
+        self.reviewer = reviewer
+        self.dense = reviewer.vectorizer_mode == 'lsa'
+        self.path = path
+        self.autosave_every = autosave_every
+        self.duplicate_threshold = duplicate_threshold
+        self._lock = threading.RLock()
+        self._unsaved = 0
+        self._generation = 0
+        # Incremented whenever the skill vocabulary starts over, for caches keyed on skill ids
+        self.vocabulary_generation = 0
+        self._reset()
+
+        if path and os.path.exists(os.path.join(path, 'meta.json')):
+            self._load()
+
+    def _reset(self):
+        """Empty the index in memory"""
+        # Taxonomy the stored skills and keyword scores were extracted with
+        self.taxonomy_version = self.reviewer.taxonomy_version
+
+        # Row -> resume id and resume id -> row, deleted rows are dropped on save
+        self.ids = []
+        self._rows = {}
+        self._alive = np.zeros(0, dtype=bool)
+
+        # Skill vocabulary; columns of the skill incidence matrix
+        self.vocabulary_generation += 1
+        self.skill_names = []
+        self._skill_ids = {}
+
+        if self.dense:
+            self.vectors = np.zeros((0, self._feature_count()), dtype=np.float32)
+        else:
+            self.vectors = sparse.csr_matrix((0, self._feature_count()), dtype=np.float32)
+        self.skills = sparse.csr_matrix((0, 0), dtype=np.int8)
+        self.education = np.zeros(0, dtype=np.float32)
+        self.experience = np.zeros(0, dtype=np.float32)
+        self._pending = []
+
+        # Near-duplicate groups: duplicate id -> representative id and representative id -> duplicate ids
+        self.duplicate_of = {}
+        self._duplicates = {}
+        self._signatures = {}
+        self._hasher = self._finder = None
+        if self.duplicate_threshold:
+            self._hasher = MinHasher()
+            self._finder = DuplicateFinder(self.duplicate_threshold, self._hasher.num_perm)
+
+    def _feature_count(self):
+        return self.reviewer.vectorize(['']).shape[1]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, resume_id):
+        return resume_id in self._rows
+
+    def add(self, resume_id, resume_text):
+        """Add or replace one resume"""
+        self.add_many([(resume_id, resume_text)])
+
+    def add_many(self, items):
+        """Add or replace (resume_id, resume_text) pairs, vectorizing them in one call.
+
+        The texts may also be PreparedJobs from the reviewer's
+        prepare_documents, e.g. analyzed in executor workers; only their
+        outdated parts are redone. Returns {resume id: representative id}
+        for the added resumes found to be near-duplicates.
+        """
+        # An id given twice is added once, with its last text
+        items = list(dict(items).items())
+        if not items:
+            return {}
+        documents = self.reviewer.prepare_documents([text for _, text in items])
+        if self.dense:
+            vectors = np.vstack([document.vector for document in documents]).astype(np.float32)
+        else:
+            vectors = sparse.vstack([document.vector for document in documents], format='csr', dtype=np.float32)
+        signatures = [self._hasher.signature(document.document.tokens) if self._hasher else None
+                      for document in documents]
+
+        duplicates = {}
+        with self._lock:
+            self._check_taxonomy()
+            if documents[0].taxonomy_version != self.taxonomy_version:
+                # The reviewer was replaced with another taxonomy while the documents were prepared
+                documents = self.reviewer.prepare_documents(documents)
+            self._alive = np.concatenate([self._alive, np.ones(len(items), dtype=bool)])
+            for row_offset, ((resume_id, _), document) in enumerate(zip(items, documents)):
+                self._delete_row(resume_id)
+                if self._finder is not None:
+                    representative = self._group(resume_id, signatures[row_offset])
+                    if representative is not None:
+                        duplicates[resume_id] = representative
+                skill_ids = [self._skill_id(skill) for skill in document.skills]
+                education, experience = self.reviewer.keyword_scores(document)
+                self._rows[resume_id] = len(self.ids)
+                self.ids.append(resume_id)
+                self._pending.append((vectors[row_offset], skill_ids, education, experience))
+            self._changed(len(items))
+        return duplicates
+
+    def _group(self, resume_id, signature):
+        """Record a resume's signature and return the representative it duplicates, or None"""
+        self._signatures[resume_id] = signature
+        representative = self._finder.add(resume_id, signature)
+        if representative is not None:
+            self.duplicate_of[resume_id] = representative
+            self._duplicates.setdefault(representative, []).append(resume_id)
+        return representative
+
+    def _ungroup(self, resume_id):
+        self._signatures.pop(resume_id, None)
+        representative = self.duplicate_of.pop(resume_id, None)
+        if representative is not None:
+            self._duplicates[representative].remove(resume_id)
+            if not self._duplicates[representative]:
+                del self._duplicates[representative]
+            return
+        if self._finder is not None:
+            self._finder.remove(resume_id)
+        # Duplicates of a removed representative are grouped again among themselves
+        for member in self._duplicates.pop(resume_id, []):
+            del self.duplicate_of[member]
+            self._group(member, self._signatures[member])
+
+    def clear(self):
+        """Remove every resume, e.g. to rebuild a stale index; returns the number removed"""
+        with self._lock:
+            removed = len(self)
+            self._reset()
+            if self.path:
+                self.save()
+            return removed
+
+    def _check_taxonomy(self):
+        """Raise StaleIndexError if the stored skills come from another taxonomy; call with the lock held"""
+        version = self.reviewer.taxonomy_version
+        if version == self.taxonomy_version:
+            return
+        if self._rows:
+            raise StaleIndexError("Index was built with taxonomy %s, not %s; clear and rebuild it" % (
+                self.taxonomy_version, version))
+        # Nothing stored depends on the old taxonomy
+        self.taxonomy_version = version
+
+    def delete(self, resume_id):
+        """Remove a resume; returns False if it was not in the index"""
+        with self._lock:
+            deleted = self._delete_row(resume_id)
+            if deleted:
+                self._changed(1)
+            return deleted
+
+    def _delete_row(self, resume_id):
+        row = self._rows.pop(resume_id, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._ungroup(resume_id)
+        return True
+
+    def _skill_id(self, skill):
+        skill_id = self._skill_ids.get(skill)
+        if skill_id is None:
+            skill_id = self._skill_ids[skill] = len(self.skill_names)
+            self.skill_names.append(skill)
+        return skill_id
+
+    def _changed(self, count):
+        self._unsaved += count
+        if self.path and self.autosave_every and self._unsaved >= self.autosave_every:
+            self.save()
+
+    def _materialize(self):
+        """Fold pending additions into the matrices"""
+        skill_count = len(self.skill_names)
+        # Widen the skill matrix for skills first seen since the last merge
+        self.skills = sparse.csr_matrix(
+            (self.skills.data, self.skills.indices, self.skills.indptr),
+            shape=(self.skills.shape[0], skill_count)
+        )
+        if not self._pending:
+            return
+
+        vectors, skill_rows, education, experience = zip(*self._pending)
+        indices = np.fromiter((skill_id for row in skill_rows for skill_id in row), dtype=np.int32)
+        indptr = np.concatenate([[0], np.cumsum([len(row) for row in skill_rows])]).astype(np.int32)
+        new_skills = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int8), indices, indptr),
+            shape=(len(skill_rows), skill_count)
+        )
+
+        if self.dense:
+            self.vectors = np.concatenate([self.vectors, np.vstack(vectors)])
+        else:
+            self.vectors = sparse.vstack([self.vectors] + list(vectors), format='csr', dtype=np.float32)
+        self.skills = sparse.vstack([self.skills, new_skills], format='csr', dtype=np.int8)
+        self.education = np.concatenate([self.education, np.asarray(education, dtype=np.float32)])
+        self.experience = np.concatenate([self.experience, np.asarray(experience, dtype=np.float32)])
+        self._pending = []
+
+    def search(self, job_description, top_k=10):
+        """Top-k resumes for a job description (text or PreparedJob), best match first"""
+        job = self.reviewer.prepare_job(job_description)
+        with self._lock:
+            self._check_taxonomy()
+            self._materialize()
+            vectors, skills, alive = self.vectors, self.skills, self._alive.copy()
+            education, experience, ids = self.education, self.experience, list(self.ids)
+            job_skill_ids = [self._skill_ids[skill] for skill in job.skills if skill in self._skill_ids]
+            # Duplicates are reported with their representative instead of being ranked themselves
+            alive[[self._rows[resume_id] for resume_id in self.duplicate_of]] = False
+            duplicates = {representative: list(members) for representative, members in self._duplicates.items()}
+
+        if top_k < 1 or not alive.any():
+            return []
+
+        similarities = vectors @ dense_row(job.vector)
+        if job.skills:
+            # Matching skills per resume as a product with the job's skill indicator, much
+            # cheaper than slicing the job's columns out of the CSR matrix
+            job_skill_mask = np.zeros(skills.shape[1], dtype=np.float32)
+            job_skill_mask[job_skill_ids] = 1
+            skill_matches = (skills @ job_skill_mask) / len(job.skills)
+        else:
+            skill_matches = np.zeros(len(ids))
+        overall = combine_scores(similarities, skill_matches, education, experience)
+        overall[~alive] = -np.inf
+
+        top_k = min(top_k, int(alive.sum()))
+        top = np.argpartition(-overall, top_k - 1)[:top_k]
+        top = top[np.argsort(-overall[top], kind='stable')]
+
+        job_skill_set = set(job.skills)
+        results = []
+        for row in top:
+            resume_skills = {self.skill_names[skill_id] for skill_id in skills.indices[skills.indptr[row]:skills.indptr[row + 1]]}
+            matching_skills = sorted(resume_skills & job_skill_set)
+            results.append({
+                "id": ids[row],
+                "overall_match_score": round(float(overall[row]) * 100, 2),
+                "similarity_score": round(float(similarities[row]) * 100, 2),
+                "skill_match": {
+                    "percentage": round(float(skill_matches[row]) * 100, 2),
+                    "matching_skills": matching_skills,
+                    "missing_skills": [skill for skill in job.skills if skill not in resume_skills]
+                },
+                "education_score": round(float(education[row]) * 100, 2),
+                "experience_score": round(float(experience[row]) * 100, 2),
+                "duplicates": duplicates.get(ids[row], [])
+            })
+        return results
+
+    def save(self):
+        """Write the index to path, dropping deleted rows"""
+        if not self.path:
+            raise ValueError("This index has no path to save to")
+        with self._lock:
+            self._materialize()
+            keep = np.flatnonzero(self._alive)
+            self.vectors = self.vectors[keep]
+            self.skills = self.skills[keep]
+            self.education = self.education[keep]
+            self.experience = self.experience[keep]
+            self.ids = [self.ids[row] for row in keep]
+            self._rows = {resume_id: row for row, resume_id in enumerate(self.ids)}
+            self._alive = np.ones(len(self.ids), dtype=bool)
+
+            # Each save writes a new generation of array files and then switches
+            # meta.json to it, so a crash never leaves a half-written index
+            os.makedirs(self.path, exist_ok=True)
+            previous, self._generation = self._generation, self._generation + 1
+            if self.dense:
+                arrays = {'vectors': np.ascontiguousarray(self.vectors, dtype=np.float32)}
+            else:
+                arrays = {
+                    'vectors_data': self.vectors.data.astype(np.float32),
+                    'vectors_indices': self.vectors.indices.astype(np.int32),
+                    'vectors_indptr': self.vectors.indptr.astype(np.int64)
+                }
+            arrays.update({
+                'skills_indices': self.skills.indices.astype(np.int32),
+                'skills_indptr': self.skills.indptr.astype(np.int64),
+                'education': self.education,
+                'experience': self.experience
+            })
+            if self._finder is not None:
+                arrays['signatures'] = self._signature_array()
+            for name, array in arrays.items():
+                np.save(self._array_file(name, self._generation), array)
+
+            meta = {
+                "format": INDEX_FORMAT,
+                "generation": self._generation,
+                "model_version": self.reviewer.model_version,
+                "taxonomy_version": self.taxonomy_version,
+                "feature_count": self.vectors.shape[1],
+                "ids": self.ids,
+                "skill_names": self.skill_names,
+                "signatures": self._finder is not None,
+                "duplicate_of": self.duplicate_of
+            }
+            tmp_meta = os.path.join(self.path, 'meta.json.tmp')
+            with open(tmp_meta, 'w', encoding='utf-8') as handle:
+                json.dump(meta, handle)
+            os.replace(tmp_meta, os.path.join(self.path, 'meta.json'))
+
+            for name in _ARRAYS + _SPARSE_VECTOR_ARRAYS + _DENSE_VECTOR_ARRAYS + ('signatures',):
+                old_file = self._array_file(name, previous)
+                if os.path.exists(old_file):
+                    os.remove(old_file)
+            self._unsaved = 0
+
+    def _signature_array(self):
+        """Signatures in row order; rows indexed without one (e.g. before deduplication was on) are zero"""
+        signatures = np.zeros((len(self.ids), self._hasher.num_perm), dtype=np.uint32)
+        for row, resume_id in enumerate(self.ids):
+            signature = self._signatures.get(resume_id)
+            if signature is not None:
+                signatures[row] = signature
+        return signatures
+
+    def _array_file(self, name, generation):
+        return os.path.join(self.path, '%s.%d.npy' % (name, generation))
+
+    def _load(self):
+        with open(os.path.join(self.path, 'meta.json'), encoding='utf-8') as handle:
+            meta = json.load(handle)
+        if meta.get("format") != INDEX_FORMAT:
+            raise ValueError("%s is not a resume index (format %s)" % (self.path, INDEX_FORMAT))
+        if meta["model_version"] != self.reviewer.model_version:
+            raise ValueError("Index at %s was built with vectorizer %s, not %s; rebuild it" % (
+                self.path, meta["model_version"], self.reviewer.model_version))
+        # (indexes saved before taxonomies were recorded are assumed to match)
+        taxonomy_version = meta.get("taxonomy_version", self.reviewer.taxonomy_version)
+        if taxonomy_version != self.reviewer.taxonomy_version:
+            raise StaleIndexError("Index at %s was built with taxonomy %s, not %s; rebuild it" % (
+                self.path, taxonomy_version, self.reviewer.taxonomy_version))
+
+        self._generation = meta["generation"]
+        names = _ARRAYS + (_DENSE_VECTOR_ARRAYS if self.dense else _SPARSE_VECTOR_ARRAYS)
+        arrays = {name: np.load(self._array_file(name, self._generation), mmap_mode='r') for name in names}
+
+        self.ids = meta["ids"]
+        self._rows = {resume_id: row for row, resume_id in enumerate(self.ids)}
+        self._alive = np.ones(len(self.ids), dtype=bool)
+        self.skill_names = meta["skill_names"]
+        self._skill_ids = {skill: skill_id for skill_id, skill in enumerate(self.skill_names)}
+
+        if self.dense:
+            self.vectors = arrays['vectors']
+        else:
+            self.vectors = sparse.csr_matrix(
+                (arrays['vectors_data'], arrays['vectors_indices'], arrays['vectors_indptr']),
+                shape=(len(self.ids), meta["feature_count"]), copy=False
+            )
+        self.skills = sparse.csr_matrix(
+            (np.ones(len(arrays['skills_indices']), dtype=np.int8), arrays['skills_indices'], arrays['skills_indptr']),
+            shape=(len(self.ids), len(self.skill_names)), copy=False
+        )
+        self.education = arrays['education']
+        self.experience = arrays['experience']
+
+        if self._finder is not None and meta.get("signatures"):
+            signatures = np.load(self._array_file('signatures', self._generation), mmap_mode='r')
+            duplicate_of = meta.get("duplicate_of", {})
+            for row, resume_id in enumerate(self.ids):
+                signature = signatures[row]
+                if not signature.any():
+                    continue
+                self._signatures[resume_id] = signature
+                representative = duplicate_of.get(resume_id)
+                if representative is None:
+                    self._finder.add_representative(resume_id, signature)
+                else:
+                    self.duplicate_of[resume_id] = representative
+                    self._duplicates.setdefault(representative, []).append(resume_id)
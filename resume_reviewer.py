@@ -1,29 +1,60 @@
+import copy
+import os
 import re
 import json
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-
-# Download necessary NLTK resources during module initialization
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('stopwords')
-    nltk.download('wordnet')
+import hashlib
+import pickle
+import time
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from taxonomy import Taxonomy, load_taxonomy
+
+# NLTK and scikit-learn take seconds to import, so they are imported where they
+# are first used instead of here; importing this module stays cheap.
+
+# NLTK resources and the package that provides each of them
+NLTK_RESOURCES = {
+    'tokenizers/punkt': 'punkt',
+    'corpora/stopwords': 'stopwords',
+    'corpora/wordnet': 'wordnet',
+}
+
+def ensure_nltk_resources(data_dir=None, offline=None, resources=None):
+    """Make sure the NLTK resources are available, downloading missing ones unless offline.
+
+    data_dir (default: the NLTK_DATA_DIR environment variable) is searched first
+    and receives downloads. offline (default: RESUME_REVIEWER_OFFLINE=1) turns a
+    missing resource into a LookupError instead of a network download.
+    """
+    import nltk
+
+    if data_dir is None:
+        data_dir = os.environ.get('NLTK_DATA_DIR') or None
+    if offline is None:
+        offline = os.environ.get('RESUME_REVIEWER_OFFLINE') == '1'
+    if data_dir and data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, data_dir)
+
+    for resource in resources or NLTK_RESOURCES:
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            if offline:
+                raise LookupError("NLTK resource %r is missing from %s and downloads are disabled; "
+                                  "build it with 'python cli.py download-nltk-data'" % (resource, nltk.data.path))
+            nltk.download(NLTK_RESOURCES[resource], download_dir=data_dir, quiet=True)
 
 def preprocess_text(text, lemmatizer=None, stop_words=None):
     """Clean and preprocess the text data"""
+    from nltk.tokenize import word_tokenize
+
     # Initialize lemmatizer and stop_words if not provided
     if lemmatizer is None:
+        from nltk.stem import WordNetLemmatizer
         lemmatizer = WordNetLemmatizer()
 
     if stop_words is None:
+        from nltk.corpus import stopwords
         stop_words = set(stopwords.words('english'))
 
     # Convert to lowercase
@@ -40,14 +71,190 @@ def preprocess_text(text, lemmatizer=None, stop_words=None):
 
     return ' '.join(processed_tokens)
 
-class ResumeReviewer:
+_NON_LETTERS = re.compile(r'[^a-zA-Z\s]')
+
+# Words that NLTK's Treebank tokenizer splits even in letters-only text
+CONTRACTION_SPLITS = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na'),
+}
+
+def fast_tokenize(text):
+    """Tokenize text of only letters and whitespace exactly like word_tokenize, using str.split"""
+    tokens = []
+    for token in text.split():
+        split = CONTRACTION_SPLITS.get(token)
+        if split:
+            tokens.extend(split)
+        else:
+            tokens.append(token)
+    return tokens
+
+def fast_preprocess_text(text, lemmatize, stop_words):
+    """Same output as preprocess_text, without word_tokenize and with a caller-supplied (cached) lemmatize"""
+    text = _NON_LETTERS.sub(' ', text.lower())
+    return ' '.join([lemmatize(token) for token in fast_tokenize(text) if token not in stop_words])
+
+# Characters of raw text preprocessed at a time by iter_preprocessed_tokens
+CHUNK_CHARS = 65536
+
+def iter_preprocessed_tokens(text, lemmatize, stop_words, chunk_chars=CHUNK_CHARS):
+    """Yield the tokens of fast_preprocess_text one at a time, working through text in chunks.
+
+    Only one chunk is lowercased and cleaned at a time, so no full-size
+    intermediate copies of the text are made. A word cut by a chunk boundary
+    is carried over to the next chunk (words longer than a chunk are split).
+    Memory is only bounded for those copies: callers that keep the tokens,
+    like AnalyzedDocument, still hold all of them.
+    """
+    carry = ''
+    for start in range(0, len(text), chunk_chars):
+        piece = carry + _NON_LETTERS.sub(' ', text[start:start + chunk_chars].lower())
+        carry = ''
+        if not piece[-1].isspace() and start + chunk_chars < len(text):
+            cut = max(piece.rfind(' '), piece.rfind('\n'), piece.rfind('\t'))
+            if cut >= 0 or len(piece) < chunk_chars:
+                piece, carry = piece[:cut + 1], piece[cut + 1:]
+        yield from [lemmatize(token) for token in fast_tokenize(piece) if token not in stop_words]
+    if carry:
+        yield from [lemmatize(token) for token in fast_tokenize(carry) if token not in stop_words]
+
+def truncate_text(text, max_chars):
+    """Cut text to at most max_chars characters, at a whitespace boundary when one is near the end"""
+    if len(text) <= max_chars:
+        return text
+    text = text[:max_chars]
+    boundary = max(text.rfind(' '), text.rfind('\n'), text.rfind('\t'))
+    return text[:boundary] if boundary >= max_chars * 0.9 else text
+
+class AnalyzedDocument:
+    """A preprocessed text shared by every scorer, so each input is only tokenized once"""
+    def __init__(self, text, tokens=None):
+        self.text = text
+        self.tokens = text.split() if tokens is None else tokens
+        self.token_set = set(self.tokens)
+
+    @classmethod
+    def from_tokens(cls, tokens):
+        tokens = list(tokens)
+        return cls(' '.join(tokens), tokens)
+
+class PreparedJob:
+    """Job-side artifacts computed once and reused for every resume scored against the job"""
+    def __init__(self, document, skills, categories, vector=None, taxonomy_version=None, model_version=None):
+        self.document = document
+        self.skills = skills
+        self.categories = categories
+        # TF-IDF row of the job, only available when the vectorizer does not refit per call
+        self.vector = vector
+        # Skills and categories are only valid for the taxonomy they were extracted with,
+        # and the vector for the model it was computed with
+        self.taxonomy_version = taxonomy_version
+        self.model_version = model_version
+
+class StageTimer:
+    """Per-stage durations (seconds) and input sizes collected during one analysis"""
     def __init__(self):
+        self.stages = {}
+        self.sizes = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def size(self, name, value):
+        self.sizes[name] = value
+
+    def as_dict(self):
+        return {"stages": dict(self.stages), "sizes": dict(self.sizes)}
+
+class _NullTimer:
+    """Timer used when timings are off: every stage is the same shared no-op context"""
+    _stage = nullcontext()
+
+    def stage(self, name):
+        return self._stage
+
+    def size(self, name, value):
+        pass
+
+NULL_TIMER = _NullTimer()
+
+def combine_scores(similarity, skill_match, education, experience):
+    """Weighted overall score; works on floats and on NumPy arrays alike"""
+    return 0.5 * similarity + 0.3 * skill_match + 0.1 * education + 0.1 * experience
+
+# Top-level keys of an analyze_resume result. Callers that need only some of them pass them as
+# fields, and the rest (notably the three skill category breakdowns) is never computed
+RESULT_FIELDS = ('overall_match_score', 'similarity_score', 'skill_match', 'skill_categories',
+                 'education_score', 'experience_score')
+
+# Version of the pickled vectorizer model written by save_model
+MODEL_FORMAT = 1
+
+# How text is preprocessed:
+#   nltk - word_tokenize and an uncached WordNet lemmatizer (original behaviour)
+#   fast - str.split based tokenization and a bounded token -> lemma cache
+#   chunked - fast, lowercased and cleaned one fixed-size chunk of the text at a time, so very large inputs
+#             get no full-size intermediate copies (the tokens and preprocessed text still grow with the input)
+PREPROCESSING_MODES = ('nltk', 'fast', 'chunked')
+
+# How TF-IDF vectors are produced:
+#   pairwise - a fresh vectorizer is fitted on the documents of every call (original behaviour)
+#   fitted   - a vectorizer fitted once on a reference corpus and loaded from model_path
+#   hashing  - a stateless HashingVectorizer (term frequencies, no fitted vocabulary or IDF)
+#   lsa      - a fitted vectorizer whose rows are projected by a TruncatedSVD fitted with it (latent
+#              semantic analysis) to a few hundred dense dimensions; models with a projection load in this mode
+VECTORIZER_MODES = ('pairwise', 'fitted', 'hashing', 'lsa')
+
+class ResumeReviewer:
+    def __init__(self, model_path=None, vectorizer_mode=None, preprocessing='nltk', lemma_cache_size=100000, taxonomy=None):
+        if preprocessing not in PREPROCESSING_MODES:
+            raise ValueError("Unknown preprocessing mode %r, expected one of %s" % (preprocessing, ', '.join(PREPROCESSING_MODES)))
+
+        # The fast tokenizer does not need punkt
+        ensure_nltk_resources(resources=[resource for resource in NLTK_RESOURCES
+                                         if preprocessing == 'nltk' or resource != 'tokenizers/punkt'])
+        from nltk.corpus import stopwords
+        from nltk.stem import WordNetLemmatizer
+
         self.lemmatizer = WordNetLemmatizer()
         self.stop_words = set(stopwords.words('english'))
-        self.vectorizer = TfidfVectorizer()
+        self.preprocessing = preprocessing
+        self.lemmatize = lru_cache(maxsize=lemma_cache_size)(self.lemmatizer.lemmatize)
+
+        if vectorizer_mode is None:
+            vectorizer_mode = 'fitted' if model_path else 'pairwise'
+        if vectorizer_mode not in VECTORIZER_MODES:
+            raise ValueError("Unknown vectorizer mode %r, expected one of %s" % (vectorizer_mode, ', '.join(VECTORIZER_MODES)))
+        if vectorizer_mode in ('fitted', 'lsa') and not model_path:
+            raise ValueError("The %r vectorizer mode needs a model_path" % vectorizer_mode)
+
+        self.vectorizer_mode = vectorizer_mode
+        self.projection = None
+        if vectorizer_mode in ('fitted', 'lsa'):
+            self.load_model(model_path)
+            if vectorizer_mode == 'lsa' and self.projection is None:
+                raise ValueError("%s has no LSA projection, fit one with fit-model --components" % model_path)
+        elif vectorizer_mode == 'hashing':
+            from sklearn.feature_extraction.text import HashingVectorizer
+            self.vectorizer = HashingVectorizer(alternate_sign=False, norm='l2')
+            self.model_version = 'hashing-%d' % self.vectorizer.n_features
+        else:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self.vectorizer = TfidfVectorizer()
+            self.model_version = 'pairwise'
 
         # Comprehensive skill keywords organized by category
-        self.skill_categories = {
+        skill_categories = {
             # Technology and Software Development
             "technology": [
                 # Programming Languages
@@ -228,60 +435,226 @@ class ResumeReviewer:
             ]
         }
 
-        # Flatten skill categories for easier searching
-        self.skill_keywords = []
-        for category in self.skill_categories.values():
-            self.skill_keywords.extend(category)
-        self.skill_keywords = list(set(self.skill_keywords))  # Remove duplicates
-
         # Education and experience keywords
-        self.education_keywords = ['degree', 'bachelor', 'master', 'phd', 'doctorate', 'diploma', 'certificate',
-                                  'bs', 'ms', 'ba', 'ma', 'mba', 'university', 'college', 'school', 'institute',
-                                  'certification', 'certified', 'license', 'licensed', 'credential', 'accredited',
-                                  'education', 'graduate', 'undergraduate', 'postgraduate', 'academic', 'study',
-                                  'major', 'minor', 'concentration', 'specialization', 'coursework', 'gpa',
-                                  'honors', 'cum laude', 'magna cum laude', 'summa cum laude', 'thesis', 'dissertation']
-
-        self.experience_keywords = ['year', 'month', 'experience', 'work', 'employment', 'job', 'career', 'profession',
-                                   'position', 'role', 'responsibility', 'duty', 'task', 'function', 'project', 'campaign',
-                                   'initiative', 'achievement', 'accomplishment', 'success', 'led', 'lead', 'manage', 'managed',
-                                   'supervise', 'supervised', 'direct', 'directed', 'oversee', 'oversaw', 'coordinate',
-                                   'coordinated', 'develop', 'developed', 'implement', 'implemented', 'create', 'created',
-                                   'design', 'designed', 'establish', 'established', 'launch', 'launched', 'build', 'built',
-                                   'team', 'group', 'department', 'division', 'unit', 'organization', 'company', 'client',
-                                   'customer', 'stakeholder', 'partner', 'vendor', 'contractor', 'consultation', 'collaboration',
-                                   'deadline', 'target', 'goal', 'objective', 'benchmark', 'metric', 'performance', 'outcome',
-                                   'result', 'impact', 'improvement', 'growth', 'increase', 'decrease', 'reduction', 'expansion']
+        education_keywords = ['degree', 'bachelor', 'master', 'phd', 'doctorate', 'diploma', 'certificate',
+                              'bs', 'ms', 'ba', 'ma', 'mba', 'university', 'college', 'school', 'institute',
+                              'certification', 'certified', 'license', 'licensed', 'credential', 'accredited',
+                              'education', 'graduate', 'undergraduate', 'postgraduate', 'academic', 'study',
+                              'major', 'minor', 'concentration', 'specialization', 'coursework', 'gpa',
+                              'honors', 'cum laude', 'magna cum laude', 'summa cum laude', 'thesis', 'dissertation']
+
+        experience_keywords = ['year', 'month', 'experience', 'work', 'employment', 'job', 'career', 'profession',
+                               'position', 'role', 'responsibility', 'duty', 'task', 'function', 'project', 'campaign',
+                               'initiative', 'achievement', 'accomplishment', 'success', 'led', 'lead', 'manage', 'managed',
+                               'supervise', 'supervised', 'direct', 'directed', 'oversee', 'oversaw', 'coordinate',
+                               'coordinated', 'develop', 'developed', 'implement', 'implemented', 'create', 'created',
+                               'design', 'designed', 'establish', 'established', 'launch', 'launched', 'build', 'built',
+                               'team', 'group', 'department', 'division', 'unit', 'organization', 'company', 'client',
+                               'customer', 'stakeholder', 'partner', 'vendor', 'contractor', 'consultation', 'collaboration',
+                               'deadline', 'target', 'goal', 'objective', 'benchmark', 'metric', 'performance', 'outcome',
+                               'result', 'impact', 'improvement', 'growth', 'increase', 'decrease', 'reduction', 'expansion']
+
+        if taxonomy:
+            # An external taxonomy (JSON source or compiled artifact) replaces the built-in one
+            self.load_taxonomy(taxonomy)
+        else:
+            # In fast mode normalizing the phrases also prewarms the lemma cache with the taxonomy
+            self.use_taxonomy(Taxonomy.build(skill_categories, education_keywords, experience_keywords, self.preprocess_text))
+
+        if preprocessing != 'nltk':
+            self.prewarm_lemmas(self.education_keywords + self.experience_keywords)
 
     def preprocess_text(self, text):
         """Clean and preprocess the text data using the global function"""
+        if self.preprocessing == 'chunked':
+            return ' '.join(iter_preprocessed_tokens(text, self.lemmatize, self.stop_words))
+        if self.preprocessing == 'fast':
+            return fast_preprocess_text(text, self.lemmatize, self.stop_words)
         return preprocess_text(text, self.lemmatizer, self.stop_words)
 
-    def extract_skills(self, text):
-        """Extract skills from the text"""
-        processed_text = self.preprocess_text(text)
-        words = processed_text.split()
-
-        # Extract individual words
-        single_word_skills = [word for word in words if word in self.skill_keywords]
+    def prewarm_lemmas(self, words):
+        """Fill the lemma cache used by fast preprocessing, e.g. from a common-word list"""
+        for text in words:
+            self.preprocess_text(text)
+
+    def use_taxonomy(self, taxonomy):
+        """Switch to the skill categories and keywords of a Taxonomy"""
+        self.taxonomy = taxonomy
+        self.taxonomy_version = taxonomy.version
+        self.education_keywords = taxonomy.education_keywords
+        self.experience_keywords = taxonomy.experience_keywords
+
+        # Token trie over the lemmatized skill phrases for single-pass matching
+        self.skill_matcher = taxonomy.matcher()
+
+    @property
+    def analysis_version(self):
+        """Everything besides the inputs that a result depends on: vectorizer model and taxonomy"""
+        return '%s+%s' % (self.model_version, self.taxonomy_version)
+
+    @property
+    def skill_categories(self):
+        """Category -> skills of the current taxonomy"""
+        return self.taxonomy.skill_categories
+
+    @property
+    def skill_keywords(self):
+        """Every distinct skill of the current taxonomy"""
+        return self.taxonomy.skill_keywords
+
+    def load_taxonomy(self, path):
+        """Use the taxonomy in path, a JSON source or an artifact compiled by compile-taxonomy"""
+        self.use_taxonomy(load_taxonomy(path, self.preprocess_text))
+
+    def fit_model(self, texts, components=None, **vectorizer_options):
+        """Fit the TF-IDF vectorizer once on a reference corpus of resumes and job descriptions.
+
+        With components, a TruncatedSVD projecting TF-IDF rows to that many
+        dimensions is fitted on the same corpus and the reviewer switches to
+        the 'lsa' mode.
+        """
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        vectorizer = TfidfVectorizer(**vectorizer_options)
+        if not components:
+            vectorizer.fit(self.preprocess_text(text) for text in texts)
+            self._use_model(vectorizer, hashlib.sha256(pickle.dumps(vectorizer)).hexdigest())
+            return vectorizer
+
+        from sklearn.decomposition import TruncatedSVD
+
+        matrix = vectorizer.fit_transform(self.preprocess_text(text) for text in texts)
+        if not 0 < components < min(matrix.shape):
+            raise ValueError("components must be between 1 and %d for this corpus (%d documents, %d terms), not %d" % (
+                min(matrix.shape) - 1, matrix.shape[0], matrix.shape[1], components))
+        projection = TruncatedSVD(n_components=components, random_state=0).fit(matrix)
+        self._use_model(vectorizer, hashlib.sha256(pickle.dumps((vectorizer, projection))).hexdigest(), projection)
+        return vectorizer
+
+    def save_model(self, path):
+        """Write the fitted vectorizer to path so it can be loaded with ResumeReviewer(model_path=path)"""
+        if self.vectorizer_mode not in ('fitted', 'lsa'):
+            raise ValueError("Only a fitted vectorizer can be saved, call fit_model first")
+        model = {"format": MODEL_FORMAT, "vectorizer": self.vectorizer}
+        if self.projection is not None:
+            model["projection"] = self.projection
+        with open(path, 'wb') as handle:
+            pickle.dump(model, handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load_model(self, path):
+        """Load a vectorizer written by save_model"""
+        with open(path, 'rb') as handle:
+            data = handle.read()
+        model = pickle.loads(data)
+        if not isinstance(model, dict) or model.get("format") != MODEL_FORMAT:
+            raise ValueError("%s is not a resume reviewer model (format %s)" % (path, MODEL_FORMAT))
+        self._use_model(model["vectorizer"], hashlib.sha256(data).hexdigest(), model.get("projection"))
+
+    def _use_model(self, vectorizer, fingerprint, projection=None):
+        self.vectorizer_mode = 'fitted' if projection is None else 'lsa'
+        self.vectorizer = vectorizer
+        self.projection = projection
+        self.model_version = '%s-%s' % (self.vectorizer_mode, fingerprint[:16])
+
+    def vectorize(self, documents):
+        """TF-IDF rows (L2-normalised) for a list of texts or AnalyzedDocuments.
+
+        In the 'lsa' mode the rows are dense: a C-contiguous float32 array
+        with one L2-normalised row of projection components per document.
+        """
+        texts = [self.analyze_document(document).text for document in documents]
+        if self.vectorizer_mode == 'pairwise':
+            from sklearn.base import clone
+
+            # Fit a copy so the configured vectorizer is never mutated by a request
+            return clone(self.vectorizer).fit_transform(texts)
+        if self.vectorizer_mode == 'lsa':
+            from sklearn.preprocessing import normalize
+
+            return normalize(self.projection.transform(self.vectorizer.transform(texts))).astype('float32', order='C')
+        return self.vectorizer.transform(texts)
+
+    def analyze_document(self, text):
+        """Preprocess a text once into an AnalyzedDocument (documents are returned unchanged)"""
+        if isinstance(text, AnalyzedDocument):
+            return text
+        if isinstance(text, PreparedJob):
+            return text.document
+        if self.preprocessing == 'chunked':
+            # The document keeps every token and their joined text, as in the other modes
+            return AnalyzedDocument.from_tokens(iter_preprocessed_tokens(text, self.lemmatize, self.stop_words))
+        return AnalyzedDocument(self.preprocess_text(text))
+
+    def prepare_job(self, job_description, categories=True):
+        """Run all job-side work once (prepared jobs are returned unchanged unless their taxonomy or model is outdated).
+
+        With categories=False the job's skill category breakdown is left out
+        (None) and only computed if a result asks for skill_categories.
+        """
+        if isinstance(job_description, PreparedJob):
+            job = job_description
+            # (jobs pickled before taxonomies or models were versioned have no version)
+            taxonomy_current = getattr(job, 'taxonomy_version', None) == self.taxonomy_version
+            model_current = getattr(job, 'model_version', None) == self.model_version
+            if taxonomy_current and model_current:
+                return job
+            # Only the outdated parts are redone; the preprocessed document is still valid
+            skills, job_categories, vector = job.skills, job.categories, job.vector
+            if not taxonomy_current:
+                skills = self.extract_skills(job.document)
+                job_categories = self.identify_skill_categories(skills)
+            if not model_current:
+                vector = self._job_vector(job.document)
+            return PreparedJob(job.document, skills, job_categories, vector, self.taxonomy_version, self.model_version)
+        document = self.analyze_document(job_description)
+        skills = self.extract_skills(document)
+        job_categories = self.identify_skill_categories(skills) if categories else None
+        return PreparedJob(document, skills, job_categories, self._job_vector(document), self.taxonomy_version,
+                           self.model_version)
+
+    def _job_vector(self, document):
+        return None if self.vectorizer_mode == 'pairwise' else self.vectorize([document])
+
+    def prepare_documents(self, documents):
+        """PreparedJobs without skill categories for several texts, vectorized in one call, e.g. to index them.
+
+        As in prepare_job, documents already prepared (by an executor worker,
+        say) only have their outdated skills or vector redone.
+        """
+        prepared, outdated = [], []
+        for document in documents:
+            if isinstance(document, PreparedJob):
+                analyzed, skills, vector = document.document, document.skills, document.vector
+                if getattr(document, 'taxonomy_version', None) != self.taxonomy_version:
+                    skills = self.extract_skills(analyzed)
+                if getattr(document, 'model_version', None) != self.model_version:
+                    vector = None
+                    outdated.append(len(prepared))
+            else:
+                analyzed = self.analyze_document(document)
+                skills, vector = self.extract_skills(analyzed), None
+                outdated.append(len(prepared))
+            prepared.append(PreparedJob(analyzed, skills, None, vector, self.taxonomy_version, self.model_version))
+
+        if outdated and self.vectorizer_mode != 'pairwise':
+            vectors = self.vectorize([prepared[row].document for row in outdated])
+            for position, row in enumerate(outdated):
+                prepared[row].vector = vectors[position:position + 1]
+        return prepared
 
-        # Extract multi-word skills
-        multi_word_skills = []
-        for skill in self.skill_keywords:
-            if ' ' in skill and skill in processed_text:
-                multi_word_skills.append(skill)
-
-        # Combine all skills
-        all_skills = single_word_skills + multi_word_skills
+    def extract_skills(self, text):
+        """Extract skills from the text or AnalyzedDocument"""
+        document = self.analyze_document(text)
 
-        # Remove duplicates and sort
-        return sorted(list(set(all_skills)))
+        # Single linear pass over the tokens finds single and multi-word skills alike
+        return sorted(self.skill_matcher.match(document.tokens))
 
     def identify_skill_categories(self, skills):
         """Identify which skill categories are present in the skills list"""
+        buckets = self.skill_matcher.categorize(skills)
         categories = {}
-        for category_name, category_skills in self.skill_categories.items():
-            matching_skills = [skill for skill in skills if skill in category_skills]
+        for category_name in self.taxonomy.categories:
+            matching_skills = buckets.get(category_name)
             if matching_skills:
                 categories[category_name] = {
                     "count": len(matching_skills),
@@ -291,55 +664,168 @@ class ResumeReviewer:
 
     def calculate_similarity(self, job_desc, resume):
         """Calculate the similarity between job description and resume"""
-        documents = [self.preprocess_text(job_desc), self.preprocess_text(resume)]
-        tfidf_matrix = self.vectorizer.fit_transform(documents)
-        similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-        return similarity
+        if self.vectorizer_mode == 'pairwise':
+            from sklearn.metrics.pairwise import cosine_similarity
+
+            tfidf_matrix = self.vectorize([job_desc, resume])
+            return float(cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0])
+
+        # Fixed vectorizers only transform; a prepared job already carries its row
+        job_vector = job_desc.vector if isinstance(job_desc, PreparedJob) else None
+        if job_vector is None:
+            job_vector = self.vectorize([job_desc])
+        resume_vector = self.vectorize([resume])
+        if self.vectorizer_mode == 'lsa':
+            return float(resume_vector[0] @ job_vector[0])
+        return float((resume_vector @ job_vector.T).toarray()[0][0])
+
+    def analyze_resume(self, job_description, resume_text, timings=False, fields=None):
+        """Analyze resume against job description (text or PreparedJob).
+
+        With timings=True the result also has a "timings" entry with the
+        duration of every stage and the sizes of the inputs. fields limits
+        the result to some of RESULT_FIELDS; overall_match_score is always
+        included.
+        """
+        timer = StageTimer() if timings else NULL_TIMER
+
+        # Preprocess each input once and share it across all scorers
+        with timer.stage("prepare_job"):
+            job = self.prepare_job(job_description, fields is None or 'skill_categories' in fields)
+        with timer.stage("preprocess_resume"):
+            resume_document = self.analyze_document(resume_text)
 
-    def analyze_resume(self, job_description, resume_text):
-        """Analyze resume against job description"""
         # Calculate overall similarity
-        similarity = self.calculate_similarity(job_description, resume_text)
+        with timer.stage("similarity"):
+            similarity = self.calculate_similarity(job, resume_document)
+
+        result = self._score_resume(similarity, job, resume_document, timer, fields)
+
+        if timings:
+            if isinstance(job_description, str):
+                timer.size("job_chars", len(job_description))
+            if isinstance(resume_text, str):
+                timer.size("resume_chars", len(resume_text))
+            timer.size("job_tokens", len(job.document.tokens))
+            timer.size("resume_tokens", len(resume_document.tokens))
+            result["timings"] = timer.as_dict()
+        return result
+
+    def find_duplicates(self, resumes, threshold):
+        """For every resume (text or AnalyzedDocument), the index of an earlier near-duplicate, or None.
+
+        Resumes are compared by MinHash signatures of their preprocessed
+        tokens; threshold is the estimated Jaccard similarity of their
+        three-token shingles at which one counts as a duplicate.
+        """
+        from dedup import find_duplicates
+
+        return find_duplicates(self.signatures(resumes)[0], threshold)
+
+    def signatures(self, resumes):
+        """(MinHash signature, preprocessed text) lists of resumes, for grouping a large pool in chunks"""
+        from dedup import MinHasher
+
+        hasher = MinHasher()
+        documents = [self.analyze_document(resume) for resume in resumes]
+        return [hasher.signature(document.tokens) for document in documents], [document.text for document in documents]
+
+    def rank_resumes(self, job_description, resumes, top_k=None, duplicate_threshold=None, fields=None):
+        """Rank several resumes against one job description, best match first.
+
+        With duplicate_threshold, near-duplicate resumes are scored once:
+        each duplicate gets a copy of its representative's result and
+        duplicate_of set to the representative's index. fields works as in
+        analyze_resume.
+        """
+        # Preprocess the job once and every resume once
+        job = self.prepare_job(job_description, fields is None or 'skill_categories' in fields)
+        resume_documents = [self.analyze_document(resume) for resume in resumes]
+        if duplicate_threshold:
+            duplicate_of = self.find_duplicates(resume_documents, duplicate_threshold)
+        else:
+            duplicate_of = [None] * len(resume_documents)
+        representatives = [index for index, duplicate in enumerate(duplicate_of) if duplicate is None]
+
+        # One TF-IDF matrix for the job and all resumes; rows are L2-normalised,
+        # so a single product gives every cosine similarity
+        tfidf_matrix = self.vectorize([job.document] + [resume_documents[index] for index in representatives])
+        if self.vectorizer_mode == 'lsa':
+            similarities = tfidf_matrix[1:] @ tfidf_matrix[0]
+        else:
+            similarities = (tfidf_matrix[1:] @ tfidf_matrix[0].T).toarray().ravel()
+
+        scored = {
+            index: self._score_resume(float(similarity), job, resume_documents[index], NULL_TIMER, fields)
+            for index, similarity in zip(representatives, similarities)
+        }
+        results = []
+        for index, duplicate in enumerate(duplicate_of):
+            result = scored[index] if duplicate is None else copy.deepcopy(scored[duplicate])
+            result["index"] = index
+            result["duplicate_of"] = duplicate
+            results.append(result)
+
+        results.sort(key=lambda result: result["overall_match_score"], reverse=True)
+        if top_k is not None:
+            results = results[:top_k]
+        return results
+
+    def keyword_scores(self, resume):
+        """Education and experience scores (0-1) from a simple keyword-based approach"""
+        token_set = self.analyze_document(resume).token_set
+        education_keywords_count = sum(1 for keyword in self.education_keywords if keyword in token_set)
+        experience_keywords_count = sum(1 for keyword in self.experience_keywords if keyword in token_set)
 
-        # Extract skills from both job description and resume
-        job_skills = self.extract_skills(job_description)
-        resume_skills = self.extract_skills(resume_text)
+        education_score = min(1.0, education_keywords_count / 5)  # Cap at 1.0
+        experience_score = min(1.0, experience_keywords_count / 10)  # Cap at 1.0
+        return education_score, experience_score
+
+    def _score_resume(self, similarity, job, resume_document, timer=NULL_TIMER, fields=None):
+        """Build the score breakdown (or only its fields) for one analyzed resume against a prepared job"""
+        job_skills = job.skills
+
+        # Extract skills from the resume
+        with timer.stage("extract_skills"):
+            resume_skills = self.extract_skills(resume_document)
 
         # Calculate skill match percentage
-        matching_skills = [skill for skill in resume_skills if skill in job_skills]
+        resume_skill_set = set(resume_skills)
+        job_skill_set = set(job_skills)
+        matching_skills = [skill for skill in resume_skills if skill in job_skill_set]
         skill_match_percentage = len(matching_skills) / len(job_skills) if job_skills else 0
 
-        # Identify skill categories
-        job_categories = self.identify_skill_categories(job_skills)
-        resume_categories = self.identify_skill_categories(resume_skills)
-        matching_categories = self.identify_skill_categories(matching_skills)
-
-        # Calculate education and experience match (simple keyword-based approach)
-        education_keywords_count = sum(1 for keyword in self.education_keywords if keyword in self.preprocess_text(resume_text).split())
-        experience_keywords_count = sum(1 for keyword in self.experience_keywords if keyword in self.preprocess_text(resume_text).split())
-
-        education_score = min(1.0, education_keywords_count / 5)  # Cap at 1.0
-        experience_score = min(1.0, experience_keywords_count / 10)  # Cap at 1.0
+        # Calculate education and experience match
+        with timer.stage("keyword_scores"):
+            education_score, experience_score = self.keyword_scores(resume_document)
 
         # Calculate overall score (weighted average)
-        overall_score = 0.5 * similarity + 0.3 * skill_match_percentage + 0.1 * education_score + 0.1 * experience_score
-
-        # Format the results
-        result = {
-            "overall_match_score": round(overall_score * 100, 2),
-            "similarity_score": round(similarity * 100, 2),
-            "skill_match": {
+        overall_score = combine_scores(similarity, skill_match_percentage, education_score, experience_score)
+
+        # Format the results, skipping the parts that were not asked for
+        result = {"overall_match_score": round(overall_score * 100, 2)}
+        if fields is None or "similarity_score" in fields:
+            result["similarity_score"] = round(similarity * 100, 2)
+        if fields is None or "skill_match" in fields:
+            result["skill_match"] = {
                 "percentage": round(skill_match_percentage * 100, 2),
                 "matching_skills": matching_skills,
-                "missing_skills": [skill for skill in job_skills if skill not in resume_skills]
-            },
-            "skill_categories": {
-                "job_categories": job_categories,
-                "resume_categories": resume_categories,
-                "matching_categories": matching_categories
-            },
-            "education_score": round(education_score * 100, 2),
-            "experience_score": round(experience_score * 100, 2)
-        }
+                "missing_skills": [skill for skill in job_skills if skill not in resume_skill_set]
+            }
+        if fields is None or "skill_categories" in fields:
+            with timer.stage("skill_categories"):
+                # (jobs prepared with categories=False have none yet)
+                job_categories = job.categories
+                if job_categories is None:
+                    job_categories = self.identify_skill_categories(job_skills)
+                result["skill_categories"] = {
+                    "job_categories": job_categories,
+                    "resume_categories": self.identify_skill_categories(resume_skills),
+                    "matching_categories": self.identify_skill_categories(matching_skills)
+                }
+        if fields is None or "education_score" in fields:
+            result["education_score"] = round(education_score * 100, 2)
+        if fields is None or "experience_score" in fields:
+            result["experience_score"] = round(experience_score * 100, 2)
 
-        return result
\ No newline at end of file
+        return result
@@ -0,0 +1,135 @@
+"""Skill statistics across the resumes of a ResumeIndex.
+
+The index keeps a resume x skill incidence matrix R. Together with a
+skill x category matrix C built from the taxonomy, every statistic is a
+sparse matrix product instead of a loop over resumes: skill frequencies
+are the column sums of R, a job's coverage is R times the job's skill
+indicator and category coverage comes from R @ C.
+"""
+import numpy as np
+from scipy import sparse
+
+# Category histograms count resumes with 0, 1, ... and HISTOGRAM_BINS - 1 or more skills of the category
+HISTOGRAM_BINS = 6
+
+
+def category_matrix(skill_names, taxonomy):
+    """Skill x category incidence matrix (CSR) for skill_names in the taxonomy's category order"""
+    category_ids = {category: column for column, category in enumerate(taxonomy.categories)}
+    rows, columns = [], []
+    for row, skill in enumerate(skill_names):
+        for category in taxonomy.skill_index.get(skill, ()):
+            rows.append(row)
+            columns.append(category_ids[category])
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, columns)),
+        shape=(len(skill_names), len(category_ids))
+    )
+
+
+def percentage(count, total):
+    return round(100.0 * int(count) / total, 2) if total else 0.0
+
+
+class SkillAnalytics:
+    """Pool-wide skill frequencies, skill gaps against a job and category coverage.
+
+    The pool is every resume in the index except near-duplicates, which
+    count once through their representative as they do in searches. Skills
+    that the current taxonomy no longer has keep their frequencies but
+    belong to no category.
+    """
+    def __init__(self, index):
+        self.index = index
+        self._categories = None
+
+    def _pool(self):
+        """(resume x skill matrix, float32 mask of pooled rows, skill names, vocabulary generation) under the lock"""
+        index = self.index
+        with index._lock:
+            index._check_taxonomy()
+            index._materialize()
+            skills, pooled, skill_names = index.skills, index._alive.copy(), list(index.skill_names)
+            pooled[[index._rows[resume_id] for resume_id in index.duplicate_of]] = False
+            generation = index.vocabulary_generation
+        return skills, pooled.astype(np.float32), skill_names, generation
+
+    def _category_matrix(self, skill_names, generation):
+        """Dense skill x category matrix, rebuilt when the taxonomy or the skill vocabulary changes"""
+        taxonomy = self.index.reviewer.taxonomy
+        # Skills are only ever appended to a vocabulary, so its generation and size identify it
+        key = (taxonomy.version, generation, len(skill_names))
+        if self._categories is None or self._categories[0] != key:
+            self._categories = (key, taxonomy.categories, category_matrix(skill_names, taxonomy).toarray())
+        return self._categories[1], self._categories[2]
+
+    def skill_frequencies(self, top=None):
+        """How many pooled resumes have each skill, most common first"""
+        skills, pooled, skill_names, _ = self._pool()
+        total = int(pooled.sum())
+        counts = (pooled @ skills).astype(np.int64)
+        order = np.lexsort((np.arange(len(counts)), -counts))
+        order = order[counts[order] > 0][:top]
+        return {
+            "resumes": total,
+            "skills": [
+                {"skill": skill_names[skill_id], "resumes": int(counts[skill_id]),
+                 "percentage": percentage(counts[skill_id], total)}
+                for skill_id in order
+            ]
+        }
+
+    def skill_gaps(self, job_skills):
+        """A job's skills by how few pooled resumes have them, rarest first.
+
+        coverage[k] is the number of resumes with exactly k of the job's skills.
+        """
+        skills, pooled, skill_names, _ = self._pool()
+        total = int(pooled.sum())
+        skill_ids = {skill: skill_id for skill_id, skill in enumerate(skill_names)}
+        job_skills = list(dict.fromkeys(job_skills))
+        known = [skill_ids[skill] for skill in job_skills if skill in skill_ids]
+
+        counts = dict.fromkeys(job_skills, 0)
+        if known:
+            column_counts = (pooled @ skills)[known].astype(np.int64)
+            counts.update(zip((skill_names[skill_id] for skill_id in known), column_counts.tolist()))
+        job_mask = np.zeros(len(skill_names), dtype=np.float32)
+        job_mask[known] = 1
+        matched = (skills @ job_mask)[pooled > 0].astype(np.int64)
+        coverage = np.bincount(matched, minlength=len(job_skills) + 1)
+        # (sorted is stable, so equally rare skills keep the job's order)
+        rarest_first = sorted(job_skills, key=counts.get)
+
+        return {
+            "resumes": total,
+            "skills": [
+                {"skill": skill, "resumes": counts[skill], "percentage": percentage(counts[skill], total)}
+                for skill in rarest_first
+            ],
+            "coverage": coverage.tolist()
+        }
+
+    def category_coverage(self):
+        """Per category: resumes with any of its skills, their mean number of them and a histogram"""
+        skills, pooled, skill_names, generation = self._pool()
+        total = int(pooled.sum())
+        categories, membership = self._category_matrix(skill_names, generation)
+        # Resume x category counts of matching skills, for pooled resumes only
+        per_category = (skills @ membership)[pooled > 0]
+        histograms = [np.bincount(np.minimum(per_category[:, column], HISTOGRAM_BINS - 1), minlength=HISTOGRAM_BINS)
+                      for column in range(len(categories))]
+        covered = np.count_nonzero(per_category, axis=0)
+        return {
+            "resumes": total,
+            "categories": [
+                {
+                    "category": category,
+                    "resumes": int(covered[column]),
+                    "percentage": percentage(covered[column], total),
+                    "mean_skills": round(float(per_category[:, column].mean()), 2) if total else 0.0,
+                    "histogram": histograms[column].tolist()
+                }
+                for column, category in enumerate(categories)
+            ]
+        }
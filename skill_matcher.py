@@ -0,0 +1,179 @@
+import bisect
+import re
+
+# Phrases containing characters the preprocessor strips (digits, '+', '#', ...)
+# lose their identity once normalized ("c++" -> "c", "504 plan" -> "plan"), so
+# they are left out of the matcher rather than turned into false positives
+UNMATCHABLE_PHRASE = re.compile(r'[^a-z\s\-/.]')
+
+# Key marking the end of a phrase inside a trie node
+_TERMINAL = None
+
+
+def build_skill_index(skill_categories):
+    """Skill -> categories index, in taxonomy order"""
+    skill_index = {}
+    for category_name, category_skills in skill_categories.items():
+        for skill in category_skills:
+            categories = skill_index.setdefault(skill, [])
+            if category_name not in categories:
+                categories.append(category_name)
+    return skill_index
+
+
+def normalize_phrases(skills, normalize):
+    """Yield (normalized tokens, skill) for every skill the matcher can find"""
+    for skill in skills:
+        if UNMATCHABLE_PHRASE.search(skill.lower()):
+            continue
+        tokens = normalize(skill).split()
+        if tokens:
+            yield tokens, skill
+
+
+class SkillMatcher:
+    """Token-level trie over normalized skill phrases, compiled once per taxonomy"""
+    def __init__(self, skill_categories, normalize):
+        self.trie = {}
+        self.phrase_count = 0
+        self.skill_index = build_skill_index(skill_categories)
+        for tokens, skill in normalize_phrases(self.skill_index, normalize):
+            self.add_phrase(tokens, skill)
+
+    @classmethod
+    def from_phrases(cls, skill_index, phrases):
+        """Matcher over already normalized (tokens, skill) phrases, e.g. from a compiled taxonomy"""
+        matcher = cls({}, None)
+        matcher.skill_index = skill_index
+        for tokens, skill in phrases:
+            matcher.add_phrase(tokens, skill)
+        return matcher
+
+    def add_phrase(self, tokens, skill):
+        """Insert a normalized token sequence that should be reported as skill"""
+        node = self.trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        skills = node.setdefault(_TERMINAL, [])
+        if not skills:
+            self.phrase_count += 1
+        if skill not in skills:
+            skills.append(skill)
+
+    def match(self, tokens):
+        """Return the set of skills whose phrases occur in the token list"""
+        found = set()
+        trie = self.trie
+        token_count = len(tokens)
+        for start in range(token_count):
+            node = trie.get(tokens[start])
+            position = start + 1
+            while node is not None:
+                skills = node.get(_TERMINAL)
+                if skills:
+                    found.update(skills)
+                if position == token_count:
+                    break
+                node = node.get(tokens[position])
+                position += 1
+        return found
+
+    def categorize(self, skills):
+        """Group skills by category in one pass, keeping taxonomy and input order"""
+        buckets = {}
+        for skill in skills:
+            for category_name in self.skill_index.get(skill, ()):
+                buckets.setdefault(category_name, []).append(skill)
+        return buckets
+
+
+def flatten_trie(trie, intern):
+    """Flat arrays of a SkillMatcher trie, with tokens and skills replaced by intern(text) ids.
+
+    Node 0 is the root. The children of node n are child_tokens/child_nodes
+    [node_indptr[n]:node_indptr[n + 1]], sorted by token id, and the skills
+    ending at it are node_skills[skill_indptr[n]:skill_indptr[n + 1]].
+    """
+    nodes = [trie]
+    node_indptr, child_tokens, child_nodes = [0], [], []
+    skill_indptr, node_skills = [0], []
+    for node in nodes:
+        children = sorted((intern(token), child) for token, child in node.items() if token is not _TERMINAL)
+        for token_id, child in children:
+            child_tokens.append(token_id)
+            child_nodes.append(len(nodes))
+            nodes.append(child)
+        node_indptr.append(len(child_tokens))
+        node_skills.extend(intern(skill) for skill in node.get(_TERMINAL, ()))
+        skill_indptr.append(len(node_skills))
+    return {
+        'node_indptr': node_indptr,
+        'child_tokens': child_tokens,
+        'child_nodes': child_nodes,
+        'skill_indptr': skill_indptr,
+        'node_skills': node_skills,
+    }
+
+
+class CompiledSkillMatcher:
+    """Same matching as SkillMatcher, over the flat (e.g. memory-mapped) arrays of a compiled taxonomy.
+
+    strings is the string table the arrays refer to and string_ids its
+    inverse. Besides the flatten_trie arrays it uses root_children (child
+    of the root for every string id, -1 if none), skill_rows (row of every
+    string id that is a skill, -1 otherwise) and the skill x category CSR
+    skill_category_indptr/skill_category_ids over category_names.
+    """
+    def __init__(self, strings, string_ids, arrays, category_names):
+        self.strings = strings
+        self.string_ids = string_ids
+        self.category_names = category_names
+        self.root_children = arrays['root_children']
+        self.node_indptr = arrays['node_indptr']
+        self.child_tokens = arrays['child_tokens']
+        self.child_nodes = arrays['child_nodes']
+        self.skill_indptr = arrays['skill_indptr']
+        self.node_skills = arrays['node_skills']
+        self.skill_rows = arrays['skill_rows']
+        self.category_indptr = arrays['skill_category_indptr']
+        self.category_ids = arrays['skill_category_ids']
+
+    def _child(self, node, token_id):
+        start, end = self.node_indptr[node], self.node_indptr[node + 1]
+        position = bisect.bisect_left(self.child_tokens, token_id, start, end)
+        if position < end and self.child_tokens[position] == token_id:
+            return self.child_nodes[position]
+        return -1
+
+    def match(self, tokens):
+        """Return the set of skills whose phrases occur in the token list"""
+        found = set()
+        strings, string_ids = self.strings, self.string_ids
+        root_children, skill_indptr, node_skills = self.root_children, self.skill_indptr, self.node_skills
+        token_count = len(tokens)
+        for start in range(token_count):
+            token_id = string_ids.get(tokens[start])
+            node = root_children[token_id] if token_id is not None else -1
+            position = start + 1
+            while node >= 0:
+                first, last = skill_indptr[node], skill_indptr[node + 1]
+                if first != last:
+                    found.update(strings[skill_id] for skill_id in node_skills[first:last])
+                if position == token_count:
+                    break
+                token_id = string_ids.get(tokens[position])
+                node = self._child(node, token_id) if token_id is not None else -1
+                position += 1
+        return found
+
+    def categorize(self, skills):
+        """Group skills by category in one pass, keeping taxonomy and input order"""
+        buckets = {}
+        for skill in skills:
+            string_id = self.string_ids.get(skill)
+            row = self.skill_rows[string_id] if string_id is not None else -1
+            if row < 0:
+                continue
+            for category_id in self.category_ids[self.category_indptr[row]:self.category_indptr[row + 1]]:
+                buckets.setdefault(self.category_names[category_id], []).append(skill)
+        return buckets
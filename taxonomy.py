@@ -0,0 +1,247 @@
+"""External skill taxonomies and their compiled binary form.
+
+A taxonomy source is a JSON file with the three vocabularies of ResumeReviewer:
+
+    {"skill_categories": {"technology": ["python", "machine learning"], ...},
+     "education_keywords": ["degree", ...],
+     "experience_keywords": ["managed", ...]}
+
+compile_taxonomy() turns it into a binary artifact holding the skill
+phrases already normalized (lemmatized) and compiled into a flat trie, so
+loading it neither preprocesses nor rebuilds anything. Layout:
+
+    magic      8 bytes, b"RRTAXON\\0"
+    format     uint32, little-endian
+    length     uint32, size of the header
+    header     JSON: version, string table and (offset, length) of every array
+    arrays     little-endian int32 arrays, 8-byte aligned
+    strings    UTF-8 string table, every string NUL-terminated
+
+Arrays refer to strings by their position in the table, so each token,
+skill and category name is stored once. The file is memory-mapped and
+matched against in place, so worker processes loading the same artifact
+share its pages.
+"""
+import array
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from functools import cached_property
+
+from skill_matcher import SkillMatcher, CompiledSkillMatcher, build_skill_index, flatten_trie, normalize_phrases
+
+MAGIC = b"RRTAXON\0"
+
+# Version of the compiled layout
+TAXONOMY_FORMAT = 1
+
+_PREAMBLE = struct.Struct("<8sII")
+
+# int32 arrays of the compiled form, in file order
+_ARRAYS = (
+    # Category names, and the skills of every category in source order
+    'categories', 'category_skill_indptr', 'category_skills',
+    # Distinct skills, the row of every string that is one, and their categories
+    'skills', 'skill_rows', 'skill_category_indptr', 'skill_category_ids',
+    # Skill phrase trie, see skill_matcher.flatten_trie
+    'root_children', 'node_indptr', 'child_tokens', 'child_nodes', 'skill_indptr', 'node_skills',
+    'education_keywords', 'experience_keywords',
+)
+
+
+def taxonomy_version(skill_categories, education_keywords, experience_keywords):
+    """Content hash identifying a taxonomy; results computed with another version are stale"""
+    content = json.dumps([skill_categories, education_keywords, experience_keywords], separators=(',', ':'))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+
+class Taxonomy:
+    """Skill categories and keyword lists together with their normalized skill phrases"""
+    def __init__(self, skill_categories, education_keywords, experience_keywords, phrases, version=None):
+        self.skill_categories = skill_categories
+        self.education_keywords = education_keywords
+        self.experience_keywords = experience_keywords
+        # (normalized tokens, skill) for every skill the matcher can find
+        self.phrases = phrases
+        self.version = version or taxonomy_version(skill_categories, education_keywords, experience_keywords)
+        self.categories = list(skill_categories)
+        self.skill_index = build_skill_index(skill_categories)
+        self.skill_keywords = list(self.skill_index)
+
+    @classmethod
+    def build(cls, skill_categories, education_keywords, experience_keywords, normalize):
+        """Normalize every skill phrase with normalize (e.g. ResumeReviewer.preprocess_text)"""
+        phrases = list(normalize_phrases(build_skill_index(skill_categories), normalize))
+        return cls(skill_categories, education_keywords, experience_keywords, phrases)
+
+    def matcher(self):
+        return SkillMatcher.from_phrases(self.skill_index, self.phrases)
+
+
+def _int32_bytes(values):
+    values = array.array('i', values)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tobytes()
+
+
+def _int32_view(buffer, offset, length):
+    view = memoryview(buffer)[offset:offset + 4 * length]
+    if sys.byteorder == 'little':
+        return view.cast('i')
+    # Big-endian hosts get a byte-swapped copy instead of a view
+    values = array.array('i')
+    values.frombytes(view)
+    values.byteswap()
+    return values
+
+
+class CompiledTaxonomy:
+    """A taxonomy read from a compiled artifact; its arrays stay in the memory-mapped file"""
+    def __init__(self, path):
+        with open(path, 'rb') as handle:
+            self._data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, taxonomy_format, header_length = _PREAMBLE.unpack_from(self._data)
+        if magic != MAGIC or taxonomy_format != TAXONOMY_FORMAT:
+            raise ValueError("%s is not a compiled taxonomy (format %s)" % (path, TAXONOMY_FORMAT))
+        header = json.loads(self._data[_PREAMBLE.size:_PREAMBLE.size + header_length])
+        base = _PREAMBLE.size + header_length
+
+        self.version = header["version"]
+        self.arrays = {name: _int32_view(self._data, base + offset, length)
+                       for name, (offset, length) in header["arrays"].items()}
+        offset, length, count = header["strings"]
+        self.strings = self._data[base + offset:base + offset + length].decode('utf-8').split('\0')[:count]
+        self.string_ids = dict(zip(self.strings, range(count)))
+
+        strings = self.strings
+        self.categories = [strings[string_id] for string_id in self.arrays['categories']]
+        self.education_keywords = [strings[string_id] for string_id in self.arrays['education_keywords']]
+        self.experience_keywords = [strings[string_id] for string_id in self.arrays['experience_keywords']]
+
+    @cached_property
+    def skill_categories(self):
+        indptr, skills = self.arrays['category_skill_indptr'], self.arrays['category_skills']
+        return {
+            name: [self.strings[skill] for skill in skills[indptr[index]:indptr[index + 1]]]
+            for index, name in enumerate(self.categories)
+        }
+
+    @cached_property
+    def skill_keywords(self):
+        return [self.strings[string_id] for string_id in self.arrays['skills']]
+
+    @cached_property
+    def skill_index(self):
+        return build_skill_index(self.skill_categories)
+
+    def matcher(self):
+        return CompiledSkillMatcher(self.strings, self.string_ids, self.arrays, self.categories)
+
+
+def read_source(path):
+    """Read and validate a JSON taxonomy source"""
+    with open(path, encoding='utf-8') as handle:
+        source = json.load(handle)
+    if not isinstance(source, dict) or not isinstance(source.get("skill_categories"), dict):
+        raise ValueError("%s is not a taxonomy: expected an object with skill_categories" % path)
+    for name in ("education_keywords", "experience_keywords"):
+        keywords = source.get(name, [])
+        if not isinstance(keywords, list) or not all(isinstance(keyword, str) for keyword in keywords):
+            raise ValueError("%s: %s must be a list of strings" % (path, name))
+    for category, skills in source["skill_categories"].items():
+        if not isinstance(skills, list) or not all(isinstance(skill, str) for skill in skills):
+            raise ValueError("%s: skills of category %r must be a list of strings" % (path, category))
+    return source
+
+
+def write_artifact(taxonomy, path):
+    """Write the compiled form of a Taxonomy to path"""
+    strings = {}
+
+    def intern(text):
+        string_id = strings.get(text)
+        if string_id is None:
+            string_id = strings[text] = len(strings)
+        return string_id
+
+    category_rows = {name: row for row, name in enumerate(taxonomy.categories)}
+    arrays = {
+        'categories': [intern(name) for name in taxonomy.categories],
+        'category_skill_indptr': [0],
+        'category_skills': [],
+        'skills': [intern(skill) for skill in taxonomy.skill_index],
+        'skill_category_indptr': [0],
+        'skill_category_ids': [],
+        'education_keywords': [intern(keyword) for keyword in taxonomy.education_keywords],
+        'experience_keywords': [intern(keyword) for keyword in taxonomy.experience_keywords],
+    }
+    for name in taxonomy.categories:
+        arrays['category_skills'].extend(intern(skill) for skill in taxonomy.skill_categories[name])
+        arrays['category_skill_indptr'].append(len(arrays['category_skills']))
+    for categories in taxonomy.skill_index.values():
+        arrays['skill_category_ids'].extend(category_rows[name] for name in categories)
+        arrays['skill_category_indptr'].append(len(arrays['skill_category_ids']))
+    arrays.update(flatten_trie(taxonomy.matcher().trie, intern))
+
+    # Dense lookups by string id, sized once every string is interned
+    arrays['skill_rows'] = [-1] * len(strings)
+    for row, string_id in enumerate(arrays['skills']):
+        arrays['skill_rows'][string_id] = row
+    arrays['root_children'] = [-1] * len(strings)
+    root_end = arrays['node_indptr'][1]
+    for token_id, node in zip(arrays['child_tokens'][:root_end], arrays['child_nodes'][:root_end]):
+        arrays['root_children'][token_id] = node
+
+    layout = {}
+    blobs = []
+    offset = 0
+    for name in _ARRAYS:
+        blob = _int32_bytes(arrays[name])
+        blob += b'\0' * (-len(blob) % 8)
+        layout[name] = [offset, len(arrays[name])]
+        blobs.append(blob)
+        offset += len(blob)
+    table = ''.join(text + '\0' for text in strings).encode('utf-8')
+    header = json.dumps({
+        "version": taxonomy.version,
+        "strings": [offset, len(table), len(strings)],
+        "arrays": layout
+    }).encode('utf-8')
+    header += b' ' * (-(_PREAMBLE.size + len(header)) % 8)
+
+    # Running services map the artifact, so it is replaced rather than overwritten in place
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as handle:
+        handle.write(_PREAMBLE.pack(MAGIC, TAXONOMY_FORMAT, len(header)))
+        handle.write(header)
+        for blob in blobs:
+            handle.write(blob)
+        handle.write(table)
+    os.replace(tmp_path, path)
+
+
+def is_artifact(path):
+    with open(path, 'rb') as handle:
+        return handle.read(len(MAGIC)) == MAGIC
+
+
+def load_taxonomy(path, normalize):
+    """Load a compiled artifact, or build a JSON source with normalize"""
+    if is_artifact(path):
+        return CompiledTaxonomy(path)
+    source = read_source(path)
+    return Taxonomy.build(source["skill_categories"], source.get("education_keywords", []),
+                          source.get("experience_keywords", []), normalize)
+
+
+def compile_taxonomy(source_path, output_path, normalize):
+    """Compile a JSON taxonomy source into a binary artifact and return the taxonomy"""
+    source = read_source(source_path)
+    taxonomy = Taxonomy.build(source["skill_categories"], source.get("education_keywords", []),
+                              source.get("experience_keywords", []), normalize)
+    write_artifact(taxonomy, output_path)
+    return taxonomy
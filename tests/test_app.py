@@ -64,4 +64,398 @@ def test_analyze_resume_empty_fields():
         json=test_input
     )
     assert response.status_code == 400
-    assert "Both job description and resume are required" in response.json()["detail"]
\ No newline at end of file
+    assert "Both job description and resume are required" in response.json()["detail"]
+
+def test_rank_resumes_endpoint():
+    test_input = {
+        "job_description": "We are looking for a Python developer with experience in Flask, Django, and SQL.",
+        "resumes": [
+            "Accountant with experience in bookkeeping and payroll.",
+            "Python developer who built web applications using Flask and Django with SQL databases."
+        ],
+        "top_k": 1
+    }
+
+    response = client.post("/rank_resumes", json=test_input)
+
+    assert response.status_code == 200
+    results = response.json()
+    assert len(results) == 1
+    assert results[0]["index"] == 1
+    assert "skill_match" in results[0]
+    assert isinstance(results[0]["recommendations"], list)
+
+def test_rank_resumes_empty_resumes():
+    response = client.post(
+        "/rank_resumes",
+        json={"job_description": "Python developer role", "resumes": []}
+    )
+    assert response.status_code == 400
+
+def test_registered_job_analysis():
+    response = client.post(
+        "/jobs",
+        json={"job_description": "We are looking for a Python developer with experience in Flask, Django, and SQL."}
+    )
+    assert response.status_code == 200
+    registration = response.json()
+    assert "python" in registration["skills"]
+
+    response = client.post(
+        "/jobs/%s/analyze" % registration["job_id"],
+        json={"resume": "Python developer who built web applications using Flask and Django."}
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert 0 <= result["overall_match_score"] <= 100
+    assert "python" in result["skill_match"]["matching_skills"]
+
+def test_analyze_unknown_job():
+    response = client.post("/jobs/0123abcd/analyze", json={"resume": "Python developer"})
+    assert response.status_code == 404
+
+def test_analyze_resume_busy(monkeypatch):
+    import app as app_module
+    from executor import AnalysisExecutor
+
+    busy_executor = AnalysisExecutor(app_module.get_reviewer(), max_pending=0, retry_after=3)
+    monkeypatch.setitem(app_module.services, "executor", busy_executor)
+    try:
+        response = client.post(
+            "/analyze_resume",
+            json={"job_description": "Python developer role", "resume": "Python developer"}
+        )
+    finally:
+        busy_executor.shutdown()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+
+def test_index_requests_wait_for_the_executor(monkeypatch):
+    import app as app_module
+    from executor import AnalysisExecutor
+
+    busy_executor = AnalysisExecutor(app_module.get_reviewer(), max_pending=0, retry_after=3)
+    monkeypatch.setitem(app_module.services, "executor", busy_executor)
+    try:
+        responses = [
+            client.post("/index/resumes", json={"resumes": [{"id": "busy", "resume": "Python developer"}]}),
+            client.post("/index/jobs", json={"jobs": [{"id": "busy", "job_description": "Python developer"}]}),
+            client.post("/search", json={"job_description": "Python developer"}),
+            client.post("/match_jobs", json={"resume": "Python developer"}),
+            client.post("/analytics/skill_gaps", json={"job_description": "Python developer"}),
+        ]
+    finally:
+        busy_executor.shutdown()
+
+    assert [response.status_code for response in responses] == [503] * 5
+    assert "busy" not in app_module.get_resume_index() and "busy" not in app_module.get_job_index()
+
+def test_index_and_search_resumes():
+    response = client.post("/index/resumes", json={"resumes": [
+        {"id": "r1", "resume": "Accountant with experience in bookkeeping and payroll."},
+        {"id": "r2", "resume": "Python developer who built web applications using Flask and Django with SQL."}
+    ]})
+    assert response.status_code == 200
+    assert response.json()["indexed"] == 2
+
+    response = client.post("/search", json={
+        "job_description": "We are looking for a Python developer with experience in Flask, Django, and SQL.",
+        "top_k": 1
+    })
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["id"] for result in results] == ["r2"]
+    assert "python" in results[0]["skill_match"]["matching_skills"]
+
+    assert client.delete("/index/resumes/r2").status_code == 200
+    assert client.delete("/index/resumes/r2").status_code == 404
+
+def test_ready_after_warmup():
+    import time
+
+    with TestClient(app) as warm_client:
+        deadline = time.monotonic() + 60
+        response = warm_client.get("/ready")
+        while response.status_code == 503 and time.monotonic() < deadline:
+            assert response.json()["status"] == "warming up"
+            time.sleep(0.05)
+            response = warm_client.get("/ready")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready"}
+
+def test_analyze_resume_timings_and_metrics():
+    test_input = {
+        "job_description": "We are looking for a Python developer with experience in Flask, Django, and SQL.",
+        "resume": "Python developer who built web applications using Flask and Django."
+    }
+    assert "timings" not in client.post("/analyze_resume", json=test_input).json()
+
+    response = client.post("/analyze_resume?timings=true", json=test_input)
+    assert response.status_code == 200
+    timings = response.json()["timings"]
+    assert "similarity" in timings["stages"]
+    assert timings["sizes"]["job_chars"] == len(test_input["job_description"])
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'resume_reviewer_stage_seconds_bucket{stage="similarity",le="+Inf"}' in body
+    assert 'resume_reviewer_requests_total{endpoint="analyze_resume"}' in body
+    assert 'resume_reviewer_input_chars_count{input="resume"}' in body
+
+def test_analyze_stream_keeps_input_order():
+    job = "We are looking for a Python developer with experience in Flask, Django, and SQL."
+    job_id = client.post("/jobs", json={"job_description": job}).json()["job_id"]
+    records = [
+        {"id": "a", "job_description": job, "resume": "Python developer who built web applications using Flask and Django."},
+        {"id": "b", "job_id": job_id, "resume": "Accountant with audit and tax experience."},
+        "not json",
+        {"id": "c", "job_id": "unknown", "resume": "Python developer."},
+        {"id": "d", "job_description": job},
+    ]
+    body = "\n".join(record if isinstance(record, str) else json.dumps(record) for record in records) + "\n\n"
+
+    response = client.post("/analyze_stream", content=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["line"] for line in lines] == [1, 2, 3, 4, 5]
+    assert [line.get("id") for line in lines] == ["a", "b", None, "c", "d"]
+    assert lines[0]["result"]["overall_match_score"] > lines[1]["result"]["overall_match_score"]
+    assert lines[0]["result"]["recommendations"]
+    assert lines[2]["error"] == "Record is not a JSON object"
+    assert lines[3]["error"] == "Unknown job id"
+    assert lines[4]["error"] == "Resume is required"
+
+def test_analyze_stream_bounded_window(monkeypatch):
+    import app as app_module
+
+    monkeypatch.setattr(app_module, "stream_window", 2)
+    monkeypatch.setattr(app_module, "stream_max_line_bytes", 200)
+    job = "Python developer with Django and SQL experience."
+    records = [json.dumps({"id": index, "job_description": job, "resume": "Python developer %d with Django." % index})
+               for index in range(12)]
+    records.insert(5, json.dumps({"resume": "x" * 500}))
+
+    def chunks():
+        # Split records across chunk boundaries
+        body = ("\n".join(records) + "\n").encode()
+        for start in range(0, len(body), 37):
+            yield body[start:start + 37]
+
+    response = client.post("/analyze_stream", content=chunks())
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["line"] for line in lines] == list(range(1, 14))
+    assert lines[5]["error"] == "Record is longer than 200 bytes"
+    assert [line["id"] for line in lines if "result" in line] == list(range(12))
+
+def test_reload_taxonomy(monkeypatch, tmp_path):
+    import app as app_module
+    from executor import AnalysisExecutor
+    from job_store import JobStore
+    from resume_index import ResumeIndex
+    from resume_reviewer import ResumeReviewer
+
+    # Disabled until an admin token is configured
+    assert client.post("/admin/taxonomy/reload").status_code == 403
+    monkeypatch.setattr(app_module, "admin_token", "secret")
+    assert client.post("/admin/taxonomy/reload", headers={"X-Admin-Token": "secret"}).status_code == 400
+
+    taxonomy = tmp_path / "taxonomy.json"
+    taxonomy.write_text(json.dumps({"skill_categories": {"technology": ["python", "flask"]}}))
+    reviewer = app_module.get_reviewer()
+    executor = AnalysisExecutor(reviewer)
+    monkeypatch.setitem(app_module.reviewer_options, "taxonomy", str(taxonomy))
+    monkeypatch.setitem(app_module.services, "reviewer", reviewer)
+    monkeypatch.setitem(app_module.services, "job_store", JobStore(reviewer))
+    monkeypatch.setitem(app_module.services, "executor", executor)
+    monkeypatch.setitem(app_module.services, "resume_index", ResumeIndex(ResumeReviewer(vectorizer_mode="hashing")))
+    monkeypatch.delitem(app_module.services, "job_index", raising=False)
+    try:
+        job = {"job_description": "Python developer with Flask, Django and SQL."}
+        assert client.post("/jobs", json=job).json()["skills"] == ["django", "flask", "python", "sql"]
+        client.post("/index/resumes", json={"resumes": [{"id": "a", "resume": "Python and Flask developer"}]})
+
+        assert client.post("/admin/taxonomy/reload").status_code == 403
+        response = client.post("/admin/taxonomy/reload", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        assert response.json()["skills"] == 2
+        # The index holds skills of the old taxonomy until it is rebuilt
+        assert response.json()["stale_indexes"] == ["resume_index"]
+        assert client.post("/search", json=job).status_code == 409
+        assert client.delete("/index/resumes").json() == {"deleted": 1, "size": 0}
+        assert client.post("/search", json=job).status_code == 200
+        assert app_module.services["reviewer"].taxonomy_version == response.json()["taxonomy_version"]
+        assert client.post("/jobs", json=job).json()["skills"] == ["flask", "python"]
+
+        taxonomy.write_text("{")
+        response = client.post("/admin/taxonomy/reload", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 422
+        assert app_module.services["reviewer"].taxonomy_version != reviewer.taxonomy_version
+    finally:
+        executor.shutdown()
+
+def test_repeated_analysis_is_served_from_cache():
+    import app as app_module
+
+    test_input = {
+        "job_description": "Data engineer with Spark, Kafka and Airflow experience.",
+        "resume": "Built Spark and Kafka pipelines scheduled with Airflow."
+    }
+    misses = app_module.cache_misses_total.value()
+    first = client.post("/analyze_resume", json=test_input).json()
+    hits = app_module.cache_hits_total.value("memory")
+    second = client.post("/analyze_resume", json=test_input).json()
+
+    assert first == second
+    assert app_module.cache_misses_total.value() == misses + 1
+    assert app_module.cache_hits_total.value("memory") == hits + 1
+    assert 'resume_reviewer_result_cache_hits_total{tier="memory"}' in client.get("/metrics").text
+
+    # Timings are only available from a fresh computation
+    assert "timings" in client.post("/analyze_resume?timings=true", json=test_input).json()
+
+def test_input_limits(monkeypatch):
+    import app as app_module
+
+    monkeypatch.setattr(app_module, "max_input_chars", 60)
+    job = "Python developer with Django and SQL experience."
+    resume = "Python developer with Django. " + "Led migrations of large SQL databases. " * 5
+    response = client.post("/analyze_resume", json={"job_description": job, "resume": resume})
+    assert response.status_code == 200
+    assert response.json()["truncated"] is True
+    assert client.post("/analyze_resume", json={"job_description": job, "resume": resume[:50]}).json()["truncated"] is False
+
+    long_job = job + " Experience with Kubernetes and Terraform is a plus."
+    assert client.post("/search", json={"job_description": long_job}).headers["X-Input-Truncated"] == "true"
+    assert client.post("/search", json={"job_description": job}).headers["X-Input-Truncated"] == "false"
+    assert client.post("/match_jobs", json={"resume": resume}).headers["X-Input-Truncated"] == "true"
+    assert client.post("/analytics/skill_gaps", json={"job_description": long_job}).json()["truncated"] is True
+
+    monkeypatch.setattr(app_module, "input_limit_policy", "reject")
+    response = client.post("/analyze_resume", json={"job_description": job, "resume": resume})
+    assert response.status_code == 413
+    assert response.json()["detail"] == "resume is longer than 60 characters"
+
+    body = "\n".join(json.dumps({"job_description": job, "resume": text}) for text in (resume[:50], resume))
+    lines = [json.loads(line) for line in client.post("/analyze_stream", content=body).text.splitlines()]
+    assert lines[0]["result"]["truncated"] is False
+    assert lines[1]["error"] == "resume is longer than 60 characters"
+
+def test_batches():
+    import time
+
+    job = "Python developer with Django and SQL experience."
+    resumes = ["Python developer with Django.", "SQL analyst.", "Django and SQL.", "Python developer with Django."]
+    with TestClient(app) as batch_client:
+        assert batch_client.post("/batches", json={"job_description": job, "resumes": []}).status_code == 400
+        response = batch_client.post("/batches", json={"job_description": job, "resumes": resumes})
+        assert response.status_code == 202
+        batch_id = response.json()["batch_id"]
+        assert response.json() == {"batch_id": batch_id, "total": 4, "truncated": []}
+
+        deadline = time.time() + 30
+        while True:
+            batch = batch_client.get("/batches/%s" % batch_id).json()
+            if batch["status"] == "completed" or time.time() > deadline:
+                break
+            time.sleep(0.05)
+        assert batch["status"] == "completed"
+        assert [item["index"] for item in batch["results"]] == [0, 1, 2, 3]
+        assert batch["duplicates"] == 1 and batch["results"][3]["duplicate_of"] == 0
+        assert batch["results"][3]["result"] == batch["results"][0]["result"]
+        expected = batch_client.post("/analyze_resume", json={"job_description": job, "resume": resumes[2]}).json()
+        assert {key: batch["results"][2]["result"][key] for key in expected} == expected
+        assert batch_client.get("/batches/%s?offset=1&limit=1" % batch_id).json()["results"][0]["index"] == 1
+        summary = batch_client.get("/batches/%s?detail=summary" % batch_id).json()["results"][2]["result"]
+        assert summary == {"overall_match_score": expected["overall_match_score"], "truncated": False}
+        assert batch_client.get("/batches/unknown").status_code == 404
+
+def test_rank_resumes_flags_duplicates():
+    resume = "Python developer with 5 years experience in Django, React and SQL. Led a team of four engineers."
+    response = client.post("/rank_resumes", json={
+        "job_description": "Senior Python Developer with Django",
+        "resumes": [resume, "Registered nurse with patient care experience", resume]
+    })
+    by_index = {result["index"]: result for result in response.json()}
+    assert [by_index[index]["duplicate_of"] for index in range(3)] == [None, None, 0]
+
+def test_match_jobs():
+    jobs = [
+        {"id": "backend", "job_description": "Backend engineer with Python, Django and PostgreSQL."},
+        {"id": "nurse", "job_description": "Registered nurse for patient care."},
+    ]
+    response = client.post("/index/jobs", json={"jobs": jobs})
+    assert response.status_code == 200
+    assert response.json()["indexed"] == 2
+
+    response = client.post("/match_jobs", json={"resume": "Python and Django developer", "top_k": 5})
+    assert response.status_code == 200
+    assert [result["id"] for result in response.json()] == ["backend"]
+    assert response.json()[0]["skill_match"]["matching_skills"] == ["django", "python"]
+    # The backend posting asks for three skills, so two of them is a 2/3 skill match
+    response = client.post("/match_jobs", json={"resume": "Python and Django developer", "min_skill_match": 0.9})
+    assert response.json() == []
+
+    assert client.delete("/index/jobs/backend").status_code == 200
+    assert client.delete("/index/jobs/backend").status_code == 404
+    assert client.post("/match_jobs", json={"resume": "Python and Django developer"}).json() == []
+
+def test_detail_levels_and_fields():
+    job = "Python developer with Django and SQL experience."
+    resume = "Python developer with Django and five years experience."
+    full = client.post("/analyze_resume", json={"job_description": job, "resume": resume}).json()
+    assert set(full) == {"overall_match_score", "similarity_score", "skill_match", "education_score",
+                         "experience_score", "recommendations", "truncated"}
+
+    summary = client.post("/analyze_resume?detail=summary", json={"job_description": job, "resume": resume}).json()
+    assert summary == {"overall_match_score": full["overall_match_score"], "truncated": False}
+    selected = client.post("/analyze_resume?fields=skill_match,recommendations",
+                           json={"job_description": job, "resume": resume}).json()
+    assert selected == {"skill_match": full["skill_match"], "recommendations": full["recommendations"], "truncated": False}
+
+    ranked = client.post("/rank_resumes?detail=summary", json={"job_description": job, "resumes": [resume, "Nurse"]}).json()
+    assert [set(result) for result in ranked] == [{"overall_match_score", "truncated", "index", "duplicate_of"}] * 2
+    assert ranked[0]["index"] == 0
+
+    assert client.post("/analyze_resume?fields=skill_categories", json={"job_description": job, "resume": resume}).status_code == 400
+    assert client.post("/analyze_resume?detail=brief", json={"job_description": job, "resume": resume}).status_code == 400
+
+def test_json_without_orjson(monkeypatch):
+    import app as app_module
+
+    content = {"score": 71.5, "skills": ["c++", "café"], "duplicate_of": None}
+    encoded = app_module.dump_json(content)
+    monkeypatch.setattr(app_module, "orjson", None)
+    assert app_module.dump_json(content) == encoded
+    assert json.loads(encoded) == content
+
+def test_skill_analytics(monkeypatch):
+    import app as app_module
+    from resume_index import ResumeIndex
+    from skill_analytics import SkillAnalytics
+
+    index = ResumeIndex(app_module.index_reviewer(app_module.get_reviewer()))
+    monkeypatch.setitem(app_module.services, "resume_index", index)
+    monkeypatch.setitem(app_module.services, "skill_analytics", SkillAnalytics(index))
+    client.post("/index/resumes", json={"resumes": [
+        {"id": "a", "resume": "Python developer with Django and SQL."},
+        {"id": "b", "resume": "Python data engineer with Spark."},
+    ]})
+
+    response = client.get("/analytics/skills?top=1")
+    assert response.status_code == 200
+    assert response.json() == {"resumes": 2, "skills": [{"skill": "python", "resumes": 2, "percentage": 100.0}]}
+    assert client.get("/analytics/skills?top=0").status_code == 400
+
+    response = client.post("/analytics/skill_gaps", json={"job_description": "Python and Kubernetes engineer"})
+    assert response.status_code == 200
+    assert [item["skill"] for item in response.json()["skills"]] == ["kubernetes", "python"]
+    assert response.json()["coverage"] == [0, 2, 0]
+    assert client.post("/analytics/skill_gaps", json={"job_description": ""}).status_code == 400
+
+    categories = client.get("/analytics/categories").json()["categories"]
+    assert all(sum(category["histogram"]) == 2 for category in categories)
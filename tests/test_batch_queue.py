@@ -0,0 +1,120 @@
+import asyncio
+from batch_queue import BatchQueue, BatchRunner
+
+def test_claim_respects_limits_and_order():
+    queue = BatchQueue()
+    first = queue.create("job", ["a", "b", "c", "d"], max_concurrency=3)
+    second = queue.create("job", ["e", "f"], max_concurrency=1)
+
+    claimed = queue.claim(limit=4, max_per_batch=2)
+    assert [(item["batch_id"], item["resume"]) for item in claimed] == [(first, "a"), (first, "b"), (second, "e")]
+    # Both batches are at their limit until an item finishes
+    assert queue.claim(limit=4, max_per_batch=2) == []
+
+    queue.finish(first, 0, result={"score": 1})
+    queue.finish(second, 0, error="Analysis failed")
+    assert [item["resume"] for item in queue.claim(limit=4, max_per_batch=2)] == ["c", "f"]
+
+    batch = queue.get(first)
+    assert (batch["status"], batch["completed"], batch["running"], batch["queued"]) == ("running", 1, 2, 1)
+    assert batch["results"] == [{"index": 0, "result": {"score": 1}}]
+    assert queue.get(second)["results"] == [{"index": 0, "error": "Analysis failed"}]
+    assert queue.get("missing") is None
+
+def test_running_items_are_requeued_after_restart(tmp_path):
+    path = str(tmp_path / "batches.db")
+    queue = BatchQueue(path)
+    batch_id = queue.create("job", ["a", "b"], max_concurrency=2, truncated=[False, True])
+    queue.claim(limit=2, max_per_batch=2)
+    queue.finish(batch_id, 0, result={"score": 1})
+    queue.close()
+
+    queue = BatchQueue(path)
+    assert queue.has_pending()
+    assert queue.get(batch_id)["queued"] == 1
+    [item] = queue.claim(limit=2, max_per_batch=2)
+    assert (item["position"], item["resume"], item["truncated"]) == (1, "b", True)
+    queue.finish(batch_id, 1, result={"score": 2})
+    batch = queue.get(batch_id)
+    assert batch["status"] == "completed" and batch["finished_at"] is not None
+    assert not queue.has_pending()
+
+def test_duplicates_reuse_their_representative():
+    queue = BatchQueue()
+    batch_id = queue.create("job", ["a", "b", "a"], max_concurrency=3, duplicate_of=[None, None, 0])
+    assert [item["resume"] for item in queue.claim(limit=3, max_per_batch=3)] == ["a", "b"]
+
+    queue.finish(batch_id, 0, result={"score": 1})
+    batch = queue.get(batch_id)
+    assert (batch["completed"], batch["duplicates"]) == (2, 1)
+    assert batch["results"][1] == {"index": 2, "result": {"score": 1}, "duplicate_of": 0}
+
+    queue.finish(batch_id, 1, result={"score": 2})
+    assert queue.get(batch_id)["status"] == "completed"
+
+def test_runner_bounds_concurrency():
+    queue = BatchQueue()
+    running = []
+    peak = {"all": 0}
+
+    async def analyze(item):
+        running.append(item["batch_id"])
+        peak["all"] = max(peak["all"], len(running))
+        peak[item["batch_id"]] = max(peak.get(item["batch_id"], 0), running.count(item["batch_id"]))
+        await asyncio.sleep(0.01)
+        running.remove(item["batch_id"])
+        if item["resume"] == "bad":
+            raise RuntimeError("boom")
+        return {"resume": item["resume"]}
+
+    async def main():
+        runner = BatchRunner(queue, analyze, concurrency=3, max_per_batch=2)
+        first = queue.create("job", ["r%d" % index for index in range(10)], max_concurrency=2)
+        second = queue.create("job", ["bad", "ok"], max_concurrency=1)
+        runner.start()
+        while queue.has_pending():
+            await asyncio.sleep(0.01)
+        await runner.stop()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert peak["all"] == 3 and peak[first] == 2 and peak[second] == 1
+    assert [item["result"]["resume"] for item in queue.get(first)["results"]] == ["r%d" % index for index in range(10)]
+    assert queue.get(second)["results"] == [{"index": 0, "error": "Analysis failed"}, {"index": 1, "result": {"resume": "ok"}}]
+
+def test_runner_groups_batches_before_analysis():
+    queue = BatchQueue()
+    analyzed = []
+    groups = []
+
+    async def analyze(item):
+        analyzed.append((item["resume"], item["document"]))
+        return {"resume": item["resume"]}
+
+    async def group(resumes):
+        groups.append(resumes)
+        if resumes == ["x", "y"]:
+            raise RuntimeError("boom")
+        return [None, None, 0], [resume.upper() for resume in resumes]
+
+    async def main():
+        runner = BatchRunner(queue, analyze, concurrency=2, max_per_batch=2, group=group)
+        grouped = queue.create("job", ["a", "b", "a"], max_concurrency=2, group=True)
+        failed = queue.create("job", ["x", "y"], max_concurrency=2, group=True)
+        # Nothing of a batch is claimed before it is grouped
+        assert queue.claim(limit=4, max_per_batch=2) == []
+        assert queue.get(grouped)["status"] == "queued"
+        runner.start()
+        while queue.has_pending():
+            await asyncio.sleep(0.01)
+        await runner.stop()
+        return grouped, failed
+
+    grouped, failed = asyncio.run(main())
+    assert groups == [["a", "b", "a"], ["x", "y"]]
+    assert sorted(analyzed) == [("a", "A"), ("b", "B"), ("x", None), ("y", None)]
+    batch = queue.get(grouped)
+    assert batch["duplicates"] == 1
+    assert batch["results"][2] == {"index": 2, "result": {"resume": "a"}, "duplicate_of": 0}
+    # A batch that failed to group is analyzed without near-duplicate detection
+    assert queue.get(failed)["completed"] == 2
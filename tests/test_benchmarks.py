@@ -0,0 +1,65 @@
+import json
+import pytest
+from resume_reviewer import ResumeReviewer
+from benchmarks.synthetic import SyntheticCorpus
+from benchmarks import suite
+
+@pytest.fixture(scope="module")
+def reviewer():
+    return ResumeReviewer()
+
+def test_synthetic_corpus_is_deterministic(reviewer):
+    first = SyntheticCorpus(reviewer, seed=3).pairs(3, resume_words=120, job_words=40)
+    second = SyntheticCorpus(reviewer, seed=3).pairs(3, resume_words=120, job_words=40)
+    assert first == second
+    assert first != SyntheticCorpus(reviewer, seed=4).pairs(3, resume_words=120, job_words=40)
+
+def test_synthetic_documents_have_requested_size_and_skills(reviewer):
+    resume = SyntheticCorpus(reviewer).resume(300, category="technology")
+    assert 300 <= len(resume.split()) < 320
+    assert reviewer.identify_skill_categories(reviewer.extract_skills(resume))["technology"]["count"] > 5
+
+def test_compare_flags_regressions():
+    baseline = {"stages": {"a": {"median_ms": 10.0}, "b": {"median_ms": 10.0}}}
+    results = {"stages": {"a": {"median_ms": 11.0}, "b": {"median_ms": 13.0}, "c": {"median_ms": 1.0}}}
+    rows = suite.compare(results, baseline, threshold=0.2)
+    assert [(row[0], row[4]) for row in rows] == [("a", False), ("b", True)]
+    assert not suite.compare(results, baseline, 0.2, {"b": 0.5})[1][4]
+
+def test_suite_writes_results_and_detects_regression(tmp_path):
+    output = tmp_path / "bench.json"
+    assert suite.main(["--pairs", "2", "--resume-words", "80", "--job-words", "30", "--no-http", "--output", str(output)]) == 0
+    results = json.loads(output.read_text())
+    assert set(results["stages"]) == {"preprocess_text", "calculate_similarity", "extract_skills",
+                                      "identify_skill_categories", "analyze_resume"}
+
+    for stats in results["stages"].values():
+        stats["median_ms"] /= 100
+    output.write_text(json.dumps(results))
+    assert suite.main(["--pairs", "2", "--resume-words", "80", "--job-words", "30", "--no-http",
+                       "--baseline", str(output)]) == 1
+
+def test_app_environment_matches_the_reviewer():
+    environment = suite.app_environment(ResumeReviewer(preprocessing="fast", vectorizer_mode="hashing"), "model.joblib")
+    assert environment["PREPROCESSING"] == "fast" and environment["VECTORIZER_MODE"] == "hashing"
+    assert environment["MODEL_PATH"] == "model.joblib" and environment["RESULT_CACHE_SIZE"] == "0"
+
+def test_loadtest_latency_summary():
+    from benchmarks.loadtest import latency_summary
+
+    summary = latency_summary([0.001 * value for value in range(1, 101)])
+    assert summary["count"] == 100
+    assert (summary["p50_ms"], summary["p99_ms"], summary["max_ms"]) == pytest.approx((51.0, 99.0, 100.0))
+    histogram = dict(summary["histogram"])
+    assert histogram["5"] == 5 and histogram["100"] == 50 and sum(histogram.values()) == 100
+    assert latency_summary([])["p95_ms"] is None
+
+def test_loadtest_reads_process_usage():
+    import os
+    from benchmarks.loadtest import tree_usage, usage_delta
+
+    before = tree_usage(os.getpid())
+    sum(range(200000))
+    usage = usage_delta(os.getpid(), before, tree_usage(os.getpid()), 1.0)
+    [server] = [process for process in usage["processes"] if process["role"] == "server"]
+    assert server["pid"] == os.getpid() and server["rss_mib"] > 0 and server["cpu_seconds"] >= 0
@@ -0,0 +1,69 @@
+import json
+from cli import main, iter_corpus
+from resume_reviewer import ResumeReviewer
+
+def test_iter_corpus_reads_directory_and_jsonl(tmp_path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "a.txt").write_text("Python developer")
+    (tmp_path / "docs" / "notes.md").write_text("ignored")
+    jsonl = tmp_path / "corpus.jsonl"
+    jsonl.write_text(json.dumps({"job_description": "Nurse wanted", "resume": "Registered nurse"}) + "\n\n")
+
+    assert list(iter_corpus(str(tmp_path / "docs"))) == ["Python developer"]
+    assert list(iter_corpus(str(jsonl))) == ["Registered nurse", "Nurse wanted"]
+
+def test_fit_model_command(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text("\n".join(json.dumps({"text": text}) for text in [
+        "Python developer with Django", "Registered nurse with patient care", "Accountant with payroll"
+    ]))
+    output = tmp_path / "model.pkl"
+
+    main(["fit-model", "--corpus", str(corpus), "--output", str(output)])
+
+    reviewer = ResumeReviewer(model_path=str(output))
+    assert "python" in reviewer.vectorizer.vocabulary_
+
+    main(["fit-model", "--corpus", str(corpus), "--output", str(output), "--components", "2"])
+    reviewer = ResumeReviewer(model_path=str(output))
+    assert reviewer.vectorizer_mode == "lsa"
+    assert reviewer.vectorize(["Python developer"]).shape == (1, 2)
+
+def test_score_command_resumes_from_checkpoint(tmp_path):
+    job = tmp_path / "job.txt"
+    job.write_text("Python developer with Django and SQL")
+    resumes = tmp_path / "resumes.jsonl"
+    resumes.write_text("\n".join(json.dumps(record) for record in [
+        {"id": "a", "resume": "Python developer with Django"},
+        {"id": "b", "resume": "Registered nurse with patient care"},
+        {"id": "c", "text": "SQL analyst"},
+        {"id": "d", "resume": ""},
+    ]))
+    output = tmp_path / "scores.jsonl"
+    # An interrupted earlier run: "a" was written, "b" only partly
+    output.write_text(json.dumps({"id": "a", "overall_match_score": 1.0}) + '\n{"id": "b", "overa')
+
+    main(["score", "--job", str(job), "--resumes", str(resumes), "--output", str(output), "--workers", "2", "--batch-size", "1"])
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [line["id"] for line in lines] == ["a", "b", "c", "d"]
+    assert lines[0]["overall_match_score"] == 1.0
+    assert lines[1]["overall_match_score"] < lines[2]["overall_match_score"]
+    assert lines[3]["error"] == "empty resume"
+
+def test_score_command_writes_csv(tmp_path):
+    import csv
+
+    job = tmp_path / "job.txt"
+    job.write_text("Python developer with Django and SQL")
+    (tmp_path / "resumes").mkdir()
+    (tmp_path / "resumes" / "one.txt").write_text("Python developer with Django")
+    (tmp_path / "resumes" / "two.txt").write_text("Accountant")
+    output = tmp_path / "scores.csv"
+
+    main(["score", "--job", str(job), "--resumes", str(tmp_path / "resumes"), "--output", str(output), "--workers", "1"])
+    main(["score", "--job", str(job), "--resumes", str(tmp_path / "resumes"), "--output", str(output), "--workers", "1"])
+
+    rows = list(csv.DictReader(output.read_text().splitlines()))
+    assert [row["id"] for row in rows] == ["one.txt", "two.txt"]
+    assert rows[0]["matching_skills"] == "django;python"
@@ -0,0 +1,47 @@
+import random
+from dedup import MinHasher, DuplicateFinder, band_layout, find_duplicates, similarity
+
+WORDS = ["python", "django", "sql", "team", "lead", "build", "data", "pipeline", "cloud", "service",
+         "customer", "report", "design", "test", "deploy", "manage", "project", "api", "system", "scale"]
+
+def document(seed, length=300):
+    rng = random.Random(seed)
+    return [rng.choice(WORDS) for _ in range(length)]
+
+def edited(tokens, count, seed=0):
+    rng = random.Random(seed)
+    tokens = list(tokens)
+    for _ in range(count):
+        tokens[rng.randrange(len(tokens))] = "edited"
+    return tokens
+
+def test_signatures_estimate_shingle_similarity():
+    hasher = MinHasher(num_perm=128)
+    base = document(1)
+    assert hasher.signature(base).dtype.name == "uint32"
+    assert similarity(hasher.signature(base), MinHasher(num_perm=128).signature(list(base))) == 1.0
+    assert similarity(hasher.signature(base), hasher.signature(edited(base, 3))) > 0.85
+    assert similarity(hasher.signature(base), hasher.signature(document(2))) < 0.2
+
+def test_band_layout():
+    assert band_layout(64, 0.9) == (8, 8)
+    assert band_layout(64, 0.5) == (16, 4)
+    assert band_layout(64, 0.01) == (64, 1)
+
+def test_find_duplicates_groups_around_first_occurrence():
+    hasher = MinHasher()
+    base, other = document(1), document(2)
+    signatures = [hasher.signature(tokens) for tokens in (base, other, edited(base, 2), list(base), edited(other, 2, 1))]
+    assert find_duplicates(signatures, 0.8) == [None, None, 0, 0, 1]
+    assert find_duplicates(signatures, 1.0) == [None, None, None, 0, None]
+    assert find_duplicates([], 0.9) == []
+
+def test_finder_remove():
+    hasher = MinHasher()
+    finder = DuplicateFinder(0.9)
+    signature = hasher.signature(document(1))
+    assert finder.add("a", signature) is None
+    assert finder.add("b", signature) == "a"
+    finder.remove("a")
+    assert len(finder) == 0
+    assert finder.add("b", signature) is None
@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from resume_reviewer import ResumeReviewer
+from executor import AnalysisExecutor, ExecutorBusy
+
+JOB = "Senior Python Developer needed. Must know Django, React and SQL."
+RESUME = "Python developer with 5 years experience in Django and SQL."
+
+@pytest.fixture(scope="module")
+def reviewer():
+    return ResumeReviewer()
+
+def test_inline_executor_matches_direct_call(reviewer):
+    executor = AnalysisExecutor(reviewer)
+    try:
+        result = asyncio.run(executor.run("analyze_resume", JOB, RESUME))
+    finally:
+        executor.shutdown()
+    assert result == reviewer.analyze_resume(JOB, RESUME)
+    assert executor.pending == 0
+
+def test_process_pool_executor(reviewer):
+    executor = AnalysisExecutor(reviewer, workers=1)
+    try:
+        executor.warm()
+        job = reviewer.prepare_job(JOB)
+        result = asyncio.run(executor.run("analyze_resume", job, RESUME))
+    finally:
+        executor.shutdown()
+    assert result["overall_match_score"] == reviewer.analyze_resume(JOB, RESUME)["overall_match_score"]
+
+def test_dead_worker_is_replaced(reviewer):
+    import os
+    import signal
+
+    executor = AnalysisExecutor(reviewer, workers=1, retry_after=3)
+    try:
+        executor.warm()
+        for pid in list(executor._pool._processes):
+            os.kill(pid, signal.SIGKILL)
+        with pytest.raises(ExecutorBusy) as excinfo:
+            asyncio.run(executor.run("extract_skills", RESUME))
+        assert excinfo.value.retry_after == 3
+        # The next call runs on a fresh pool
+        assert asyncio.run(executor.run("extract_skills", RESUME)) == reviewer.extract_skills(RESUME)
+    finally:
+        executor.shutdown()
+    assert executor.pending == 0
+
+def test_full_queue_raises_busy(reviewer):
+    executor = AnalysisExecutor(reviewer, max_pending=0, retry_after=7)
+    try:
+        with pytest.raises(ExecutorBusy) as excinfo:
+            asyncio.run(executor.run("analyze_resume", JOB, RESUME))
+    finally:
+        executor.shutdown()
+    assert excinfo.value.retry_after == 7
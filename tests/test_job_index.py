@@ -0,0 +1,53 @@
+import pytest
+from resume_reviewer import ResumeReviewer
+from job_index import JobIndex
+
+JOBS = {
+    "python": "Senior Python Developer needed. Must know Django, React and SQL.",
+    "nurse": "Registered nurse for patient care in our hospital ward.",
+    "accountant": "Accountant with payroll and bookkeeping experience.",
+    "greeter": "Friendly person wanted to welcome visitors.",
+}
+RESUME = "Python developer with a bachelor degree and 5 years experience in Django, React and SQL."
+
+@pytest.fixture(scope="module")
+def reviewer():
+    return ResumeReviewer(vectorizer_mode="hashing")
+
+def test_match_scores_only_postings_with_shared_skills(reviewer):
+    index = JobIndex(reviewer)
+    index.add_many(JOBS.items())
+
+    results, candidates = index.match(RESUME)
+
+    assert candidates == 1
+    assert [result["id"] for result in results] == ["python"]
+    expected = reviewer.analyze_resume(JOBS["python"], RESUME)
+    for key in ("overall_match_score", "similarity_score", "education_score", "experience_score"):
+        assert results[0][key] == pytest.approx(expected[key], abs=0.01)
+    assert results[0]["skill_match"] == expected["skill_match"]
+    assert index.match("No skills here at all") == ([], 0)
+
+def test_incremental_add_and_delete(reviewer, tmp_path):
+    index = JobIndex(reviewer, path=str(tmp_path))
+    index.add_many(JOBS.items())
+    index.add("python-junior", "Junior Python developer, some SQL.")
+    assert [result["id"] for result in index.match(RESUME)[0]] == ["python", "python-junior"]
+
+    assert index.delete("python")
+    assert [result["id"] for result in index.match(RESUME)[0]] == ["python-junior"]
+    index.save()
+    assert JobIndex(reviewer, path=str(tmp_path)).match(RESUME) == index.match(RESUME)
+
+    # python-junior asks for two skills, both in the resume; a posting asking for four of which
+    # the resume has two is filtered out by min_skill_match
+    index.add("fullstack", "Fullstack engineer: Python, SQL, Kubernetes and Terraform.")
+    assert [result["id"] for result in index.match(RESUME)[0]] == ["python-junior", "fullstack"]
+    assert [result["id"] for result in index.match(RESUME, min_skill_match=0.75)[0]] == ["python-junior"]
+
+def test_repeated_posting_ids(reviewer):
+    index = JobIndex(reviewer)
+    index.add_many([("job", JOBS["nurse"]), ("job", JOBS["python"])])
+
+    assert len(index) == 1
+    assert [result["id"] for result in index.match(RESUME)[0]] == ["job"]
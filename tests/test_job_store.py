@@ -0,0 +1,56 @@
+import pytest
+from resume_reviewer import ResumeReviewer, PreparedJob
+from job_store import JobStore, job_id_for
+
+JOB = "Senior Python Developer needed. Must know Django, React and SQL."
+RESUME = "Python developer with 5 years experience in Django and SQL."
+
+@pytest.fixture(scope="module")
+def reviewer():
+    return ResumeReviewer()
+
+def test_register_returns_content_hash(reviewer):
+    store = JobStore(reviewer)
+    job_id, job = store.register(JOB)
+    assert job_id == job_id_for(JOB)
+    assert isinstance(job, PreparedJob)
+    assert "python" in job.skills
+    assert store.get(job_id) is job
+
+def test_prepared_job_matches_plain_analysis(reviewer):
+    _, job = JobStore(reviewer).register(JOB)
+    assert reviewer.analyze_resume(job, RESUME) == reviewer.analyze_resume(JOB, RESUME)
+
+def test_lru_eviction(reviewer):
+    store = JobStore(reviewer, max_size=2)
+    first, _ = store.register("Python developer")
+    second, _ = store.register("Java developer")
+    store.get(first)
+    third, _ = store.register("Go developer")
+    assert len(store) == 2
+    assert store.get(second) is None
+    assert store.get(first) is not None
+    assert store.get(third) is not None
+
+def test_disk_store_survives_restart(reviewer, tmp_path):
+    job_id, job = JobStore(reviewer, path=str(tmp_path)).register(JOB)
+
+    reloaded = JobStore(reviewer, path=str(tmp_path)).get(job_id)
+
+    assert reloaded is not None
+    assert reloaded.skills == job.skills
+    assert JobStore(reviewer, path=str(tmp_path)).get("../../etc/passwd") is None
+
+def test_job_reloaded_under_another_model_gets_a_new_vector(tmp_path):
+    fitted = ResumeReviewer()
+    fitted.fit_model([JOB, RESUME, "Registered nurse with patient care experience."])
+    job_id, job = JobStore(fitted, path=str(tmp_path)).register(JOB)
+
+    hashing = ResumeReviewer(vectorizer_mode="hashing")
+    reloaded = JobStore(hashing, path=str(tmp_path)).get(job_id)
+
+    assert reloaded.model_version == hashing.model_version
+    assert reloaded.vector.shape == hashing.vectorize([JOB]).shape
+    assert hashing.analyze_resume(reloaded, RESUME) == hashing.analyze_resume(JOB, RESUME)
+    # The refreshed job replaces the stored one
+    assert JobStore(hashing, path=str(tmp_path)).get(job_id).model_version == hashing.model_version
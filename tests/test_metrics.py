@@ -0,0 +1,30 @@
+from metrics import Registry
+
+def test_counter_render():
+    registry = Registry()
+    counter = registry.counter("requests_total", "Requests served", ["endpoint"])
+    counter.inc("analyze")
+    counter.inc("analyze", amount=2)
+    counter.inc('quote"d')
+
+    assert counter.value("analyze") == 3
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests served",
+        "# TYPE requests_total counter",
+        'requests_total{endpoint="analyze"} 3',
+        'requests_total{endpoint="quote\\"d"} 1',
+    ]
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("stage_seconds", "Stage latency", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "similarity")
+
+    lines = registry.render().splitlines()
+    assert 'stage_seconds_bucket{stage="similarity",le="0.1"} 2' in lines
+    assert 'stage_seconds_bucket{stage="similarity",le="1.0"} 3' in lines
+    assert 'stage_seconds_bucket{stage="similarity",le="+Inf"} 4' in lines
+    assert 'stage_seconds_sum{stage="similarity"} 3.65' in lines
+    assert 'stage_seconds_count{stage="similarity"} 4' in lines
+    assert histogram.count("similarity") == 4
@@ -0,0 +1,61 @@
+import time
+from result_cache import ResultCache, result_key
+
+RESULT = {"overall_match_score": 72.5, "skill_match": {"matching_skills": ["python"]}}
+
+def test_key_depends_on_every_input():
+    key = result_key("job", "resume", "v1")
+    assert key == result_key("job", "resume", "v1")
+    assert len({key, result_key("job", "resume", "v2"), result_key("job", "resume2", "v1"),
+                result_key("job2", "resume", "v1"), result_key("jo", "bresume", "v1")}) == 5
+
+def test_memory_tier_is_lru_and_returns_copies():
+    cache = ResultCache(max_size=2)
+    cache.put("a", RESULT, "v1")
+    cache.put("b", RESULT, "v1")
+    tier, result = cache.lookup("a")
+    assert (tier, result) == ("memory", RESULT)
+    result["skill_match"]["matching_skills"].append("sql")
+    assert cache.lookup("a")[1] == RESULT
+
+    cache.put("c", RESULT, "v1")
+    assert cache.lookup("b") == (None, None)
+    assert len(cache) == 2
+
+def test_entries_expire():
+    cache = ResultCache(ttl=0.05)
+    cache.put("a", RESULT, "v1")
+    assert cache.lookup("a")[1] == RESULT
+    time.sleep(0.06)
+    assert cache.lookup("a") == (None, None)
+
+def test_sqlite_tier_is_shared_and_purged_by_version(tmp_path):
+    path = str(tmp_path / "results.db")
+    writer = ResultCache(path=path)
+    writer.put("a", RESULT, "v1")
+    writer.put("b", RESULT, "v2")
+
+    reader = ResultCache(max_size=10, path=path)
+    assert reader.lookup("a") == ("sqlite", RESULT)
+    assert reader.lookup("a") == ("memory", RESULT)
+
+    reader.purge("v2")
+    assert reader.lookup("a") == (None, None)
+    assert reader.lookup("b") == ("sqlite", RESULT)
+    writer.close()
+    reader.close()
+
+def test_tiers_can_be_used_separately(tmp_path):
+    path = str(tmp_path / "results.db")
+    cache = ResultCache(path=path)
+    assert cache.shared and not ResultCache().shared
+    cache.put_memory("a", RESULT)
+    assert cache.lookup_memory("a") == RESULT
+    assert cache.lookup_shared("a") is None
+
+    cache.put_shared("b", RESULT, "v1")
+    assert cache.lookup_memory("b") is None
+    other = ResultCache(path=path)
+    assert other.lookup_shared("b") == RESULT
+    # A shared hit is kept in memory
+    assert other.lookup_memory("b") == RESULT
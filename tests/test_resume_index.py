@@ -0,0 +1,158 @@
+import json
+import numpy as np
+import pytest
+from resume_reviewer import ResumeReviewer
+from resume_index import ResumeIndex, StaleIndexError
+
+JOB = "Senior Python Developer needed. Must know Django, React and SQL."
+RESUMES = {
+    "nurse": "Registered nurse with patient care and medication experience at a hospital",
+    "python": "Python developer with a bachelor degree and 5 years experience in Django, React and SQL.",
+    "accountant": "Accountant experienced in bookkeeping, payroll and financial reporting",
+}
+
+@pytest.fixture(scope="module")
+def reviewer():
+    return ResumeReviewer(vectorizer_mode="hashing")
+
+def test_requires_fixed_vectorizer():
+    with pytest.raises(ValueError):
+        ResumeIndex(ResumeReviewer())
+
+def test_search_matches_analyze_resume(reviewer):
+    index = ResumeIndex(reviewer)
+    index.add_many(RESUMES.items())
+
+    results = index.search(JOB, top_k=2)
+
+    assert [result["id"] for result in results][0] == "python"
+    assert len(results) == 2
+    expected = reviewer.analyze_resume(JOB, RESUMES["python"])
+    for key in ("overall_match_score", "similarity_score", "education_score", "experience_score"):
+        assert results[0][key] == pytest.approx(expected[key], abs=0.01)
+    assert results[0]["skill_match"] == expected["skill_match"]
+
+def test_delete_and_replace(reviewer):
+    index = ResumeIndex(reviewer)
+    index.add_many(RESUMES.items())
+    assert index.delete("python")
+    assert not index.delete("python")
+    assert "python" not in [result["id"] for result in index.search(JOB)]
+
+    index.add("nurse", RESUMES["python"])
+    results = index.search(JOB)
+    assert len(index) == 2
+    assert results[0]["id"] == "nurse"
+
+def test_repeated_ids_keep_the_last_text(reviewer):
+    index = ResumeIndex(reviewer)
+    index.add_many([("a", RESUMES["python"]), ("b", RESUMES["accountant"]), ("a", RESUMES["nurse"])])
+
+    assert len(index) == 2
+    results = {result["id"]: result for result in index.search("Registered nurse for patient care")}
+    assert results["a"]["skill_match"]["matching_skills"] == ["patient care"]
+    index.add_many([("b", RESUMES["python"]), ("b", RESUMES["python"])])
+    assert [result["id"] for result in index.search(JOB, top_k=1)] == ["b"]
+
+def test_prepared_documents_match_texts(reviewer):
+    by_text = ResumeIndex(reviewer)
+    by_text.add_many(RESUMES.items())
+    # Documents prepared by a pairwise reviewer (as in the executor workers) have no vector to reuse
+    prepared = ResumeIndex(reviewer)
+    documents = ResumeReviewer().prepare_documents(list(RESUMES.values()))
+    prepared.add_many(zip(RESUMES, documents))
+
+    [job] = reviewer.prepare_documents([JOB])
+    assert prepared.search(job) == by_text.search(JOB)
+
+def test_persistence_and_memory_mapping(reviewer, tmp_path):
+    index = ResumeIndex(reviewer, path=str(tmp_path))
+    index.add_many(RESUMES.items())
+    index.delete("accountant")
+    index.save()
+    expected = index.search(JOB)
+
+    reloaded = ResumeIndex(reviewer, path=str(tmp_path))
+
+    assert len(reloaded) == 2
+    assert isinstance(reloaded.education, np.memmap)
+    assert reloaded.search(JOB) == expected
+
+    reloaded.add("accountant", RESUMES["accountant"])
+    assert len(reloaded.search(JOB)) == 3
+
+def test_autosave(reviewer, tmp_path):
+    index = ResumeIndex(reviewer, path=str(tmp_path), autosave_every=2)
+    index.add_many(RESUMES.items())
+    assert len(ResumeIndex(reviewer, path=str(tmp_path))) == 3
+
+def test_rejects_index_from_other_model(reviewer, tmp_path):
+    index = ResumeIndex(reviewer, path=str(tmp_path))
+    index.add("python", RESUMES["python"])
+    index.save()
+
+    other = ResumeReviewer()
+    other.fit_model(list(RESUMES.values()))
+    with pytest.raises(ValueError):
+        ResumeIndex(other, path=str(tmp_path))
+
+def test_taxonomy_change_requires_a_rebuild(reviewer, tmp_path):
+    taxonomy = tmp_path / "taxonomy.json"
+    taxonomy.write_text(json.dumps({"skill_categories": {"technology": ["python", "django", "fastapi"]}}))
+    path = str(tmp_path / "index")
+    index = ResumeIndex(reviewer, path=path)
+    index.add("python", "Python developer with Django and FastAPI")
+    index.save()
+
+    # Skills are stored, not texts, so they cannot be extracted again with the new taxonomy
+    index.reviewer = ResumeReviewer(vectorizer_mode="hashing", taxonomy=str(taxonomy))
+    with pytest.raises(StaleIndexError):
+        index.search("Python developer with FastAPI")
+    with pytest.raises(StaleIndexError):
+        index.add("other", RESUMES["nurse"])
+    with pytest.raises(StaleIndexError):
+        ResumeIndex(index.reviewer, path=path)
+
+    assert index.clear() == 1
+    # The cleared index was saved under the new taxonomy
+    assert len(ResumeIndex(index.reviewer, path=path)) == 0
+    index.add("python", "Python developer with Django and FastAPI")
+    [result] = index.search("Python developer with FastAPI")
+    assert result["skill_match"]["percentage"] == 100.0
+
+def test_near_duplicates_are_grouped(reviewer, tmp_path):
+    index = ResumeIndex(reviewer, path=str(tmp_path), duplicate_threshold=0.8)
+    duplicates = index.add_many(list(RESUMES.items()) + [("python-again", RESUMES["python"]), ("nurse-again", RESUMES["nurse"])])
+    assert duplicates == {"python-again": "python", "nurse-again": "nurse"}
+
+    results = index.search(JOB)
+    assert len(results) == 3
+    assert {result["id"]: result["duplicates"] for result in results}["python"] == ["python-again"]
+
+    index.save()
+    reloaded = ResumeIndex(reviewer, path=str(tmp_path), duplicate_threshold=0.8)
+    assert reloaded.duplicate_of == {"python-again": "python", "nurse-again": "nurse"}
+    assert reloaded.search(JOB) == index.search(JOB)
+
+    # Deleting a representative promotes its duplicate
+    reloaded.delete("python")
+    assert {result["id"] for result in reloaded.search(JOB)} == {"python-again", "nurse", "accountant"}
+    assert reloaded.add_many([("python", RESUMES["python"])]) == {"python": "python-again"}
+
+def test_lsa_vectors_are_dense(tmp_path):
+    lsa = ResumeReviewer()
+    lsa.fit_model([JOB] + list(RESUMES.values()), components=3)
+    index = ResumeIndex(lsa, path=str(tmp_path))
+    index.add_many(RESUMES.items())
+
+    results = index.search(JOB)
+    assert results[0]["id"] == "python"
+    expected = lsa.analyze_resume(JOB, RESUMES["python"])
+    assert results[0]["similarity_score"] == pytest.approx(expected["similarity_score"], abs=0.01)
+    assert results[0]["overall_match_score"] == pytest.approx(expected["overall_match_score"], abs=0.01)
+
+    index.save()
+    reloaded = ResumeIndex(lsa, path=str(tmp_path))
+    assert isinstance(reloaded.vectors, np.memmap)
+    assert reloaded.vectors.shape == (3, 3) and reloaded.vectors.dtype == np.float32
+    assert reloaded.search(JOB) == results
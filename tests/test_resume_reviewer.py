@@ -1,5 +1,7 @@
+import os
+import numpy as np
 import pytest
-from resume_reviewer import preprocess_text, ResumeReviewer
+from resume_reviewer import preprocess_text, fast_preprocess_text, iter_preprocessed_tokens, truncate_text, ResumeReviewer, AnalyzedDocument
 
 @pytest.fixture
 def reviewer():
@@ -75,4 +77,261 @@ def test_skill_categories():
     categories = reviewer.identify_skill_categories(skills)
 
     assert "technology" in categories
-    assert len(categories["technology"]["skills"]) > 0
\ No newline at end of file
+    assert len(categories["technology"]["skills"]) > 0
+
+def test_rank_resumes_sorted_with_breakdown():
+    reviewer = ResumeReviewer()
+    job_desc = "Senior Python Developer needed. Must know Django, React and SQL."
+    resumes = [
+        "Registered nurse with patient care experience",
+        "Python developer with 5 years experience in Django, React and SQL.",
+        "Python developer familiar with Django.",
+    ]
+
+    results = reviewer.rank_resumes(job_desc, resumes)
+
+    assert results[0]["index"] == 1
+    scores = [result["overall_match_score"] for result in results]
+    assert scores == sorted(scores, reverse=True)
+    assert sorted(result["index"] for result in results) == [0, 1, 2]
+    for result in results:
+        assert "skill_match" in result
+        assert "skill_categories" in result
+        assert 0 <= result["similarity_score"] <= 100
+
+def test_rank_resumes_top_k():
+    reviewer = ResumeReviewer()
+    results = reviewer.rank_resumes(
+        "Python developer with Django",
+        ["Python developer", "Java developer", "Django and Python expert"],
+        top_k=2
+    )
+    assert len(results) == 2
+
+def test_rank_resumes_scores_near_duplicates_once(monkeypatch):
+    reviewer = ResumeReviewer()
+    resume = "Python developer with 5 years experience in Django, React and SQL. Led a team of four engineers."
+    resumes = [resume, "Registered nurse with patient care experience", resume.replace("four", "five"), resume]
+    scored = []
+    score_resume = reviewer._score_resume
+    monkeypatch.setattr(reviewer, "_score_resume", lambda *args: scored.append(args) or score_resume(*args))
+
+    results = reviewer.rank_resumes("Senior Python Developer with Django", resumes, duplicate_threshold=0.5)
+
+    assert len(scored) == 2
+    by_index = {result["index"]: result for result in results}
+    assert [by_index[index]["duplicate_of"] for index in range(4)] == [None, None, 0, 0]
+    assert by_index[3]["overall_match_score"] == by_index[0]["overall_match_score"]
+    assert reviewer.find_duplicates(resumes, 1.0) == [None, None, None, 0]
+
+def test_analyzed_document_tokens():
+    document = AnalyzedDocument("machine learning python developer python")
+    assert document.tokens == ["machine", "learning", "python", "developer", "python"]
+    assert document.token_set == {"machine", "learning", "python", "developer"}
+
+def test_analyze_resume_preprocesses_each_input_once(monkeypatch):
+    reviewer = ResumeReviewer()
+    calls = []
+    original = reviewer.preprocess_text
+    monkeypatch.setattr(reviewer, "preprocess_text", lambda text: calls.append(text) or original(text))
+
+    reviewer.analyze_resume(
+        "Senior Python Developer needed. Must know Django, React and SQL.",
+        "Python developer with a bachelor degree and 5 years experience in Django and SQL."
+    )
+
+    assert len(calls) == 2
+
+def test_extract_skills_accepts_analyzed_document():
+    reviewer = ResumeReviewer()
+    text = "Data scientist skilled in machine learning, Python and project management"
+    document = reviewer.analyze_document(text)
+    assert reviewer.extract_skills(document) == reviewer.extract_skills(text)
+    assert "machine learning" in reviewer.extract_skills(document)
+
+CORPUS = [
+    "Senior Python Developer needed. Must know Django, React and SQL.",
+    "Registered nurse with patient care and medication experience",
+    "Accountant experienced in bookkeeping, payroll and financial reporting",
+    "Python developer with 5 years experience in Django and SQL.",
+]
+
+def test_fitted_model_roundtrip(tmp_path):
+    reviewer = ResumeReviewer()
+    reviewer.fit_model(CORPUS)
+    model_path = str(tmp_path / "model.pkl")
+    reviewer.save_model(model_path)
+
+    loaded = ResumeReviewer(model_path=model_path)
+
+    assert loaded.vectorizer_mode == "fitted"
+    assert loaded.model_version.startswith("fitted-")
+    similarity = loaded.calculate_similarity(CORPUS[0], CORPUS[3])
+    assert similarity == pytest.approx(reviewer.calculate_similarity(CORPUS[0], CORPUS[3]))
+    assert 0 < similarity <= 1
+    # Scores no longer depend on which documents share the request
+    ranked = loaded.rank_resumes(CORPUS[0], CORPUS[1:])
+    single = loaded.analyze_resume(CORPUS[0], CORPUS[3])
+    assert ranked[0]["similarity_score"] == pytest.approx(single["similarity_score"])
+
+def test_fitted_model_uses_prepared_job_vector(tmp_path):
+    reviewer = ResumeReviewer()
+    reviewer.fit_model(CORPUS)
+    job = reviewer.prepare_job(CORPUS[0])
+    assert job.vector is not None
+    assert reviewer.analyze_resume(job, CORPUS[3]) == reviewer.analyze_resume(CORPUS[0], CORPUS[3])
+
+def test_prepare_documents_redoes_only_outdated_parts(monkeypatch):
+    reviewer = ResumeReviewer(vectorizer_mode="hashing")
+    prepared = reviewer.prepare_documents(CORPUS)
+    assert [job.skills for job in prepared] == [reviewer.extract_skills(text) for text in CORPUS]
+    assert (prepared[1].vector != reviewer.vectorize([CORPUS[1]])).nnz == 0
+
+    monkeypatch.setattr(reviewer, "vectorize", lambda documents: pytest.fail("vectorized again"))
+    assert [job.vector for job in reviewer.prepare_documents(prepared)] == [job.vector for job in prepared]
+    # Documents prepared by a pairwise reviewer are vectorized with the hashing one
+    monkeypatch.undo()
+    [job] = reviewer.prepare_documents(ResumeReviewer().prepare_documents(CORPUS[:1]))
+    assert job.model_version == reviewer.model_version and job.vector.shape == (1, reviewer.vectorizer.n_features)
+
+def test_lsa_model_roundtrip(tmp_path):
+    reviewer = ResumeReviewer()
+    reviewer.fit_model(CORPUS, components=3)
+    model_path = str(tmp_path / "model.pkl")
+    reviewer.save_model(model_path)
+
+    loaded = ResumeReviewer(model_path=model_path, vectorizer_mode="lsa")
+
+    assert loaded.vectorizer_mode == "lsa"
+    assert loaded.model_version.startswith("lsa-")
+    vectors = loaded.vectorize(CORPUS)
+    assert vectors.shape == (4, 3) and vectors.dtype == np.float32 and vectors.flags.c_contiguous
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1)
+    similarity = loaded.calculate_similarity(CORPUS[0], CORPUS[3])
+    assert similarity == pytest.approx(reviewer.calculate_similarity(CORPUS[0], CORPUS[3]))
+    assert similarity > loaded.calculate_similarity(CORPUS[0], CORPUS[1])
+    ranked = loaded.rank_resumes(CORPUS[0], CORPUS[1:])
+    assert ranked[0]["index"] == 2
+    assert ranked[0]["similarity_score"] == pytest.approx(loaded.analyze_resume(CORPUS[0], CORPUS[3])["similarity_score"])
+
+    with pytest.raises(ValueError):
+        ResumeReviewer().fit_model(CORPUS, components=4)
+
+def test_hashing_mode_is_stateless():
+    reviewer = ResumeReviewer(vectorizer_mode="hashing")
+    first = reviewer.calculate_similarity(CORPUS[0], CORPUS[3])
+    reviewer.calculate_similarity(CORPUS[1], CORPUS[2])
+    assert reviewer.calculate_similarity(CORPUS[0], CORPUS[3]) == first
+    assert 0 < first <= 1
+    assert reviewer.calculate_similarity(CORPUS[0], CORPUS[1]) < first
+
+def test_invalid_vectorizer_modes(tmp_path):
+    with pytest.raises(ValueError):
+        ResumeReviewer(vectorizer_mode="fitted")
+    with pytest.raises(ValueError):
+        ResumeReviewer(vectorizer_mode="unknown")
+    with pytest.raises(ValueError):
+        ResumeReviewer().save_model(str(tmp_path / "model.pkl"))
+    with pytest.raises(ValueError):
+        ResumeReviewer(vectorizer_mode="lsa")
+    fitted = ResumeReviewer()
+    fitted.fit_model(CORPUS)
+    fitted.save_model(str(tmp_path / "model.pkl"))
+    with pytest.raises(ValueError):
+        ResumeReviewer(model_path=str(tmp_path / "model.pkl"), vectorizer_mode="lsa")
+
+FIDELITY_CORPUS = [
+    "Python Developer with 5+ years EXPERIENCE!",
+    "Senior Data Scientist: built ML pipelines (TensorFlow/PyTorch), led a team of 6, cut costs by 30%.",
+    "I cannot stress enough: we're gonna ship, you gotta test, they wanna learn. Gimme feedback, lemme know.",
+    "Registered nurse (RN) - ICU, triage & patient care; BLS/ACLS certified; managed medications.",
+    "Bachelor's degree in Computer Science, magna cum laude; GPA 3.9/4.0; studies included algorithms.",
+    "Managed\taccounts payable/receivable, payroll and\r\nfinancial   reporting for 12 companies.",
+    "Café owner — handled naïve customers, résumés and façades; teaching, leading, running children's classes.",
+    "",
+    "   !!! 123 ??? ",
+]
+
+def test_fast_preprocessing_matches_nltk():
+    reviewer = ResumeReviewer()
+    for text in FIDELITY_CORPUS + reviewer.skill_keywords + [open(os.path.join(os.path.dirname(__file__), "..", "test.txt")).read()]:
+        assert fast_preprocess_text(text, reviewer.lemmatize, reviewer.stop_words) == preprocess_text(text), text
+
+def test_fast_reviewer_matches_nltk_reviewer():
+    nltk_reviewer = ResumeReviewer()
+    fast_reviewer = ResumeReviewer(preprocessing="fast", lemma_cache_size=64)
+    job, resume = FIDELITY_CORPUS[1], FIDELITY_CORPUS[4] + FIDELITY_CORPUS[5]
+    assert fast_reviewer.analyze_resume(job, resume) == nltk_reviewer.analyze_resume(job, resume)
+    assert fast_reviewer.lemmatize.cache_info().maxsize == 64
+
+def test_chunked_preprocessing_matches_fast():
+    reviewer = ResumeReviewer(preprocessing="fast")
+    text = "\n".join(FIDELITY_CORPUS) * 3
+    for chunk_chars in (50, 64, 1000):
+        tokens = iter_preprocessed_tokens(text, reviewer.lemmatize, reviewer.stop_words, chunk_chars)
+        assert " ".join(tokens) == reviewer.preprocess_text(text)
+    chunked_reviewer = ResumeReviewer(preprocessing="chunked")
+    job, resume = FIDELITY_CORPUS[1], FIDELITY_CORPUS[4] + FIDELITY_CORPUS[5]
+    assert chunked_reviewer.analyze_resume(job, resume) == reviewer.analyze_resume(job, resume)
+
+def test_truncate_text():
+    assert truncate_text("short text", 100) == "short text"
+    assert truncate_text("python developers, sql and django", 20) == "python developers,"
+    # Without a nearby word boundary the cut is exact
+    assert truncate_text("a " + "x" * 30, 20) == "a " + "x" * 18
+
+def test_unknown_preprocessing_mode():
+    with pytest.raises(ValueError):
+        ResumeReviewer(preprocessing="spacy")
+
+def test_offline_mode_reports_missing_resources(tmp_path, monkeypatch):
+    import nltk
+    from resume_reviewer import ensure_nltk_resources
+
+    monkeypatch.setattr(nltk.data, "path", [str(tmp_path)])
+    downloads = []
+    monkeypatch.setattr(nltk, "download", lambda *args, **kwargs: downloads.append(args))
+
+    with pytest.raises(LookupError, match="download-nltk-data"):
+        ensure_nltk_resources(offline=True)
+    assert downloads == []
+
+def test_import_does_not_load_nltk_or_sklearn():
+    import subprocess
+    import sys
+
+    code = "import sys, resume_reviewer; print('nltk' in sys.modules, 'sklearn' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.join(os.path.dirname(__file__), ".."))
+    assert output.stdout.split() == ["False", "False"]
+
+def test_analyze_resume_timings():
+    reviewer = ResumeReviewer()
+    job_desc = "Senior Python Developer needed. Must know Django, React and SQL."
+    resume = "Python developer with 5 years experience in Django and SQL."
+
+    plain = reviewer.analyze_resume(job_desc, resume)
+    timed = reviewer.analyze_resume(job_desc, resume, timings=True)
+
+    timings = timed.pop("timings")
+    assert timed == plain
+    assert "timings" not in plain
+    assert set(timings["stages"]) == {"prepare_job", "preprocess_resume", "similarity",
+                                      "extract_skills", "skill_categories", "keyword_scores"}
+    assert all(seconds >= 0 for seconds in timings["stages"].values())
+    assert timings["sizes"]["resume_chars"] == len(resume)
+    assert timings["sizes"]["resume_tokens"] > 0
+
+def test_fields_skip_unrequested_results(monkeypatch):
+    reviewer = ResumeReviewer()
+    job = "Senior Python Developer needed. Must know Django, React and SQL."
+    resume = "Python developer with 5 years experience in Django and SQL."
+    full = reviewer.analyze_resume(job, resume)
+    monkeypatch.setattr(reviewer, "identify_skill_categories", lambda skills: pytest.fail("categories computed"))
+
+    assert reviewer.analyze_resume(job, resume, fields=("overall_match_score",)) == {
+        "overall_match_score": full["overall_match_score"]}
+    result = reviewer.analyze_resume(job, resume, fields=("skill_match", "education_score"))
+    assert result == {key: full[key] for key in ("overall_match_score", "skill_match", "education_score")}
+    ranked = reviewer.rank_resumes(job, [resume], fields=("similarity_score",))
+    assert set(ranked[0]) == {"overall_match_score", "similarity_score", "index", "duplicate_of"}
@@ -0,0 +1,99 @@
+import pytest
+from resume_reviewer import ResumeReviewer
+from resume_index import ResumeIndex
+from skill_analytics import SkillAnalytics, category_matrix
+
+RESUMES = {
+    "python": "Python developer with Django, React and SQL.",
+    "data": "Data scientist using Python, SQL and machine learning.",
+    "nurse": "Registered nurse for patient care.",
+    "deleted": "Python and Django developer.",
+}
+
+@pytest.fixture(scope="module")
+def reviewer():
+    return ResumeReviewer(vectorizer_mode="hashing")
+
+@pytest.fixture
+def analytics(reviewer):
+    index = ResumeIndex(reviewer, duplicate_threshold=0.9)
+    index.add_many(RESUMES.items())
+    index.add("python-again", RESUMES["python"])
+    index.delete("deleted")
+    return SkillAnalytics(index)
+
+def test_skill_frequencies_match_per_resume_extraction(reviewer, analytics):
+    pooled = [RESUMES[name] for name in ("python", "data", "nurse")]
+    expected = {}
+    for resume in pooled:
+        for skill in reviewer.extract_skills(resume):
+            expected[skill] = expected.get(skill, 0) + 1
+
+    frequencies = analytics.skill_frequencies()
+
+    # The deleted resume and the near-duplicate are not part of the pool
+    assert frequencies["resumes"] == 3
+    assert {item["skill"]: item["resumes"] for item in frequencies["skills"]} == expected
+    assert frequencies["skills"][:2] == [
+        {"skill": "python", "resumes": 2, "percentage": 66.67}, {"skill": "sql", "resumes": 2, "percentage": 66.67}]
+    assert len(analytics.skill_frequencies(top=1)["skills"]) == 1
+
+def test_skill_gaps_rank_rarest_job_skills_first(analytics):
+    gaps = analytics.skill_gaps(["python", "kubernetes", "django", "sql"])
+
+    assert [(item["skill"], item["resumes"]) for item in gaps["skills"]] == [
+        ("kubernetes", 0), ("django", 1), ("python", 2), ("sql", 2)]
+    # nurse has none of the job's skills, data has two and python three
+    assert gaps["coverage"] == [1, 0, 1, 1, 0]
+
+def test_category_coverage_matches_identify_skill_categories(reviewer, analytics):
+    coverage = {item["category"]: item for item in analytics.category_coverage()["categories"]}
+
+    pooled = [RESUMES[name] for name in ("python", "data", "nurse")]
+    per_resume = [reviewer.identify_skill_categories(reviewer.extract_skills(resume)) for resume in pooled]
+    for category in reviewer.taxonomy.categories:
+        counts = [categories[category]["count"] if category in categories else 0 for categories in per_resume]
+        assert coverage[category]["resumes"] == sum(1 for count in counts if count)
+        assert sum(coverage[category]["histogram"]) == 3
+        assert coverage[category]["mean_skills"] == pytest.approx(sum(counts) / 3, abs=0.01)
+
+def test_category_matrix(reviewer):
+    matrix = category_matrix(["python", "unknown skill"], reviewer.taxonomy)
+    assert matrix.shape == (2, len(reviewer.taxonomy.categories))
+    assert matrix[0].sum() == len(reviewer.taxonomy.skill_index["python"])
+    assert matrix[1].sum() == 0
+
+def test_category_coverage_with_compiled_taxonomy(tmp_path):
+    import json
+    from taxonomy import compile_taxonomy
+
+    source = tmp_path / "taxonomy.json"
+    source.write_text(json.dumps({
+        "skill_categories": {"technology": ["python", "django"], "healthcare": ["patient care", "python"]},
+        "education_keywords": ["degree"],
+        "experience_keywords": ["year"]
+    }))
+    artifact = str(tmp_path / "taxonomy.bin")
+    compile_taxonomy(str(source), artifact, ResumeReviewer().preprocess_text)
+    index = ResumeIndex(ResumeReviewer(vectorizer_mode="hashing", taxonomy=artifact))
+    index.add_many([("a", "Python and Django developer"), ("b", "Nurse for patient care")])
+
+    coverage = {item["category"]: item for item in SkillAnalytics(index).category_coverage()["categories"]}
+
+    assert coverage["technology"]["histogram"] == [1, 0, 1, 0, 0, 0]
+    assert coverage["healthcare"]["histogram"] == [0, 2, 0, 0, 0, 0]
+
+def test_category_coverage_after_the_index_is_cleared(reviewer):
+    index = ResumeIndex(reviewer)
+    analytics = SkillAnalytics(index)
+    index.add_many([("a", "Python developer"), ("b", "Nurse for patient care")])
+    analytics.category_coverage()
+
+    # The rebuilt vocabulary has as many skills, in the other order
+    index.clear()
+    index.add_many([("c", "Nurse for patient care"), ("d", "Nurse for patient care too"), ("e", "Python developer")])
+    coverage = {item["category"]: item["resumes"] for item in analytics.category_coverage()["categories"]}
+
+    assert coverage == {item["category"]: item["resumes"]
+                        for item in SkillAnalytics(index).category_coverage()["categories"]}
+    assert (coverage["technology"], coverage["healthcare"]) == (1, 2)
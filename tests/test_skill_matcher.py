@@ -0,0 +1,32 @@
+import pytest
+from resume_reviewer import ResumeReviewer
+from skill_matcher import SkillMatcher
+
+@pytest.fixture(scope="module")
+def reviewer():
+    return ResumeReviewer()
+
+def test_matcher_matches_whole_tokens_only():
+    matcher = SkillMatcher({"technology": ["go", "r", "machine learning"]}, lambda text: text.lower())
+    assert matcher.match("google rust learning machine".split()) == set()
+    assert matcher.match("go and r with machine learning".split()) == {"go", "r", "machine learning"}
+
+def test_matcher_reports_overlapping_phrases():
+    matcher = SkillMatcher({"data": ["data", "data science", "science"]}, lambda text: text.lower())
+    assert matcher.match(["data", "science"]) == {"data", "data science", "science"}
+
+def test_matcher_skips_phrases_destroyed_by_normalization():
+    matcher = SkillMatcher({"technology": ["c++", "c#", "504 plan", "plan"]}, lambda text: text.lower())
+    assert matcher.match(["c", "plan"]) == {"plan"}
+
+def test_extract_skills_matches_lemmatized_phrases(reviewer):
+    skills = reviewer.extract_skills("Research on neural networks and statistics with pandas")
+    assert "neural networks" in skills
+    assert "statistics" in skills
+    assert "pandas" in skills
+
+def test_identify_skill_categories_uses_taxonomy_order(reviewer):
+    categories = reviewer.identify_skill_categories(["sales", "python", "agile"])
+    assert list(categories) == ["technology", "business"]
+    assert categories["technology"]["skills"] == ["python", "agile"]
+    assert categories["business"] == {"count": 2, "skills": ["sales", "agile"]}
@@ -0,0 +1,70 @@
+import json
+import pytest
+from resume_reviewer import ResumeReviewer
+from taxonomy import CompiledTaxonomy, compile_taxonomy, load_taxonomy
+from job_store import JobStore
+
+SOURCE = {
+    "skill_categories": {
+        "technology": ["python", "machine learning", "c++", "neural networks"],
+        "healthcare": ["patient care", "python", "nursing"]
+    },
+    "education_keywords": ["degree", "nursing school"],
+    "experience_keywords": ["managed", "year"]
+}
+
+@pytest.fixture(scope="module")
+def reviewer():
+    return ResumeReviewer()
+
+@pytest.fixture
+def source_path(tmp_path):
+    path = tmp_path / "taxonomy.json"
+    path.write_text(json.dumps(SOURCE))
+    return str(path)
+
+def test_compiled_taxonomy_matches_source(reviewer, source_path, tmp_path):
+    artifact = str(tmp_path / "taxonomy.bin")
+    built = compile_taxonomy(source_path, artifact, reviewer.preprocess_text)
+    compiled = load_taxonomy(artifact, reviewer.preprocess_text)
+
+    assert isinstance(compiled, CompiledTaxonomy)
+    assert compiled.version == built.version
+    assert compiled.skill_categories == SOURCE["skill_categories"]
+    assert compiled.education_keywords == SOURCE["education_keywords"]
+
+    tokens = reviewer.preprocess_text("Trained neural network models in Python; 3 years of patient care and nursing").split()
+    assert compiled.matcher().match(tokens) == built.matcher().match(tokens) == {
+        "neural networks", "python", "patient care", "nursing"}
+    skills = ["python", "nursing", "unknown"]
+    assert compiled.matcher().categorize(skills) == built.matcher().categorize(skills) == {
+        "technology": ["python"], "healthcare": ["python", "nursing"]}
+
+def test_reviewer_uses_external_taxonomy(reviewer, source_path, tmp_path):
+    artifact = str(tmp_path / "taxonomy.bin")
+    compile_taxonomy(source_path, artifact, reviewer.preprocess_text)
+    from_source = ResumeReviewer(taxonomy=source_path)
+    from_artifact = ResumeReviewer(taxonomy=artifact)
+
+    assert from_source.taxonomy_version == from_artifact.taxonomy_version != reviewer.taxonomy_version
+    job = "Nurse with patient care skills and a nursing degree"
+    resume = "Managed patient care for a year, nursing degree, some Python"
+    assert from_source.analyze_resume(job, resume) == from_artifact.analyze_resume(job, resume)
+    assert list(from_artifact.identify_skill_categories(["python", "nursing"])) == ["technology", "healthcare"]
+
+def test_invalid_taxonomy_is_rejected(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text(json.dumps({"skill_categories": {"technology": "python"}}))
+    with pytest.raises(ValueError):
+        ResumeReviewer(taxonomy=str(path))
+
+def test_job_store_refreshes_jobs_from_an_older_taxonomy(reviewer, source_path):
+    store = JobStore(reviewer)
+    job_id, job = store.register("Python and Django developer for patient care software")
+    assert "django" in job.skills
+
+    store.reviewer = ResumeReviewer(taxonomy=source_path)
+    refreshed = store.get(job_id)
+    assert refreshed.skills == ["patient care", "python"]
+    assert refreshed.taxonomy_version == store.reviewer.taxonomy_version
+    assert store.get(job_id) is refreshed